@@ -3,9 +3,33 @@
 location="%location%"
 dep_unit="%du%"
 publish_ports="%publish_ports%"
+wait_timeout="%wait_timeout%"
 
 trial_count=3
 
+# A stack created while its DU was still being built, or for a warm pool,
+# is given no DU, and the location of a pointer naming it instead. The
+# pointer is written once the DU has been uploaded, followed by the ports
+# to publish.
+if [ -z "$dep_unit" ]; then
+  waited=0
+  until pointer=$(wget -q -O - "$location") && [ -n "$pointer" ]; do
+    if [ $waited -ge $wait_timeout ]; then
+      wc_notify --data-binary '{"status": "FAILURE", "reason": "deployment unit was never uploaded."}'
+      exit 1
+    fi
+    sleep 5
+    waited=$[$waited+5]
+  done
+  set -- $pointer
+  location=$1
+  dep_unit=$2
+  shift 2
+  if [ $# -gt 0 ]; then
+    publish_ports="$*"
+  fi
+fi
+
 # Try wget and docker_load
 stage1_success=false
 RETRIES=0
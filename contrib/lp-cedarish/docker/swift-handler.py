@@ -15,7 +15,9 @@
 """Swift Handler"""
 
 import errno
+import hashlib
 import httplib
+import json
 import os
 import sys
 
@@ -28,6 +30,8 @@ CHUNKSIZE = 65536
 TOTAL_RETRIES = 3
 Gi = 1024 * 1024 * 1000
 LARGE_OBJECT_SIZE = 5 * Gi
+SEGMENT_SIZE = Gi
+SEGMENTS_SUFFIX = '_segments'
 
 
 class InvalidObjectSizeError(Exception):
@@ -38,6 +42,10 @@ class MaxRetryReached(Exception):
     pass
 
 
+class ChecksumMismatch(Exception):
+    pass
+
+
 def _get_swift_client(args):
     client_args = {
         'auth_version': '2.0',
@@ -140,6 +148,70 @@ def do_upload(path, container, name, connection_args):
             raise InvalidObjectSizeError
 
 
+class _Segment(object):
+    """Up to `limit` bytes of a stream, read as they are uploaded."""
+
+    def __init__(self, stream, first_chunk, limit, checksum):
+        self.stream = stream
+        self.first_chunk = first_chunk
+        self.limit = limit
+        self.checksum = checksum
+        self.md5 = hashlib.md5()
+        self.size = 0
+
+    def __iter__(self):
+        chunk = self.first_chunk
+        while chunk:
+            self.md5.update(chunk)
+            self.checksum.update(chunk)
+            self.size += len(chunk)
+            yield chunk
+            if self.size >= self.limit:
+                return
+            chunk = self.stream.read(min(CHUNKSIZE, self.limit - self.size))
+
+
+def do_upload_stream(stream, container, name, connection_args,
+                     segment_size=SEGMENT_SIZE):
+    """Upload a stream as a static large object, without a local copy.
+
+    Segments are sent with chunked transfer encoding as they are read, so
+    neither the stream's size nor a temporary file is needed. Return the
+    md5 and size of the whole stream.
+    """
+    connection = _get_swift_client(connection_args)
+    segments = container + SEGMENTS_SUFFIX
+    connection.put_container(container)
+    connection.put_container(segments)
+
+    checksum = hashlib.md5()
+    manifest = []
+    while True:
+        chunk = stream.read(CHUNKSIZE)
+        if not chunk:
+            break
+        segment = _Segment(stream, chunk, segment_size, checksum)
+        segment_name = '%s/%08d' % (name, len(manifest))
+        etag = connection.put_object(segments, segment_name, segment,
+                                     chunk_size=CHUNKSIZE)
+        if etag != segment.md5.hexdigest():
+            print("Checksum mismatch uploading %s" % segment_name)
+            raise ChecksumMismatch
+        manifest.append({'path': '/%s/%s' % (segments, segment_name),
+                         'etag': etag,
+                         'size_bytes': segment.size})
+    if not manifest:
+        print("Cannot upload an empty stream")
+        raise InvalidObjectSizeError
+
+    size = sum(segment['size_bytes'] for segment in manifest)
+    connection.put_object(container, name, json.dumps(manifest),
+                          query_string='multipart-manifest=put',
+                          headers={'X-Object-Meta-Md5sum':
+                                   checksum.hexdigest()})
+    return checksum.hexdigest(), size
+
+
 def do_download(path, container, name, connection_args):
     (resp_headers, resp_data) = _get_object(container, name, connection_args)
     length = int(resp_headers.get('content-length', 0))
@@ -169,6 +241,17 @@ def main():
         except Exception as e:
             print("Error download object, got %s" % e.__class__.__name__)
             sys.exit(1)
+    elif action_to_take == 'upload' and path == '-':
+        try:
+            stream = getattr(sys.stdin, 'buffer', sys.stdin)
+            md5sum, size = do_upload_stream(stream, container, obj_name,
+                                            connection_args)
+            print("Finished swift upload of %d bytes, md5sum=%s." %
+                  (size, md5sum))
+            sys.exit(0)
+        except Exception as e:
+            print("Error upload object, got %s" % e.__class__.__name__)
+            sys.exit(1)
     elif action_to_take == 'upload':
         try:
             do_upload(path, container, obj_name, connection_args)
@@ -0,0 +1,104 @@
+# Copyright 2014 - Rackspace Hosting
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""Conditional GET support for polled resources.
+
+Controllers derive an ETag and Last-Modified time from the DB rows they
+are about to serialize, and skip the serialization when the client's copy
+is still current. Collections only get an ETag: deletes do not move the
+newest update time of their rows, and rows without a version column can
+change twice within the second a Last-Modified time is given to.
+"""
+
+import calendar
+import email.utils
+import hashlib
+
+import pecan
+from pecan import hooks
+
+
+def _changed_at(obj):
+    changed = getattr(obj, 'updated_at', None)
+    return changed or getattr(obj, 'created_at', None)
+
+
+def _etag(parts):
+    digest = hashlib.sha1()
+    for part in parts:
+        digest.update(('%s|' % (part,)).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def resource_validators(obj, *variant):
+    """Return the ETag and Last-Modified time of a DB resource.
+
+    variant distinguishes representations of the same row, for instance
+    YAML and JSON.
+    """
+    changed = _changed_at(obj)
+    etag = _etag((obj.uuid, changed, getattr(obj, 'version', None),
+                  pecan.request.host_url) + variant)
+    return etag, changed
+
+
+def collection_etag(objs, *variant):
+    """Return the ETag of a list of DB resources."""
+    parts = [pecan.request.host_url, len(objs)]
+    for obj in objs:
+        parts.append(obj.uuid)
+        parts.append(_changed_at(obj))
+        parts.append(getattr(obj, 'version', None))
+    return _etag(tuple(parts) + variant)
+
+
+def _etag_matches(header, etag):
+    tags = [tag.strip() for tag in header.split(',')]
+    quoted = '"%s"' % etag
+    return '*' in tags or quoted in tags or ('W/' + quoted) in tags
+
+
+def _not_modified_since(header, last_modified):
+    since = email.utils.parsedate_tz(header)
+    if since is None:
+        return False
+    return (calendar.timegm(last_modified.utctimetuple()) <=
+            email.utils.mktime_tz(since))
+
+
+def not_modified(etag, last_modified=None):
+    """Set the validators on the response and check the request's.
+
+    Return True if the client's copy is current and a 304 should be sent.
+    If-Modified-Since is ignored when If-None-Match is given.
+    """
+    pecan.response.etag = etag
+    if last_modified is not None:
+        pecan.response.last_modified = last_modified
+
+    headers = pecan.request.headers
+    if 'If-None-Match' in headers:
+        return _etag_matches(headers['If-None-Match'], etag)
+    if last_modified is not None and 'If-Modified-Since' in headers:
+        return _not_modified_since(headers['If-Modified-Since'],
+                                   last_modified)
+    return False
+
+
+class ConditionalHook(hooks.PecanHook):
+    """Make sure 304 responses go out without a body."""
+
+    def after(self, state):
+        if state.response.status_int == 304:
+            state.response.body = b''
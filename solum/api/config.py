@@ -15,7 +15,10 @@
 # under the License.
 
 from solum.api import auth
+from solum.api import conditional
+from solum.api import query_profiler
 from solum.api import release
+from solum.api import request_metrics
 
 # Pecan Application Configurations
 app = {
@@ -24,6 +27,9 @@ app = {
     'debug': False,
     'hooks': [auth.AuthInformationHook(),
               release.ReleaseReporter(),
+              request_metrics.RequestMetricsHook(),
+              query_profiler.QueryProfilerHook(),
+              conditional.ConditionalHook(),
               ]
 }
 
@@ -12,16 +12,20 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+from oslo.config import cfg
 import pecan
 from pecan import rest
 import wsme
+from wsme import types as wtypes
 import wsmeext.pecan as wsme_pecan
 
+from solum.api import conditional
 from solum.api.controllers.v1.datamodel import assembly
 import solum.api.controllers.v1.userlog as userlog_controller
 from solum.api.handlers import assembly_handler
 from solum.common import exception
 from solum.common import request
+from solum.common import watch
 from solum import objects
 from solum.openstack.common.gettextutils import _
 
@@ -42,14 +46,29 @@ class AssemblyController(rest.RestController):
             return logs, remainder
 
     @exception.wrap_wsme_controller_exception
-    @wsme_pecan.wsexpose(assembly.Assembly)
-    def get(self):
-        """Return this assembly."""
+    @wsme_pecan.wsexpose(assembly.Assembly, wtypes.text, int)
+    def get(self, wait_for_change=None, timeout=None):
+        """Return this assembly.
+
+        With wait_for_change=<etag>, wait up to timeout seconds for the
+        assembly to differ from that ETag before responding.
+        """
         request.check_request_for_https()
         handler = assembly_handler.AssemblyHandler(
             pecan.request.security_context)
-        return assembly.Assembly.from_db_model(handler.get(self._id),
-                                               pecan.request.host_url)
+        db_obj = handler.get(self._id)
+        wanted = wait_for_change and wait_for_change.strip('"')
+        if wanted:
+            if timeout is None:
+                timeout = cfg.CONF.watch.max_timeout
+            db_obj = watch.wait_for_change(
+                db_obj.id, lambda: handler.get(self._id),
+                lambda obj: conditional.resource_validators(obj)[0],
+                wanted, timeout)
+        etag, last_modified = conditional.resource_validators(db_obj)
+        if conditional.not_modified(etag, last_modified) or etag == wanted:
+            return wsme.api.Response(None, status_code=304)
+        return assembly.Assembly.from_db_model(db_obj, pecan.request.host_url)
 
     @exception.wrap_wsme_controller_exception
     @wsme_pecan.wsexpose(assembly.Assembly, body=assembly.Assembly)
@@ -114,5 +133,9 @@ class AssembliesController(rest.RestController):
         request.check_request_for_https()
         handler = assembly_handler.AssemblyHandler(
             pecan.request.security_context)
+        assemblies = handler.get_all()
+        if conditional.not_modified(
+                conditional.collection_etag(assemblies)):
+            return wsme.api.Response(None, status_code=304)
         return [assembly.Assembly.from_db_model(assm, pecan.request.host_url)
-                for assm in handler.get_all()]
+                for assm in assemblies]
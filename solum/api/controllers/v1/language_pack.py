@@ -14,8 +14,10 @@
 
 import pecan
 from pecan import rest
+import wsme
 import wsmeext.pecan as wsme_pecan
 
+from solum.api import conditional
 from solum.api.controllers.v1.datamodel import language_pack
 import solum.api.controllers.v1.userlog as userlog_controller
 from solum.api.handlers import language_pack_handler
@@ -45,9 +47,12 @@ class LanguagePackController(rest.RestController):
         handler = language_pack_handler.LanguagePackHandler(
             pecan.request.security_context)
 
+        db_obj = handler.get(self._id)
+        if conditional.not_modified(
+                *conditional.resource_validators(db_obj)):
+            return wsme.api.Response(None, status_code=304)
         host_url = pecan.request.host_url
-        return language_pack.LanguagePack.from_db_model(handler.get(self._id),
-                                                        host_url)
+        return language_pack.LanguagePack.from_db_model(db_obj, host_url)
 
     @exception.wrap_wsme_controller_exception
     @wsme_pecan.wsexpose(status_code=204)
@@ -86,6 +91,9 @@ class LanguagePacksController(rest.RestController):
         """Return all languagepacks, based on the query provided."""
         handler = language_pack_handler.LanguagePackHandler(
             pecan.request.security_context)
+        images = handler.get_all()
+        if conditional.not_modified(conditional.collection_etag(images)):
+            return wsme.api.Response(None, status_code=304)
         host_url = pecan.request.host_url
         return [language_pack.LanguagePack.from_db_model(img, host_url)
-                for img in handler.get_all()]
+                for img in images]
@@ -22,6 +22,7 @@ from wsme.rest import json as wsme_json
 from wsme import types as wsme_types
 import wsmeext.pecan as wsme_pecan
 
+from solum.api import conditional
 from solum.api.controllers.v1.datamodel import plan
 from solum.api.handlers import plan_handler
 from solum.common import exception
@@ -88,13 +89,21 @@ class PlanController(rest.RestController):
     def get(self):
         """Return this plan."""
         handler = plan_handler.PlanHandler(pecan.request.security_context)
-
-        if pecan.request.accept is not None and 'yaml' in pecan.request.accept:
-            plan_serialized = yamlutils.dump(
-                yaml_content(handler.get(self._id)))
+        db_obj = handler.get(self._id)
+        as_yaml = (pecan.request.accept is not None and
+                   'yaml' in pecan.request.accept)
+
+        pecan.response.vary = 'Accept'
+        if conditional.not_modified(
+                *conditional.resource_validators(db_obj, as_yaml)):
+            pecan.response.status = 304
+            return ''
+
+        if as_yaml:
+            plan_serialized = yamlutils.dump(yaml_content(db_obj))
         else:
-            plan_model = plan.Plan.from_db_model(
-                handler.get(self._id), pecan.request.host_url)
+            plan_model = plan.Plan.from_db_model(db_obj,
+                                                 pecan.request.host_url)
             plan_serialized = wsme_json.encode_result(plan_model, plan.Plan)
         pecan.response.status = 200
         return plan_serialized
@@ -173,15 +182,24 @@ class PlansController(rest.RestController):
     def get_all(self):
         """Return all plans, based on the query provided."""
         handler = plan_handler.PlanHandler(pecan.request.security_context)
+        plans = handler.get_all()
+        as_yaml = (pecan.request.accept is not None and
+                   'yaml' in pecan.request.accept)
+
+        pecan.response.vary = 'Accept'
+        if conditional.not_modified(
+                conditional.collection_etag(plans, as_yaml)):
+            pecan.response.status = 304
+            return ''
 
-        if pecan.request.accept is not None and 'yaml' in pecan.request.accept:
+        if as_yaml:
             plan_serialized = yamlutils.dump([yaml_content(obj)
-                                              for obj in handler.get_all()
+                                              for obj in plans
                                               if obj and obj.raw_content])
         else:
             plan_serialized = wsme_json.encode_result(
                 [plan.Plan.from_db_model(obj, pecan.request.host_url)
-                 for obj in handler.get_all()],
+                 for obj in plans],
                 wsme_types.ArrayType(plan.Plan))
         pecan.response.status = 200
         return plan_serialized
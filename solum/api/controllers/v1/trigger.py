@@ -21,6 +21,7 @@ from pecan import rest
 from solum.api.handlers import pipeline_handler
 from solum.api.handlers import plan_handler
 from solum.common import exception
+from solum.common import timing
 from solum.openstack.common import log as logging
 
 LOG = logging.getLogger(__name__)
@@ -95,12 +96,13 @@ class TriggerController(rest.RestController):
             LOG.info(info_msg)
             raise exception.BadRequest(reason=info_msg)
 
-        try:
-            handler = plan_handler.PlanHandler(None)
-            handler.trigger_workflow(trigger_id, commit_sha, status_url,
-                                     collab_url, workflow=workflow)
-        except exception.ResourceNotFound:
-            handler = pipeline_handler.PipelineHandler(None)
-            handler.trigger_workflow(trigger_id)
+        with timing.span('trigger', trigger=trigger_id):
+            try:
+                handler = plan_handler.PlanHandler(None)
+                handler.trigger_workflow(trigger_id, commit_sha, status_url,
+                                         collab_url, workflow=workflow)
+            except exception.ResourceNotFound:
+                handler = pipeline_handler.PipelineHandler(None)
+                handler.trigger_workflow(trigger_id)
 
         pecan.response.status = 202
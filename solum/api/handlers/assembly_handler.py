@@ -20,6 +20,7 @@ from solum.api.handlers import handler
 from solum.common import exception
 from solum.common import keystone_utils
 from solum.common import repo_utils
+from solum.common import timing
 from solum.conductor import api as conductor_api
 from solum.deployer import api as deploy_api
 from solum import objects
@@ -52,6 +53,7 @@ IMAGE_STATES = image.States
 class AssemblyHandler(handler.Handler):
     """Fulfills a request on the assembly resource."""
 
+    @handler.read_only
     def get(self, id):
         """Return an assembly."""
         return objects.registry.Assembly.get_by_uuid(self.context, id)
@@ -111,7 +113,10 @@ class AssemblyHandler(handler.Handler):
         db_obj.username = self.context.user_name
 
         db_obj.status = ASSEMBLY_STATES.QUEUED
-        db_obj.create(self.context)
+        with timing.span('assembly_create', tenant=self.context.tenant,
+                         plan=db_obj.plan_id) as span_tags:
+            db_obj.create(self.context)
+            span_tags['assembly'] = db_obj.id
 
         plan_obj = objects.registry.Plan.get_by_id(self.context,
                                                    db_obj.plan_id)
@@ -169,6 +174,7 @@ class AssemblyHandler(handler.Handler):
             test_cmd=test_cmd,
             run_cmd=run_cmd)
 
+    @handler.read_only
     def get_all(self):
         """Return all assemblies, based on the query provided."""
         return objects.registry.AssemblyList.get_all(self.context)
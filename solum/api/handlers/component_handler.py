@@ -21,6 +21,7 @@ from solum import objects
 class ComponentHandler(handler.Handler):
     """Fulfills a request on the component resource."""
 
+    @handler.read_only
     def get(self, id):
         """Return this component."""
         return objects.registry.Component.get_by_uuid(self.context, id)
@@ -46,6 +47,7 @@ class ComponentHandler(handler.Handler):
         db_obj.create(self.context)
         return db_obj
 
+    @handler.read_only
     def get_all(self):
         """Return all components."""
         return objects.registry.ComponentList.get_all(self.context)
@@ -19,6 +19,7 @@ from solum import objects
 class ExtensionHandler(handler.Handler):
     """Fulfills a request on the extension resource."""
 
+    @handler.read_only
     def get(self, id):
         """Return this extension."""
         return objects.registry.Extension.get_by_uuid(self.context, id)
@@ -44,6 +45,7 @@ class ExtensionHandler(handler.Handler):
         db_obj.create(self.context)
         return db_obj
 
+    @handler.read_only
     def get_all(self):
         """Return all operations."""
         return objects.registry.ExtensionList.get_all(self.context)
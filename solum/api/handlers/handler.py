@@ -12,7 +12,19 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import functools
+
 from solum.common import exception as solum_exception
+from solum import objects
+
+
+def read_only(func):
+    """Serve a handler method's reads from the database replica."""
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        with objects.IMPL.replica_reads(self.context):
+            return func(self, *args, **kwargs)
+    return wrapper
 
 
 class Handler(object):
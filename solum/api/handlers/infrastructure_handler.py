@@ -27,6 +27,7 @@ LOG = logging.getLogger(__name__)
 class InfrastructureStackHandler(handler.Handler):
     """Fulfills a request on the infrastructure stack resource."""
 
+    @handler.read_only
     def get(self, id):
         """Return a stack."""
         return objects.registry.InfrastructureStack.get_by_uuid(
@@ -78,6 +79,7 @@ class InfrastructureStackHandler(handler.Handler):
                                                  parameters=parameters)
         return created_stack['stack']['id']
 
+    @handler.read_only
     def get_all(self):
         """Return all stacks, based on the query provided."""
         return objects.registry.InfrastructureStackList.get_all(self.context)
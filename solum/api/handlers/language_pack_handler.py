@@ -21,6 +21,7 @@ from solum.api.handlers import handler
 from solum.api.handlers import userlog_handler
 from solum.common import exception as exc
 from solum.common import solum_swiftclient
+from solum.common import watch
 from solum import objects
 from solum.objects import image
 from solum.openstack.common import log as logging
@@ -33,6 +34,10 @@ API_SERVICE_OPTS = [
     cfg.StrOpt('operator_project_id',
                default='',
                help='Tenant id of the operator account used to create LPs'),
+    cfg.IntOpt('operator_lp_cache_ttl',
+               default=300,
+               help='Seconds for which the READY operator LPs are cached '
+                    'by each process. 0 disables the cache.'),
 ]
 
 CONF = cfg.CONF
@@ -42,11 +47,13 @@ CONF.register_opts(API_SERVICE_OPTS, group='api')
 class LanguagePackHandler(handler.Handler):
     """Fulfills a request on the languagepack resource."""
 
+    @handler.read_only
     def get(self, id):
         """Return a languagepack."""
         return objects.registry.Image.get_lp_by_name_or_uuid(
             self.context, id, include_operators_lp=True)
 
+    @handler.read_only
     def get_all(self):
         """Return all languagepacks."""
         return objects.registry.Image.get_all_languagepacks(self.context)
@@ -81,11 +88,9 @@ class LanguagePackHandler(handler.Handler):
                                                                uuid)
 
         # Check if the languagepack is being used.
-        plans = objects.registry.PlanList.get_all(self.context)
-        for plan in plans:
-            lp = plan.raw_content['artifacts'][0]['language_pack']
-            if lp == db_obj.name or lp == db_obj.uuid:
-                raise exc.LPStillReferenced(name=uuid)
+        if objects.registry.Plan.language_pack_in_use(
+                self.context, [db_obj.name, db_obj.uuid]):
+            raise exc.LPStillReferenced(name=uuid)
 
         # Delete image file from swift
         if db_obj.docker_image_name:
@@ -102,7 +107,10 @@ class LanguagePackHandler(handler.Handler):
         log_handler = userlog_handler.UserlogHandler(self.context)
         log_handler.delete(db_obj.uuid)
 
-        return db_obj.destroy(self.context)
+        result = db_obj.destroy(self.context)
+        objects.registry.Image.invalidate_operator_lps()
+        watch.notify_lp_changed(self.context, db_obj.id)
+        return result
 
     def _start_build(self, image):
         git_info = {
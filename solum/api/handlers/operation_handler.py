@@ -19,6 +19,7 @@ from solum import objects
 class OperationHandler(handler.Handler):
     """Fulfills a request on the operation resource."""
 
+    @handler.read_only
     def get(self, uuid):
         """Return this operation."""
         return objects.registry.Operation.get_by_uuid(self.context, uuid)
@@ -42,6 +43,7 @@ class OperationHandler(handler.Handler):
         db_obj.create(self.context)
         return db_obj
 
+    @handler.read_only
     def get_all(self):
         """Return all operations."""
         return objects.registry.OperationList.get_all(self.context)
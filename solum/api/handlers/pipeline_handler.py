@@ -40,6 +40,7 @@ class PipelineHandler(handler.Handler):
         if context is not None:
             self._clients = clients.OpenStackClients(context)
 
+    @handler.read_only
     def get(self, id):
         """Return an pipeline."""
         return objects.registry.Pipeline.get_by_uuid(self.context, id)
@@ -211,6 +212,7 @@ class PipelineHandler(handler.Handler):
 
         return db_obj
 
+    @handler.read_only
     def get_all(self):
         """Return all pipelines, based on the query provided."""
         return objects.registry.PipelineList.get_all(self.context)
@@ -60,6 +60,7 @@ sys_param_store = CONF.api.system_param_store
 class PlanHandler(handler.Handler):
     """Fulfills a request on the plan resource."""
 
+    @handler.read_only
     def get(self, id):
         """Return a plan."""
         return objects.registry.Plan.get_by_uuid(self.context, id)
@@ -111,6 +112,7 @@ class PlanHandler(handler.Handler):
             self._create_params(db_obj.id, user_params, sys_params)
         return db_obj
 
+    @handler.read_only
     def get_all(self):
         """Return all plans."""
         return objects.registry.PlanList.get_all(self.context)
@@ -19,6 +19,7 @@ from solum import objects
 class SensorHandler(handler.Handler):
     """Fulfills a request on the sensor resource."""
 
+    @handler.read_only
     def get(self, id):
         """Return a sensor."""
         return objects.registry.Sensor.get_by_uuid(self.context, id)
@@ -44,6 +45,7 @@ class SensorHandler(handler.Handler):
         db_obj.create(self.context)
         return db_obj
 
+    @handler.read_only
     def get_all(self):
         """Return all sensors."""
         return objects.registry.SensorList.get_all(self.context)
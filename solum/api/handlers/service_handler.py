@@ -21,6 +21,7 @@ from solum import objects
 class ServiceHandler(handler.Handler):
     """Fulfills a request on the service resource."""
 
+    @handler.read_only
     def get(self, id):
         """Return a service."""
         return objects.registry.Service.get_by_uuid(self.context, id)
@@ -46,6 +47,7 @@ class ServiceHandler(handler.Handler):
         db_obj.create(self.context)
         return db_obj
 
+    @handler.read_only
     def get_all(self):
         """Return all services."""
         return objects.registry.ServiceList.get_all(self.context)
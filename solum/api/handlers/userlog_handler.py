@@ -29,10 +29,12 @@ LOG = logging.getLogger(__name__)
 
 class UserlogHandler(handler.Handler):
 
+    @handler.read_only
     def get_all(self):
         """Return all userlogs, based on the query provided."""
         return objects.registry.UserlogList.get_all(self.context)
 
+    @handler.read_only
     def get_all_by_id(self, resource_uuid):
         return objects.registry.UserlogList.get_all_by_id(
             self.context, resource_uuid=resource_uuid)
@@ -0,0 +1,37 @@
+# Copyright 2014 - Rackspace Hosting
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+from oslo.config import cfg
+from pecan import hooks
+
+from solum.objects.sqlalchemy import profiler
+
+
+class QueryProfilerHook(hooks.PecanHook):
+    """Profile the SQL statements issued by each API request."""
+
+    # Run after AuthInformationHook so the request id is known.
+    priority = 110
+
+    def before(self, state):
+        if not cfg.CONF.db_profiler.enabled:
+            return
+        ctx = getattr(state.request, 'security_context', None)
+        profiler.start(getattr(ctx, 'request_id', None))
+
+    def after(self, state):
+        profiler.stop()
+
+    def on_error(self, state, exc):
+        profiler.stop()
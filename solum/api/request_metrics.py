@@ -0,0 +1,51 @@
+# Copyright 2014 - Rackspace Hosting
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import time
+
+from pecan import hooks
+
+from solum.common import metrics
+
+
+REQUESTS = metrics.counter('solum_api_requests_total',
+                           'API requests by controller, method and status.')
+LATENCY = metrics.histogram('solum_api_request_duration_seconds',
+                            'API request latency by controller and method.')
+
+
+def _controller_name(state):
+    controller = getattr(state, 'controller', None)
+    owner = getattr(controller, '__self__', None)
+    if owner is not None:
+        return owner.__class__.__name__
+    return getattr(controller, '__name__', 'unknown')
+
+
+class RequestMetricsHook(hooks.PecanHook):
+    priority = 1
+
+    def on_route(self, state):
+        state.request.environ['solum.request_start'] = time.time()
+
+    def after(self, state):
+        start = state.request.environ.get('solum.request_start')
+        if start is None:
+            return
+        controller = _controller_name(state)
+        method = state.request.method
+        REQUESTS.inc(controller=controller, method=method,
+                     status=state.response.status_int)
+        LATENCY.observe(time.time() - start, controller=controller,
+                        method=method)
@@ -23,7 +23,9 @@ from eventlet import wsgi
 from oslo.config import cfg
 
 from solum.api import app as api_app
+from solum.common import metrics
 from solum.common import service
+from solum.common import watch
 from solum.openstack.common.gettextutils import _
 from solum.openstack.common import log as logging
 
@@ -52,4 +54,6 @@ def main():
         LOG.info(_('serving on http://%(host)s:%(port)s') %
                  dict(host=host, port=port))
 
+    metrics.start_server('api')
+    watch.start_listener()
     wsgi.server(eventlet.listen((host, port)), app)
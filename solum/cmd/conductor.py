@@ -20,8 +20,11 @@ import sys
 
 from oslo.config import cfg
 
+from solum.common import metrics
 from solum.common.rpc import service
 from solum.conductor.handlers import default as default_handler
+from solum.conductor import retention
+from solum.objects.sqlalchemy import profiler
 from solum.openstack.common.gettextutils import _
 from solum.openstack.common import log as logging
 
@@ -39,8 +42,11 @@ def main():
     cfg.CONF.import_opt('topic', 'solum.conductor.config', group='conductor')
     cfg.CONF.import_opt('host', 'solum.conductor.config', group='conductor')
     endpoints = [
-        default_handler.Handler(),
+        metrics.InstrumentedEndpoint(
+            profiler.ProfiledEndpoint(default_handler.Handler())),
     ]
+    metrics.start_server('conductor')
+    retention.start_periodic_purge()
     server = service.Service(cfg.CONF.conductor.topic,
                              cfg.CONF.conductor.host, endpoints)
     server.serve()
@@ -19,6 +19,7 @@ from oslo.config import cfg
 from oslo.db import options
 from oslo.db.sqlalchemy.migration_cli import manager
 
+from solum.conductor import retention
 from solum.openstack.common import log as logging
 
 LOG = logging.getLogger(__name__)
@@ -46,6 +47,12 @@ def do_revision(mgr):
                  autogenerate=CONF.command.autogenerate)
 
 
+def do_purge(mgr):
+    purged = retention.purge(batch_size=CONF.command.batch_size)
+    for table, count in purged.items():
+        print('Purged %d rows from %s' % (count, table))
+
+
 def add_command_parsers(subparsers):
     parser = subparsers.add_parser('version')
     parser.set_defaults(func=do_version)
@@ -67,6 +74,10 @@ def add_command_parsers(subparsers):
     parser.add_argument('--autogenerate', action='store_true')
     parser.set_defaults(func=do_revision)
 
+    parser = subparsers.add_parser('purge')
+    parser.add_argument('--batch-size', type=int)
+    parser.set_defaults(func=do_purge)
+
 
 def get_manager():
     if cfg.CONF.database.connection is None:
@@ -20,9 +20,12 @@ import sys
 
 from oslo.config import cfg
 
+from solum.common import metrics
 from solum.common.rpc import service
 from solum.deployer.handlers import heat as heat_handler
 from solum.deployer.handlers import noop as noop_handler
+from solum.deployer import warm_pool
+from solum.objects.sqlalchemy import profiler
 from solum.openstack.common.gettextutils import _
 from solum.openstack.common import log as logging
 
@@ -46,9 +49,13 @@ def main():
         'heat': heat_handler.Handler,
     }
 
+    handler = handlers[cfg.CONF.deployer.handler]()
     endpoints = [
-        handlers[cfg.CONF.deployer.handler](),
+        metrics.InstrumentedEndpoint(profiler.ProfiledEndpoint(handler)),
     ]
+    metrics.start_server('deployer')
+    if cfg.CONF.deployer.handler == 'heat':
+        warm_pool.start_periodic_reap(handler)
 
     server = service.Service(cfg.CONF.deployer.topic,
                              cfg.CONF.deployer.host, endpoints)
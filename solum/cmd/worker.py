@@ -21,12 +21,15 @@ import sys
 from oslo.config import cfg
 
 import solum
+from solum.common import metrics
 from solum.common.rpc import service
 from solum.common import trace_data
 from solum.openstack.common.gettextutils import _
 from solum.openstack.common import log as logging
+from solum.worker import git_cache
 from solum.worker.handlers import noop as noop_handler
 from solum.worker.handlers import shell as shell_handler
+from solum.worker import scheduler
 
 LOG = logging.getLogger(__name__)
 
@@ -50,8 +53,11 @@ def main():
     }
 
     endpoints = [
-        handlers[cfg.CONF.worker.handler](),
+        metrics.InstrumentedEndpoint(
+            scheduler.SchedulingHandler(handlers[cfg.CONF.worker.handler]())),
     ]
+    metrics.start_server('worker')
+    git_cache.start_periodic_evict()
 
     server = service.Service(cfg.CONF.worker.topic,
                              cfg.CONF.worker.host, endpoints)
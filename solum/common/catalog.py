@@ -12,11 +12,14 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-import os.path
+import os
+import threading
 
 from oslo.config import cfg
+import yaml
 
 from solum.common import exception
+from solum.common import metrics
 
 OPTS = [
     cfg.StrOpt('source_path',
@@ -27,21 +30,56 @@ OPTS = [
 CONF = cfg.CONF
 CONF.register_opts(OPTS)
 
+# Parsed documents kept for texts that did not come from a catalog file.
+_MAX_PARSED = 32
+
+_lock = threading.Lock()
+# file path -> (mtime, text)
+_files = {}
+# text -> parsed document
+_parsed = {}
+
+
+def _proj_dir():
+    proj_dir = CONF.get('source_path')
+    if not proj_dir:
+        proj_dir = os.path.join(os.path.dirname(__file__), '..', '..')
+    return proj_dir
+
+
+def _read(file_path):
+    """Return the contents of a file, re-reading it only when it changes."""
+    try:
+        mtime = os.stat(file_path).st_mtime
+    except OSError:
+        mtime = None
+
+    cached = _files.get(file_path)
+    if mtime is not None and cached is not None and cached[0] == mtime:
+        metrics.record_cache('catalog', True)
+        return cached[1]
+
+    metrics.record_cache('catalog', False)
+    with open(file_path) as fd:
+        text = fd.read()
+    if mtime is not None:
+        with _lock:
+            if cached is not None:
+                _parsed.pop(cached[1], None)
+            _files[file_path] = (mtime, text)
+    return text
+
 
 def get(entity, name, content_type='yaml'):
     """This reads a file's contents from local storage.
 
     /etc/solum/<entity>/name.<content_type>
     """
-    proj_dir = CONF.get('source_path')
-    if not proj_dir:
-        proj_dir = os.path.join(os.path.dirname(__file__), '..', '..')
-    file_path = os.path.join(proj_dir, 'etc', 'solum', entity,
+    file_path = os.path.join(_proj_dir(), 'etc', 'solum', entity,
                              '%s.%s' % (name, content_type))
     file_path = os.path.realpath(file_path)
     try:
-        with open(file_path) as fd:
-            return fd.read()
+        return _read(file_path)
     except Exception:
         raise exception.ObjectNotFound(
             name=entity, id=name)
@@ -52,13 +90,42 @@ def get_from_contrib(name):
 
     /contrib/common/name.<content_type>
     """
-    proj_dir = CONF.get('source_path')
-    if not proj_dir:
-        proj_dir = os.path.join(os.path.dirname(__file__), '..', '..')
-    file_path = os.path.join(proj_dir, 'contrib', 'common', '%s' % name)
+    file_path = os.path.join(_proj_dir(), 'contrib', 'common', '%s' % name)
     file_path = os.path.realpath(file_path)
     try:
-        with open(file_path) as fd:
-            return fd.read()
+        return _read(file_path)
     except Exception:
         raise exception.ObjectNotFound(id=name)
+
+
+def parse(text):
+    """Return the parsed YAML document of a catalog text.
+
+    The result is shared between callers and must not be modified; use
+    render() to derive a modified document.
+    """
+    doc = _parsed.get(text)
+    if doc is None:
+        doc = yaml.safe_load(text)
+        with _lock:
+            if len(_parsed) >= _MAX_PARSED:
+                _parsed.clear()
+            _parsed[text] = doc
+    return doc
+
+
+def render(doc, substitutions):
+    """Return a copy of doc with the given values substituted.
+
+    substitutions maps key paths, as tuples, to their new value. Only the
+    dicts along those paths are copied, the rest of the document is shared
+    with doc.
+    """
+    result = dict(doc)
+    for path, value in substitutions.items():
+        node = result
+        for key in path[:-1]:
+            node[key] = dict(node[key])
+            node = node[key]
+        node[path[-1]] = value
+    return result
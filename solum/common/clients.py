@@ -12,18 +12,12 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
-from glanceclient import client as glanceclient
-from heatclient import client as heatclient
-from mistralclient.api import client as mistralclient
-from neutronclient.neutron import client as neutronclient
 from oslo.config import cfg
-from swiftclient import client as swiftclient
-from zaqarclient.queues.v1 import client as zaqarclient
 
 from solum.common import exception
-from solum.common import solum_barbicanclient
 from solum.common import solum_keystoneclient
 from solum.openstack.common.gettextutils import _
+from solum.openstack.common import importutils
 from solum.openstack.common import log as logging
 
 
@@ -196,6 +190,10 @@ class OpenStackClients(object):
         if self._barbican:
             return self._barbican
 
+        # Client libraries are imported on first use, so that services do
+        # not pay for the ones they never talk to.
+        solum_barbicanclient = importutils.import_module(
+            'solum.common.solum_barbicanclient')
         insecure = get_client_option('barbican', 'insecure')
         self._barbican = solum_barbicanclient.BarbicanClient(
             verify=not insecure)
@@ -213,6 +211,7 @@ class OpenStackClients(object):
         if self._zaqar:
             return self._zaqar
 
+        zaqarclient = importutils.import_module('zaqarclient.queues.v1.client')
         endpoint_type = get_client_option('zaqar', 'endpoint_type')
         region_name = get_client_option('zaqar', 'region_name')
         endpoint_url = self.url_for(service_type='queuing',
@@ -234,6 +233,8 @@ class OpenStackClients(object):
         if self._neutron:
             return self._neutron
 
+        neutronclient = importutils.import_module(
+            'neutronclient.neutron.client')
         endpoint_type = get_client_option('neutron', 'endpoint_type')
         region_name = get_client_option('neutron', 'region_name')
         endpoint_url = self.url_for(service_type='network',
@@ -256,6 +257,7 @@ class OpenStackClients(object):
         if self._glance:
             return self._glance
 
+        glanceclient = importutils.import_module('glanceclient.client')
         args = {
             'token': self.auth_token,
         }
@@ -273,6 +275,7 @@ class OpenStackClients(object):
         if self._mistral:
             return self._mistral
 
+        mistralclient = importutils.import_module('mistralclient.api.client')
         args = {
             'auth_token': self.auth_token,
         }
@@ -290,6 +293,7 @@ class OpenStackClients(object):
         if self._heat:
             return self._heat
 
+        heatclient = importutils.import_module('heatclient.client')
         endpoint_type = get_client_option('heat', 'endpoint_type')
         args = {
             'auth_url': self.auth_url,
@@ -315,6 +319,7 @@ class OpenStackClients(object):
         # Not caching swift connections because of range requests
         # Check how glance_store uses swift client for a reference
 
+        swiftclient = importutils.import_module('swiftclient.client')
         endpoint_type = get_client_option('swift', 'endpoint_type')
         region_name = get_client_option('swift', 'region_name')
         args = {
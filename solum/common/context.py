@@ -61,8 +61,11 @@ class RequestContext(context.RequestContext):
 
     @classmethod
     def from_dict(cls, values):
-        allowed = [arg for arg in
-                   inspect.getargspec(RequestContext.__init__).args
-                   if arg != 'self']
-        kwargs = dict((k, v) for (k, v) in values.items() if k in allowed)
+        kwargs = dict((k, v) for (k, v) in values.items()
+                      if k in _INIT_ARGS)
         return cls(**kwargs)
+
+
+_INIT_ARGS = frozenset(arg for arg in
+                       inspect.getargspec(RequestContext.__init__).args
+                       if arg != 'self')
@@ -13,15 +13,71 @@
 #    limitations under the License.
 
 
+"""Heat parameter helpers."""
+
+import threading
+import time
+
+from oslo.config import cfg
+
+from solum.common import metrics
+
+OPTS = [
+    cfg.IntOpt('network_parameters_cache_ttl',
+               default=300,
+               help='Seconds for which the networks discovered for a tenant '
+                    'are reused by deploys. 0 disables the cache.'),
+]
+
+cfg.CONF.register_opts(OPTS)
+
+_lock = threading.Lock()
+# tenant -> (expiry time, network parameters)
+_network_cache = {}
+
+
+def _discover_network_parameters(osc):
+    neutron = osc.neutron()
+    params = {}
+    public = neutron.list_networks(fields=['id'],
+                                   **{'router:external': True})
+    for network in public['networks']:
+        params['public_net'] = network['id']
+
+    private_filters = {'router:external': False, 'fields': ['id', 'subnets']}
+    private = neutron.list_networks(tenant_id=osc.context.tenant,
+                                    **private_filters)
+    if not private['networks']:
+        private = neutron.list_networks(shared=True, **private_filters)
+    for network in private['networks']:
+        params['private_net'] = network['id']
+        params['private_subnet'] = network['subnets'][0]
+    return params
+
+
 def get_network_parameters(osc):
     # TODO(julienvey) In the long term, we should have optional parameters
     # if the user wants to override this default behaviour
-    params = {}
-    tenant_networks = osc.neutron().list_networks()
-    for tenant_network in tenant_networks['networks']:
-        if tenant_network['router:external']:
-            params['public_net'] = tenant_network['id']
+    tenant = osc.context.tenant
+    ttl = cfg.CONF.network_parameters_cache_ttl
+    now = time.time()
+    cached = _network_cache.get(tenant)
+    if cached is not None and cached[0] > now:
+        metrics.record_cache('network_parameters', True)
+        return dict(cached[1])
+
+    metrics.record_cache('network_parameters', False)
+    params = _discover_network_parameters(osc)
+    if ttl > 0:
+        with _lock:
+            _network_cache[tenant] = (now + ttl, params)
+    return dict(params)
+
+
+def invalidate_network_parameters(tenant=None):
+    """Forget the networks discovered for a tenant, or for all tenants."""
+    with _lock:
+        if tenant is None:
+            _network_cache.clear()
         else:
-            params['private_net'] = tenant_network['id']
-            params['private_subnet'] = tenant_network['subnets'][0]
-    return params
+            _network_cache.pop(tenant, None)
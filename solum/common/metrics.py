@@ -0,0 +1,300 @@
+# Copyright 2014 - Rackspace Hosting
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""In-process metrics registry with a Prometheus text scrape endpoint."""
+
+import contextlib
+import functools
+import threading
+import time
+
+import eventlet
+from eventlet import wsgi
+from oslo.config import cfg
+
+from solum.openstack.common import log as logging
+
+LOG = logging.getLogger(__name__)
+
+METRICS_OPTS = [
+    cfg.BoolOpt('enabled',
+                default=False,
+                help='Serve metrics for scraping on the port of the '
+                     'running service.'),
+    cfg.StrOpt('host',
+               default='127.0.0.1',
+               help='The listen IP of the metrics endpoint.'),
+    cfg.IntOpt('api_port',
+               default=9780,
+               help='Metrics port of the solum-api service.'),
+    cfg.IntOpt('conductor_port',
+               default=9781,
+               help='Metrics port of the solum-conductor service.'),
+    cfg.IntOpt('worker_port',
+               default=9782,
+               help='Metrics port of the solum-worker service.'),
+    cfg.IntOpt('deployer_port',
+               default=9783,
+               help='Metrics port of the solum-deployer service.'),
+]
+
+opt_group = cfg.OptGroup(name='metrics',
+                         title='Options for the metrics endpoint')
+cfg.CONF.register_group(opt_group)
+cfg.CONF.register_opts(METRICS_OPTS, opt_group)
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+                   10.0, 30.0, 60.0, 300.0, 600.0)
+
+
+def _label_key(labels):
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"')
+
+
+def _format_labels(key, extra=()):
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ''
+    return '{%s}' % ','.join('%s="%s"' % (k, _escape(v)) for k, v in pairs)
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value))
+
+
+class Metric(object):
+    metric_type = None
+
+    def __init__(self, name, description):
+        self.name = name
+        self.description = description
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def samples(self):
+        with self._lock:
+            return [(self.name + _format_labels(key), value)
+                    for key, value in sorted(self._values.items())]
+
+    def value(self, **labels):
+        return self._values.get(_label_key(labels), 0)
+
+
+class Counter(Metric):
+    metric_type = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    metric_type = 'gauge'
+
+    def set(self, value, **labels):
+        with self._lock:
+            self._values[_label_key(labels)] = value
+
+    def inc(self, amount=1, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    @contextlib.contextmanager
+    def track_in_progress(self, **labels):
+        self.inc(**labels)
+        try:
+            yield
+        finally:
+            self.dec(**labels)
+
+
+class Histogram(Metric):
+    metric_type = 'histogram'
+
+    def __init__(self, name, description, buckets=DEFAULT_BUCKETS):
+        super(Histogram, self).__init__(name, description)
+        self.buckets = tuple(sorted(buckets)) + (float('inf'),)
+
+    def observe(self, value, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            counts, total = self._values.get(key,
+                                             ([0] * len(self.buckets), 0.0))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            self._values[key] = (counts, total + value)
+
+    @contextlib.contextmanager
+    def time(self, **labels):
+        start = time.time()
+        try:
+            yield
+        finally:
+            self.observe(time.time() - start, **labels)
+
+    def value(self, **labels):
+        counts, total = self._values.get(_label_key(labels), ([0], 0.0))
+        return counts[-1], total
+
+    def samples(self):
+        result = []
+        with self._lock:
+            for key, (counts, total) in sorted(self._values.items()):
+                for bound, count in zip(self.buckets, counts):
+                    labels = _format_labels(key,
+                                            [('le', _format_value(bound))])
+                    result.append((self.name + '_bucket' + labels, count))
+                labels = _format_labels(key)
+                result.append((self.name + '_sum' + labels, total))
+                result.append((self.name + '_count' + labels, counts[-1]))
+        return result
+
+
+class Registry(object):
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics = {}
+
+    def _get_or_create(self, cls, name, description, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = cls(name, description, **kwargs)
+                self._metrics[name] = metric
+            elif not isinstance(metric, cls):
+                raise ValueError("Metric %s is already registered as a %s" %
+                                 (name, metric.metric_type))
+            return metric
+
+    def counter(self, name, description):
+        return self._get_or_create(Counter, name, description)
+
+    def gauge(self, name, description):
+        return self._get_or_create(Gauge, name, description)
+
+    def histogram(self, name, description, buckets=DEFAULT_BUCKETS):
+        return self._get_or_create(Histogram, name, description,
+                                   buckets=buckets)
+
+    def clear(self):
+        with self._lock:
+            self._metrics = {}
+
+    def render(self):
+        """Render all metrics in the Prometheus text exposition format."""
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda m: m.name)
+        lines = []
+        for metric in metrics:
+            lines.append('# HELP %s %s' % (metric.name, metric.description))
+            lines.append('# TYPE %s %s' % (metric.name, metric.metric_type))
+            for name, value in metric.samples():
+                lines.append('%s %s' % (name, _format_value(value)))
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+
+def counter(name, description):
+    return REGISTRY.counter(name, description)
+
+
+def gauge(name, description):
+    return REGISTRY.gauge(name, description)
+
+
+def histogram(name, description, buckets=DEFAULT_BUCKETS):
+    return REGISTRY.histogram(name, description, buckets)
+
+
+def record_cache(cache, hit):
+    """Count a lookup in one of the in-process caches."""
+    counter('solum_cache_requests_total',
+            'Cache lookups by cache and result.').inc(
+        cache=cache, result='hit' if hit else 'miss')
+
+
+def in_progress(gauge_name, description, **labels):
+    """Decorator keeping a gauge of the calls currently in progress."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with gauge(gauge_name, description).track_in_progress(**labels):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class InstrumentedEndpoint(object):
+    """Count and time the RPC methods handled by an endpoint."""
+
+    def __init__(self, endpoint):
+        self._endpoint = endpoint
+        self._calls = counter('solum_rpc_calls_total',
+                              'RPC messages handled by method and outcome.')
+        self._latency = histogram('solum_rpc_duration_seconds',
+                                  'Time spent handling RPC messages.')
+
+    def __getattr__(self, name):
+        attr = getattr(self._endpoint, name)
+        if name.startswith('_') or not callable(attr):
+            return attr
+
+        @functools.wraps(attr)
+        def wrapper(*args, **kwargs):
+            outcome = 'error'
+            try:
+                with self._latency.time(method=name):
+                    result = attr(*args, **kwargs)
+                outcome = 'success'
+                return result
+            finally:
+                self._calls.inc(method=name, outcome=outcome)
+        return wrapper
+
+
+def _metrics_app(environ, start_response):
+    if environ.get('PATH_INFO', '/') not in ('/', '/metrics'):
+        start_response('404 Not Found', [('Content-Type', 'text/plain')])
+        return ['Not Found\n']
+    body = REGISTRY.render()
+    start_response('200 OK',
+                   [('Content-Type', 'text/plain; version=0.0.4'),
+                    ('Content-Length', str(len(body)))])
+    return [body]
+
+
+def start_server(service):
+    """Serve the metrics of this process if metrics are enabled."""
+    if not cfg.CONF.metrics.enabled:
+        return
+    host = cfg.CONF.metrics.host
+    port = getattr(cfg.CONF.metrics, '%s_port' % service)
+    LOG.info("Serving %s metrics on http://%s:%s/metrics" %
+             (service, host, port))
+    sock = eventlet.listen((host, port))
+    eventlet.spawn_n(wsgi.server, sock, _metrics_app)
@@ -17,6 +17,7 @@
 import eventlet
 from oslo.config import cfg
 from oslo import messaging
+import six
 
 import solum.common.context
 from solum import objects
@@ -40,16 +41,49 @@ TRANSPORT_ALIASES = {
 }
 
 
+_PLAIN_TYPES = six.string_types + six.integer_types + (float, bool,
+                                                       type(None))
+
+# Context fields that the receiver can do without when a compact context is
+# requested. user_identity is derived from the other fields on receipt.
+_BULKY_CONTEXT_FIELDS = ('auth_token_info', 'user_identity')
+
+
+def _is_plain(entity):
+    """Return True if entity is made of JSON types only."""
+    pending = [entity]
+    while pending:
+        value = pending.pop()
+        if isinstance(value, _PLAIN_TYPES):
+            continue
+        value_type = type(value)
+        if value_type is dict:
+            for key in value:
+                if not isinstance(key, six.string_types):
+                    return False
+            pending.extend(six.itervalues(value))
+        elif value_type is list:
+            pending.extend(value)
+        else:
+            return False
+    return True
+
+
 class JsonPayloadSerializer(messaging.NoOpSerializer):
     @staticmethod
     def serialize_entity(context, entity):
+        # Most payloads are ids, strings and small dicts, which do not need
+        # the recursive conversion.
+        if _is_plain(entity):
+            return entity
         return jsonutils.to_primitive(entity, convert_instances=True)
 
 
 class RequestContextSerializer(messaging.Serializer):
 
-    def __init__(self, base=None):
+    def __init__(self, base=None, compact=False):
         self._base = base or messaging.NoOpSerializer()
+        self._compact = compact
 
     def serialize_entity(self, context, entity):
         if not self._base:
@@ -62,7 +96,11 @@ class RequestContextSerializer(messaging.Serializer):
         return self._base.deserialize_entity(context, entity)
 
     def serialize_context(self, context):
-        return context.to_dict()
+        data = context.to_dict()
+        if self._compact:
+            data = dict((k, v) for k, v in six.iteritems(data)
+                        if v is not None and k not in _BULKY_CONTEXT_FIELDS)
+        return data
 
     def deserialize_context(self, context):
         return solum.common.context.RequestContext.from_dict(context)
@@ -87,8 +125,13 @@ class Service(object):
 
 
 class API(object):
+    # Set by APIs whose service never talks to other OpenStack services on
+    # behalf of the caller, and so has no use for the keystone token info.
+    compact_context = False
+
     def __init__(self, transport=None, context=None, topic=None):
-        serializer = RequestContextSerializer(JsonPayloadSerializer())
+        serializer = RequestContextSerializer(JsonPayloadSerializer(),
+                                              compact=self.compact_context)
         if transport is None:
             transport = messaging.get_transport(cfg.CONF,
                                                 aliases=TRANSPORT_ALIASES)
@@ -18,6 +18,7 @@ import os
 
 from solum.common import clients
 from solum.common import exception as exc
+from solum.common import metrics
 from solum.openstack.common import log as logging
 
 import six
@@ -28,9 +29,15 @@ CHUNKSIZE = 65536
 TOTAL_RETRIES = 3
 Gi = 1024 * 1024 * 1000
 LARGE_OBJECT_SIZE = 5 * Gi
+# Deletes the segments of a static large object along with its manifest,
+# and is ignored for any other object.
+DELETE_SEGMENTS = 'multipart-manifest=delete'
 
 LOG = logging.getLogger(__name__)
 
+UPLOAD_BYTES = metrics.counter('solum_swift_upload_bytes_total',
+                               'Bytes uploaded to Swift by container.')
+
 
 class SwiftClient(object):
     """Swift client wrapper so we can encapsulate logic in one place.
@@ -125,9 +132,17 @@ class SwiftClient(object):
                 connection.put_container(container)
                 connection.put_object(container, name, local_file,
                                       content_length=size)
+                UPLOAD_BYTES.inc(size, container=container)
             else:
                 raise exc.InvalidObjectSizeError
 
+    def upload_data(self, container, name, data, headers=None):
+        """Upload a small object held in memory."""
+        connection = self._get_swift_client()
+        connection.put_container(container)
+        connection.put_object(container, name, data, headers=headers)
+        UPLOAD_BYTES.inc(len(data), container=container)
+
     def download(self, path, container, name):
         (resp_headers, resp_data) = self._get_object(container, name)
         length = int(resp_headers.get('content-length', 0))
@@ -141,7 +156,8 @@ class SwiftClient(object):
     def delete_object(self, container, filename):
         swift = self._get_swift_client()
         try:
-            swift.delete_object(container, filename)
+            swift.delete_object(container, filename,
+                                query_string=DELETE_SEGMENTS)
         except swiftexp.ClientException as e:
             if e.http_status == httplib.NOT_FOUND:
                 LOG.debug("Swift could not find object %s." % filename)
@@ -149,6 +165,24 @@ class SwiftClient(object):
             else:
                 raise
 
+    def delete_objects(self, container, filenames):
+        """Delete many objects over a single connection.
+
+        Return the names that could not be deleted.
+        """
+        swift = self._get_swift_client()
+        failed = []
+        for filename in filenames:
+            try:
+                swift.delete_object(container, filename,
+                                    query_string=DELETE_SEGMENTS)
+            except swiftexp.ClientException as e:
+                if e.http_status != httplib.NOT_FOUND:
+                    LOG.debug("Could not delete %s/%s: %s" %
+                              (container, filename, e))
+                    failed.append(filename)
+        return failed
+
     def delete_container(self, container):
         swift = self._get_swift_client()
         swift.delete_container(container)
@@ -0,0 +1,148 @@
+# Copyright 2014 - Rackspace Hosting
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""Timing spans for the stages of the build and deploy pipeline.
+
+A span is the duration of one pipeline stage, tagged with the assembly,
+plan and tenant it belongs to. Spans are recorded on solum.TLS.trace when
+trace storage is available and are exported through the configured sink.
+"""
+
+import contextlib
+import json
+import socket
+import time
+
+from oslo.config import cfg
+
+import solum
+from solum.openstack.common import log as logging
+
+LOG = logging.getLogger(__name__)
+
+TIMING_OPTS = [
+    cfg.StrOpt('sink',
+               default='log',
+               help='Where to export timing spans. Possible values are '
+                    'log, statsd and noop.'),
+    cfg.StrOpt('statsd_host',
+               default='127.0.0.1',
+               help='Host of the statsd daemon used by the statsd sink.'),
+    cfg.IntOpt('statsd_port',
+               default=8125,
+               help='Port of the statsd daemon used by the statsd sink.'),
+    cfg.StrOpt('statsd_prefix',
+               default='solum',
+               help='Prefix of the metric names sent to statsd.'),
+]
+
+opt_group = cfg.OptGroup(name='timing',
+                         title='Options for pipeline timing spans')
+cfg.CONF.register_group(opt_group)
+cfg.CONF.register_opts(TIMING_OPTS, opt_group)
+
+
+class NoopSink(object):
+    def emit(self, span):
+        pass
+
+
+class LogSink(object):
+    def emit(self, span):
+        # Tags are whatever callers had at hand, not necessarily JSON.
+        LOG.info("timing %s" % json.dumps(span, sort_keys=True, default=str))
+
+
+class StatsdSink(object):
+    def __init__(self):
+        self.address = (cfg.CONF.timing.statsd_host,
+                        cfg.CONF.timing.statsd_port)
+        self.prefix = cfg.CONF.timing.statsd_prefix
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+    def emit(self, span):
+        metric = '%s.%s:%d|ms' % (self.prefix, span['name'],
+                                  int(span['duration'] * 1000))
+        try:
+            self.sock.sendto(metric, self.address)
+        except socket.error as ex:
+            LOG.debug("Failed to send timing to statsd: %s" % ex)
+
+
+SINKS = {
+    'noop': NoopSink,
+    'log': LogSink,
+    'statsd': StatsdSink,
+}
+
+_SINK = None
+
+
+def get_sink():
+    global _SINK
+
+    if _SINK is None:
+        _SINK = SINKS.get(cfg.CONF.timing.sink, LogSink)()
+    return _SINK
+
+
+def reset_sink():
+    global _SINK
+    _SINK = None
+
+
+def record(name, start, end=None, **tags):
+    """Record a span that started at start and ended at end (or now)."""
+    if end is None:
+        end = time.time()
+    span = {'name': name,
+            'start': start,
+            'duration': max(0.0, end - start),
+            'tags': dict((k, v) for k, v in tags.items() if v is not None)}
+
+    trace = getattr(solum.TLS, 'trace', None)
+    if trace is not None:
+        trace.add_span(span)
+    get_sink().emit(span)
+    return span
+
+
+@contextlib.contextmanager
+def span(name, **tags):
+    """Time the enclosed block.
+
+    The yielded dict may be updated to add tags known only inside the block.
+    """
+    start = time.time()
+    try:
+        yield tags
+    finally:
+        record(name, start, **tags)
+
+
+def parse_stage_timing(line):
+    """Parse a 'stage_timing=<name>:<start ms>:<duration ms>' script line.
+
+    The start is in milliseconds since the epoch. Return a (name, start,
+    end) tuple in seconds, or None if the line is not a timing.
+    """
+    if not line.startswith('stage_timing='):
+        return None
+    try:
+        name, start, millis = line[len('stage_timing='):].strip().rsplit(
+            ':', 2)
+        start = int(start) / 1000.0
+        return name, start, start + int(millis) / 1000.0
+    except ValueError:
+        return None
@@ -38,6 +38,7 @@ class TraceData(object):
         self._auto_clear = False
         self._user_data = {}
         self._support_data = {}
+        self._spans = []
 
     def import_context(self, context):
         """Accept an Oslo RequestContext and fill in data automatically."""
@@ -61,6 +62,15 @@ class TraceData(object):
         """Add confidential data to support/operator-visible only storage."""
         self._support_data.update(kwargs)
 
+    def add_span(self, span):
+        """Add a timing span (see solum.common.timing)."""
+        self._spans.append(span)
+
+    @property
+    def spans(self):
+        """Timing spans recorded since the last clear()."""
+        return list(self._spans)
+
     def clear(self):
         """Clear data regardless of confidential status.
 
@@ -71,6 +81,7 @@ class TraceData(object):
         self.request_id = six.u("<not set>")
         self._user_data = {}
         self._support_data = {}
+        self._spans = []
 
     def to_dict(self):
         """Generate a dictionary for Oslo Log (requires 'request_id').
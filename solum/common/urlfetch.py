@@ -11,6 +11,8 @@
 # under the License.
 
 
+import tempfile
+
 import requests
 from requests import exceptions
 from six import moves
@@ -20,17 +22,21 @@ from solum.openstack.common import log as logging
 
 LOG = logging.getLogger(__name__)
 
+DEFAULT_CHUNK_SIZE = 64 * 1024
 
-def get(url, max_size, chunk_size=None, allowed_schemes=('http', 'https')):
-    """Get the data at the specified URL.
+
+def iter_content(url, max_size, chunk_size=None,
+                 allowed_schemes=('http', 'https')):
+    """Return an iterator over the data at the specified URL.
 
     The URL must use the http: or https: schemes.
     The file: scheme is also supported if you override
     the allowed_schemes argument.
     The max_size represents the total max byte of your file.
-    The chunk_size is by default set at max_size, it represents the size
-    of your chunk.
-    Raise an IOError if getting the data fails and if max_size is exceeded.
+    The chunk_size is the size of the chunks yielded, by default the
+    smaller of max_size and DEFAULT_CHUNK_SIZE.
+    Raise an IOError if getting the data fails and, while iterating, once
+    max_size is exceeded.
     """
 
     LOG.info(_('Fetching data from %s') % url)
@@ -41,7 +47,7 @@ def get(url, max_size, chunk_size=None, allowed_schemes=('http', 'https')):
         raise IOError(_('Invalid URL scheme %s') % components.scheme)
 
     if chunk_size is None:
-            chunk_size = max_size
+        chunk_size = min(max_size, DEFAULT_CHUNK_SIZE)
     if max_size < 1:
         raise IOError("max_size should be greater than 0")
     if chunk_size < 1:
@@ -49,30 +55,72 @@ def get(url, max_size, chunk_size=None, allowed_schemes=('http', 'https')):
 
     if components.scheme == 'file':
         try:
-            return moves.urllib.request.urlopen(url).read()
+            fd = moves.urllib.request.urlopen(url)
         except moves.urllib.error.URLError as uex:
             raise IOError(_('Failed to read file: %s') % str(uex))
-
-    try:
-        resp = requests.get(url, stream=True)
-        resp.raise_for_status()
-
+        reader = _read_chunks(fd, chunk_size)
+    else:
+        try:
+            resp = requests.get(url, stream=True)
+            resp.raise_for_status()
+        except exceptions.RequestException as ex:
+            raise IOError(_('Failed to retrieve file: %s') % str(ex))
         # We cannot use resp.text here because it would download the
         # entire file, and a large enough file would bring down the
         # engine.  The 'Content-Length' header could be faked, so it's
-        # necessary to download the content in chunks to until
-        # max_size is reached.  The chunk_size we use needs
-        # to balance CPU-intensive string concatenation with accuracy
-        # (eg. it's possible to fetch 1000 bytes greater than
-        # max_size with a chunk_size of 1000).
+        # necessary to download the content in chunks until max_size is
+        # reached.
         reader = resp.iter_content(chunk_size=chunk_size)
-        result = ""
+
+    return _bounded(reader, max_size)
+
+
+def _read_chunks(fd, chunk_size):
+    while True:
+        chunk = fd.read(chunk_size)
+        if not chunk:
+            return
+        yield chunk
+
+
+def _bounded(reader, max_size):
+    size = 0
+    try:
         for chunk in reader:
-            result += chunk
-            if len(result) > max_size:
+            size += len(chunk)
+            if size > max_size:
                 raise IOError("File exceeds maximum allowed size (%s "
                               "bytes)" % max_size)
-        return result
-
+            yield chunk
     except exceptions.RequestException as ex:
         raise IOError(_('Failed to retrieve file: %s') % str(ex))
+
+
+def get(url, max_size, chunk_size=None, allowed_schemes=('http', 'https')):
+    """Get the data at the specified URL as a string.
+
+    See iter_content() for the arguments. The chunks are joined once at the
+    end, so the cost is linear in the size of the data.
+    """
+    return ''.join(iter_content(url, max_size, chunk_size, allowed_schemes))
+
+
+def get_file(url, max_size, chunk_size=None,
+             allowed_schemes=('http', 'https'),
+             spool_size=DEFAULT_CHUNK_SIZE * 16):
+    """Get the data at the specified URL as a file object.
+
+    See iter_content() for the arguments. Data is kept in memory up to
+    spool_size bytes and spooled to a temporary file beyond that. The file
+    is positioned at the start of the data.
+    """
+    fd = tempfile.SpooledTemporaryFile(max_size=spool_size)
+    try:
+        for chunk in iter_content(url, max_size, chunk_size,
+                                  allowed_schemes):
+            fd.write(chunk)
+    except Exception:
+        fd.close()
+        raise
+    fd.seek(0)
+    return fd
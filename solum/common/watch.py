@@ -0,0 +1,204 @@
+# Copyright 2014 - Rackspace Hosting
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""Assembly status change notifications and long-poll watches.
+
+The conductor and deployer fan out a cast to every API process whenever
+they update an assembly. API requests watching that assembly sleep on an
+event instead of polling the database, and re-read the row only when
+woken. Language pack changes are fanned out the same way, so that the API
+processes drop their cached operator language packs.
+"""
+
+import collections
+import contextlib
+import os
+import socket
+import threading
+import time
+
+from oslo.config import cfg
+from oslo import messaging
+
+from solum.common import metrics
+from solum.common.rpc import service
+from solum import objects
+from solum.openstack.common import log as logging
+
+LOG = logging.getLogger(__name__)
+
+WATCH_OPTS = [
+    cfg.StrOpt('topic',
+               default='solum-assembly-status',
+               help='The fanout topic assembly status changes are sent on.'),
+    cfg.BoolOpt('notify_status_changes',
+                default=True,
+                help='Notify the API processes when an assembly or a '
+                     'language pack is updated.'),
+    cfg.IntOpt('max_timeout',
+               default=60,
+               help='Longest time in seconds an API request may wait for '
+                    'an assembly to change.'),
+    cfg.IntOpt('poll_interval',
+               default=30,
+               help='Watching requests re-read the assembly at least this '
+                    'often in seconds, in case a notification was lost.'),
+]
+
+opt_group = cfg.OptGroup(name='watch',
+                         title='Options for assembly status watches')
+cfg.CONF.register_group(opt_group)
+cfg.CONF.register_opts(WATCH_OPTS, opt_group)
+
+WATCHERS_GAUGE = metrics.gauge('solum_assembly_watchers',
+                               'API requests waiting for an assembly to '
+                               'change.')
+
+
+class API(service.API):
+    compact_context = True
+
+    def __init__(self, transport=None, context=None):
+        super(API, self).__init__(transport, context,
+                                  topic=cfg.CONF.watch.topic)
+
+    def assembly_changed(self, assembly_id, status):
+        self._client.prepare(fanout=True).cast(
+            self._context, 'assembly_changed',
+            assembly_id=assembly_id, status=status)
+
+    def language_pack_changed(self, image_id):
+        self._client.prepare(fanout=True).cast(
+            self._context, 'language_pack_changed', image_id=image_id)
+
+
+def notify_changed(ctxt, assembly_id, status=None):
+    """Tell the API processes that an assembly was updated.
+
+    Assemblies are identified by their database id, which is what the
+    conductor and deployer are handed. Watches fall back to polling, so a
+    failure here is only logged.
+    """
+    if not cfg.CONF.watch.notify_status_changes:
+        return
+    try:
+        API(context=ctxt).assembly_changed(assembly_id, status)
+    except Exception as ex:
+        LOG.warn("Failed to notify status change of assembly %s: %s" %
+                 (assembly_id, ex))
+
+
+def notify_lp_changed(ctxt, image_id):
+    """Tell the API processes that a language pack was updated."""
+    if not cfg.CONF.watch.notify_status_changes:
+        return
+    try:
+        API(context=ctxt).language_pack_changed(image_id)
+    except Exception as ex:
+        LOG.warn("Failed to notify change of language pack %s: %s" %
+                 (image_id, ex))
+
+
+class Watchers(object):
+    """Events of the requests waiting on each assembly."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._events = collections.defaultdict(set)
+
+    @contextlib.contextmanager
+    def watch(self, key):
+        event = threading.Event()
+        with self._lock:
+            self._events[key].add(event)
+        WATCHERS_GAUGE.inc()
+        try:
+            yield event
+        finally:
+            WATCHERS_GAUGE.dec()
+            with self._lock:
+                events = self._events[key]
+                events.discard(event)
+                if not events:
+                    del self._events[key]
+
+    def notify(self, key):
+        with self._lock:
+            events = list(self._events.get(key, ()))
+        for event in events:
+            event.set()
+        return len(events)
+
+    def __len__(self):
+        with self._lock:
+            return sum(len(events) for events in self._events.values())
+
+
+WATCHERS = Watchers()
+
+
+class Endpoint(object):
+    """Receives the status change casts in the API process."""
+
+    def __init__(self, watchers=None):
+        self.watchers = WATCHERS if watchers is None else watchers
+
+    def assembly_changed(self, ctxt, assembly_id, status):
+        woken = self.watchers.notify(assembly_id)
+        if woken:
+            LOG.debug("Assembly %s is now %s, woke %d watchers" %
+                      (assembly_id, status, woken))
+
+    def language_pack_changed(self, ctxt, image_id):
+        objects.registry.Image.invalidate_operator_lps()
+
+
+def start_listener():
+    """Listen for status changes on behalf of this API process."""
+    transport = messaging.get_transport(cfg.CONF,
+                                        aliases=service.TRANSPORT_ALIASES)
+    # Every API process needs its own copy of each cast.
+    target = messaging.Target(topic=cfg.CONF.watch.topic,
+                              server='%s.%d' % (socket.gethostname(),
+                                                os.getpid()))
+    server = messaging.get_rpc_server(
+        transport, target, [Endpoint()], executor='eventlet',
+        serializer=service.RequestContextSerializer(
+            service.JsonPayloadSerializer()))
+    server.start()
+    return server
+
+
+def wait_for_change(key, load, etag_of, etag, timeout, watchers=None):
+    """Return the object loaded once etag_of(obj) differs from etag.
+
+    If it has not changed within timeout seconds, the last loaded object
+    is returned anyway; callers compare its etag again to tell.
+    """
+    if watchers is None:
+        watchers = WATCHERS
+    timeout = max(0, min(timeout, cfg.CONF.watch.max_timeout))
+    deadline = time.time() + timeout
+    with watchers.watch(key) as event:
+        # Registered before loading, so no notification can slip between
+        # the read and the wait.
+        obj = load()
+        while etag_of(obj) == etag:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                break
+            event.wait(min(remaining, cfg.CONF.watch.poll_interval))
+            event.clear()
+            obj = load()
+    return obj
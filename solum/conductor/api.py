@@ -20,6 +20,8 @@ from solum.common.rpc import service
 
 
 class API(service.API):
+    compact_context = True
+
     def __init__(self, transport=None, context=None):
         cfg.CONF.import_opt('topic', 'solum.conductor.config',
                             group='conductor')
@@ -16,6 +16,7 @@
 
 from sqlalchemy import exc as sqla_exc
 
+from solum.common import watch
 from solum import objects
 from solum.objects import assembly
 from solum.openstack.common import log as logging
@@ -40,7 +41,7 @@ class Handler(object):
                      'docker_image_name': docker_image_name,
                      'description': str(description)}
         try:
-            objects.registry.Image.update_and_save(ctxt, build_id, to_update)
+            objects.registry.Image.update_in_place(ctxt, build_id, to_update)
         except sqla_exc.SQLAlchemyError as ex:
             LOG.error("Failed to update image, ID: %s" % build_id)
             LOG.exception(ex)
@@ -67,19 +68,27 @@ class Handler(object):
                                                              stack_id)
                 # update reference to image in assembly
                 assem_update = {'image_id': build_id}
-                objects.registry.Assembly.update_and_save(ctxt,
-                                                          assembly_id,
-                                                          assem_update)
+                if objects.registry.Assembly.update_in_place(
+                        ctxt, assembly_id, assem_update):
+                    watch.notify_changed(ctxt, assembly_id)
         except sqla_exc.IntegrityError:
             LOG.error("IntegrityError in creating Image_Build component,"
                       " assembly %s may be deleted" % assembly_id)
 
     def update_assembly(self, ctxt, assembly_id, data):
         try:
-            objects.registry.Assembly.update_and_save(ctxt, assembly_id, data)
+            updated = objects.registry.Assembly.update_in_place(ctxt,
+                                                                assembly_id,
+                                                                data)
         except sqla_exc.SQLAlchemyError as ex:
             LOG.error("Failed to update assembly status, ID: %s" % assembly_id)
             LOG.exception(ex)
+        else:
+            if updated:
+                watch.notify_changed(ctxt, assembly_id, data.get('status'))
+            else:
+                LOG.debug("Assembly %s is gone or being deleted, not "
+                          "updated" % assembly_id)
 
     def update_image(self, ctxt, image_id, status, external_ref=None,
                      docker_image_name=None):
@@ -89,7 +98,12 @@ class Handler(object):
         if docker_image_name:
             to_update['docker_image_name'] = docker_image_name
         try:
-            objects.registry.Image.update_and_save(ctxt, image_id, to_update)
+            updated = objects.registry.Image.update_in_place(ctxt, image_id,
+                                                             to_update)
         except sqla_exc.SQLAlchemyError as ex:
             LOG.error("Failed to update image, ID: %s" % image_id)
             LOG.exception(ex)
+        else:
+            # Only language packs are updated through here.
+            if updated:
+                watch.notify_lp_changed(ctxt, image_id)
@@ -0,0 +1,237 @@
+# Copyright 2014 - Rackspace Hosting
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""Retention policies and purging of historical rows.
+
+Failed assemblies, the deployment images no assembly refers to any more
+and the userlogs of deleted resources are removed once they are older
+than the retention period of their tenant, together with their Swift
+objects. Runs from `solum-db-manage purge` or periodically in the
+conductor.
+"""
+
+import collections
+import datetime
+import json
+import os
+
+import eventlet
+from oslo.config import cfg
+
+from solum.common import keystone_utils
+from solum.common import metrics
+from solum.common import solum_swiftclient
+from solum.objects import assembly
+from solum.objects.sqlalchemy import retention as db
+from solum.openstack.common import log as logging
+from solum.openstack.common import timeutils
+
+LOG = logging.getLogger(__name__)
+
+STATES = assembly.States
+
+PURGE_OPTS = [
+    cfg.IntOpt('retention_days',
+               default=30,
+               help='Days failed assemblies, orphaned images and userlogs '
+                    'are kept for. 0 keeps them forever.'),
+    cfg.DictOpt('tenant_retention_days',
+                default={},
+                help='Retention days per tenant id, overriding '
+                     'retention_days. 0 keeps them forever.'),
+    cfg.ListOpt('assembly_states',
+                default=[STATES.ERROR, STATES.UNIT_TESTING_FAILED,
+                         STATES.ERROR_CODE_DEPLOYMENT,
+                         STATES.ERROR_STACK_CREATE_FAILED],
+                help='States of the assemblies that are purged.'),
+    cfg.IntOpt('batch_size',
+               default=500,
+               help='Rows deleted per transaction.'),
+    cfg.IntOpt('periodic_interval',
+               default=0,
+               help='Seconds between purges run by the conductor. '
+                    '0 disables the periodic purge.'),
+]
+
+opt_group = cfg.OptGroup(name='purge',
+                         title='Options for purging historical rows')
+cfg.CONF.register_group(opt_group)
+cfg.CONF.register_opts(PURGE_OPTS, opt_group)
+
+PURGED = metrics.counter('solum_purged_rows_total',
+                         'Historical rows purged by table.')
+
+# Nothing is created before this, so tenants keeping rows forever use it.
+_FOREVER = datetime.datetime(1970, 1, 1)
+
+
+def _cutoff(now, days):
+    days = int(days)
+    if days <= 0:
+        return _FOREVER
+    return now - datetime.timedelta(days=days)
+
+
+def get_policy(now=None):
+    """Return the (default_cutoff, {tenant: cutoff}) of the config."""
+    now = now or timeutils.utcnow()
+    conf = cfg.CONF.purge
+    return (_cutoff(now, conf.retention_days),
+            dict((tenant, _cutoff(now, days))
+                 for tenant, days in conf.tenant_retention_days.items()))
+
+
+class _SwiftCleaner(object):
+    """Delete the Swift objects of purged rows, per tenant."""
+
+    def __init__(self):
+        self._clients = {}
+
+    def _client(self, project_id):
+        if project_id not in self._clients:
+            client = None
+            # Swift objects live in the tenant's account, so a trust of
+            # one of its plans is needed to reach them.
+            trusted = db.trusted_plan(project_id)
+            if trusted is not None:
+                try:
+                    ctxt = keystone_utils.create_delegation_context(trusted)
+                    if ctxt is not None:
+                        client = solum_swiftclient.SwiftClient(ctxt)
+                except Exception as ex:
+                    LOG.warn("No Swift access for tenant %s: %s" %
+                             (project_id, ex))
+            self._clients[project_id] = client
+        return self._clients[project_id]
+
+    def delete(self, project_id, container, names):
+        """Delete objects; return the names that are still there."""
+        client = self._client(project_id)
+        if client is None:
+            return list(names)
+        try:
+            return client.delete_objects(container, names)
+        except Exception as ex:
+            LOG.warn("Failed to delete objects of tenant %s from %s: %s" %
+                     (project_id, container, ex))
+            return list(names)
+
+
+def _purge_images(policy, limit, swift):
+    count = 0
+    after_id = 0
+    while True:
+        images = db.orphaned_images(policy, limit, after_id)
+        if not images:
+            return count
+        after_id = images[-1].id
+
+        deletable = []
+        artifacts = collections.defaultdict(dict)
+        for img in images:
+            if img.docker_image_name:
+                filename = img.docker_image_name.split('-', 1)[1]
+                artifacts[img.project_id][filename] = img.id
+            else:
+                deletable.append(img.id)
+
+        for project_id, by_name in artifacts.items():
+            kept = set(swift.delete(project_id, 'solum_du', list(by_name)))
+            deletable.extend(img_id for name, img_id in by_name.items()
+                             if name not in kept)
+
+        count += db.delete_images(deletable)
+        if len(images) < limit:
+            return count
+
+
+def _purge_userlogs(policy, limit, swift):
+    count = 0
+    after_id = 0
+    while True:
+        ulogs = db.orphaned_userlogs(policy, limit, after_id)
+        if not ulogs:
+            return count
+        after_id = ulogs[-1].id
+
+        deletable = []
+        objs = collections.defaultdict(dict)
+        for ulog in ulogs:
+            if ulog.strategy == 'swift':
+                container = json.loads(ulog.strategy_info)['container']
+                objs[(ulog.project_id, container)][ulog.location] = ulog.id
+                continue
+            if ulog.strategy == 'local':
+                try:
+                    os.remove(ulog.location)
+                except OSError:
+                    pass
+            deletable.append(ulog.id)
+
+        for (project_id, container), by_name in objs.items():
+            kept = set(swift.delete(project_id, container, list(by_name)))
+            deletable.extend(ulog_id for name, ulog_id in by_name.items()
+                             if name not in kept)
+
+        count += db.delete_userlogs(deletable)
+        if len(ulogs) < limit:
+            return count
+
+
+def _purge_assemblies(policy, limit):
+    states = cfg.CONF.purge.assembly_states
+    count = 0
+    while True:
+        deleted = db.purge_assemblies(policy, states, limit)
+        count += deleted
+        if deleted < limit:
+            return count
+
+
+def purge(batch_size=None, now=None):
+    """Purge expired rows; return the number deleted per table.
+
+    Assemblies go first, so that their images and logs become orphaned
+    and are picked up by the following passes.
+    """
+    limit = max(1, batch_size or cfg.CONF.purge.batch_size)
+    policy = get_policy(now)
+    swift = _SwiftCleaner()
+    result = collections.OrderedDict()
+    result['assembly'] = _purge_assemblies(policy, limit)
+    result['image'] = _purge_images(policy, limit, swift)
+    result['userlogs'] = _purge_userlogs(policy, limit, swift)
+    for table, count in result.items():
+        PURGED.inc(count, table=table)
+    LOG.info("Purged %s" % ', '.join('%d %s rows' % (count, table)
+                                     for table, count in result.items()))
+    return result
+
+
+def _periodic_purge(interval):
+    while True:
+        eventlet.sleep(interval)
+        try:
+            purge()
+        except Exception as ex:
+            LOG.exception(ex)
+
+
+def start_periodic_purge():
+    """Purge from a green thread of this process if configured to."""
+    interval = cfg.CONF.purge.periodic_interval
+    if interval <= 0:
+        return None
+    LOG.info("Purging historical rows every %s seconds" % interval)
+    return eventlet.spawn(_periodic_purge, interval)
@@ -30,6 +30,12 @@ class API(service.API):
         self._cast('deploy', assembly_id=assembly_id, image_loc=image_loc,
                    image_name=image_name, ports=ports)
 
+    def prepare_deploy(self, assembly_id, ports):
+        self._cast('prepare_deploy', assembly_id=assembly_id, ports=ports)
+
+    def discard_prepared_stack(self, assembly_id):
+        self._cast('discard_prepared_stack', assembly_id=assembly_id)
+
     def destroy_assembly(self, assem_id):
         self._cast('destroy_assembly', assem_id=assem_id)
 
@@ -14,24 +14,32 @@
 
 """Solum Deployer Heat handler."""
 
+import hashlib
+import hmac
 import logging
 import socket
 import time
+import urlparse
 
 from heatclient import exc
 import httplib2
 from oslo.config import cfg
+import six
 from sqlalchemy import exc as sqla_exc
 from swiftclient import exceptions as swiftexp
-import yaml
 
 from solum.api.handlers import userlog_handler
 from solum.common import catalog
 from solum.common import clients
 from solum.common import exception
 from solum.common import heat_utils
+from solum.common import metrics
 from solum.common import repo_utils
 from solum.common import solum_swiftclient
+from solum.common import timing
+from solum.common import watch
+from solum.deployer import teardown
+from solum.deployer import warm_pool
 from solum import objects
 from solum.objects import assembly
 from solum.openstack.common import log as openstack_logger
@@ -68,6 +76,20 @@ SERVICE_OPTS = [
     cfg.StrOpt('image',
                default="coreos",
                help='Image id'),
+    cfg.BoolOpt('reuse_plan_stack',
+                default=False,
+                help=('Deploy a new assembly by updating the stack of the '
+                      'plan\'s running assembly in place, instead of '
+                      'creating a stack and deleting the old one.')),
+    cfg.IntOpt('du_wait_timeout',
+               default=3600,
+               help=('Seconds a stack created ahead of its build waits for '
+                     'the deployment unit to be uploaded.')),
+    cfg.IntOpt('teardown_concurrency',
+               default=2,
+               help=('Superseded assemblies torn down at once, in the '
+                     'background, once a deploy is READY. 0 tears them '
+                     'down before the deploy returns.')),
     cfg.StrOpt('deployer_log_dir',
                default="/var/log/solum/deployer",
                help='Deployer logs location'),
@@ -80,6 +102,14 @@ cfg.CONF.import_group('worker', 'solum.worker.handlers.shell')
 
 deployer_log_dir = cfg.CONF.deployer.deployer_log_dir
 
+DU_CONTAINER = 'solum_du'
+DU_HANDLING_FILE = 'robust-du-handling.sh'
+# The du of a stack created by prepare_deploy or for a warm pool, whose
+# server reads the DU location from a pointer object instead.
+PENDING_DU = ''
+# Pool stacks found broken before one that is not.
+POOL_CLAIM_ATTEMPTS = 3
+
 
 def update_assembly(ctxt, assembly_id, data):
     # Here we are updating the assembly synchronously (i.e. without
@@ -89,16 +119,22 @@ def update_assembly(ctxt, assembly_id, data):
     # bugs within deployers' actions when multiple deployers are present
     # in the system.
     try:
-        objects.registry.Assembly.update_and_save(ctxt, assembly_id, data)
+        updated = objects.registry.Assembly.update_in_place(ctxt, assembly_id,
+                                                            data)
     except sqla_exc.SQLAlchemyError as ex:
         LOG.error("Failed to update assembly status, ID: %s" % assembly_id)
         LOG.exception(ex)
+    else:
+        if updated:
+            watch.notify_changed(ctxt, assembly_id, data.get('status'))
 
 
 class Handler(object):
     def __init__(self):
         super(Handler, self).__init__()
         objects.load()
+        self._superseded = teardown.Reaper(
+            self.destroy_assembly, cfg.CONF.deployer.teardown_concurrency)
 
     def echo(self, ctxt, message):
         LOG.debug("%s" % message)
@@ -135,6 +171,7 @@ class Handler(object):
             LOG.debug(authexcp.message)
             t_logger.upload()
 
+    @tlog.finalize
     def destroy_assembly(self, ctxt, assem_id):
         update_assembly(ctxt, assem_id,
                         {'status': STATES.DELETING})
@@ -142,9 +179,6 @@ class Handler(object):
         logs_resource_id = assem.uuid
         stack_id = self._find_id_if_stack_exists(assem)
 
-        # TODO(devkulkarni) Delete t_logger when returning from this call.
-        # This needs to be implemented as a decorator since there are
-        # multiple return paths from this method.
         t_logger = tlog.TenantLogger(ctxt, assem, deployer_log_dir, 'delete')
         msg = "Deleting Assembly %s" % assem.uuid
         t_logger.log(logging.DEBUG, msg)
@@ -179,7 +213,7 @@ class Handler(object):
 
             wait_interval = cfg.CONF.deployer.wait_interval
             growth_factor = cfg.CONF.deployer.growth_factor
-            stack_name = self._get_stack_name(assem)
+            stack_name = self._get_stack_name_of(assem)
             t_logger.log(logging.DEBUG, "Checking if Heat stack was deleted.")
             for count in range(cfg.CONF.deployer.max_attempts):
                 try:
@@ -203,7 +237,8 @@ class Handler(object):
             t_logger.upload()
 
     def _destroy_other_assemblies(self, ctxt, assembly_id):
-        # Destroy all of an app's READY assemblies except the one named.
+        # Queue the teardown of all of an app's READY assemblies except the
+        # one named.
 
         # We query the newly deployed assembly's object here to
         # ensure that we get most up-to-date value for created_at attribute.
@@ -223,29 +258,30 @@ class Handler(object):
                                                                created_at)
         for assem in assemblies:
             if assem.id != new_assembly.id:
-                self.destroy_assembly(ctxt, assem.id)
+                self._superseded.submit(ctxt, assem.id)
 
     def destroy_app(self, ctxt, app_id):
         # Destroy a plan's assemblies, and then the plan.
         plan = objects.registry.Plan.get_by_id(ctxt, app_id)
 
-        # Fetch all assemblies by plan id, and self.destroy() them.
+        # Fetch all assemblies by plan id, and destroy them. Those already
+        # queued for teardown are waited for rather than torn down twice.
         assemblies = objects.registry.AssemblyList.get_all(ctxt)
         for assem in assemblies:
             if app_id == assem.plan_id:
-                self.destroy_assembly(ctxt, assem.id)
+                self._superseded.destroy(ctxt, assem.id)
 
         plan.destroy(ctxt)
 
+    @metrics.in_progress('solum_deployer_stacks_in_flight',
+                         'Deployments currently in progress.')
+    @tlog.finalize
     def deploy(self, ctxt, assembly_id, image_loc, image_name, ports):
         osc = clients.OpenStackClients(ctxt)
 
         assem = objects.registry.Assembly.get_by_id(ctxt,
                                                     assembly_id)
 
-        # TODO(devkulkarni) Delete t_logger when returning from this call.
-        # This needs to be implemented as a decorator since there are
-        # multiple return paths from this method.
         t_logger = tlog.TenantLogger(ctxt, assem, deployer_log_dir, 'deploy')
         msg = "Deploying Assembly %s" % assem.uuid
         t_logger.log(logging.DEBUG, msg)
@@ -268,32 +304,79 @@ class Handler(object):
         if template is None:
             return
 
-        stack_name = self._get_stack_name(assem)
         stack_id = self._find_id_if_stack_exists(assem)
+        # A stack assigned by prepare_deploy may come from the warm pool,
+        # which names its stacks, and their DU pointers, differently.
+        stack_name = self._get_stack_name_of(assem)
 
         if assem.status == STATES.DELETING:
             t_logger.log(logging.DEBUG, "Assembly being deleted..returning")
             t_logger.upload()
             return
 
-        if stack_id is not None:
+        adopted_from = None
+        if stack_id is None and cfg.CONF.deployer.reuse_plan_stack:
+            adopted_from = self._adopt_plan_stack(ctxt, assem)
+            if adopted_from is not None:
+                stack_id = self._find_id_if_stack_exists(assem)
+                stack_name = self._get_stack_name_of(assem)
+                t_logger.log(logging.DEBUG, "Updating the Heat stack of "
+                             "assembly %s." % adopted_from.uuid)
+
+        pool_stack = None
+        previous = None
+        if stack_id is None and self._uses_du_pointer():
+            pool_stack = self._claim_pool_stack(ctxt, osc, assem, template)
+            warm_pool.refill(ctxt, self)
+            if pool_stack is not None:
+                stack_id = pool_stack.heat_stack_id
+                stack_name = pool_stack.stack_name
+                t_logger.log(logging.DEBUG, "Claimed a booted Heat stack.")
+
+        if stack_id is not None and (pool_stack is not None or
+                                     self._waiting_for_du(osc, stack_id)):
+            # Created by prepare_deploy or for the warm pool, so the server
+            # is already up and only needs to be told where the DU is.
+            try:
+                self._publish_du(ctxt, self._du_pointer_name(stack_name),
+                                 image_loc, image_name, ports)
+            except Exception as e:
+                LOG.error("Error publishing the DU of assembly %s" %
+                          assembly_id)
+                LOG.exception(e)
+                update_assembly(ctxt, assembly_id, {'status': STATES.ERROR})
+                t_logger.log(logging.ERROR, "Error publishing the DU.")
+                t_logger.upload()
+                return
+        elif stack_id is not None:
             try:
-                osc.heat().stacks.update(stack_id,
-                                         stack_name=stack_name,
-                                         template=template,
-                                         parameters=parameters)
+                files = {DU_HANDLING_FILE:
+                         catalog.get_from_contrib(DU_HANDLING_FILE)}
+                previous = self._stack_version(
+                    osc.heat().stacks.get(stack_id))
+                with timing.span('heat_update', tenant=ctxt.tenant,
+                                 assembly=assembly_id, plan=assem.plan_id):
+                    osc.heat().stacks.update(stack_id,
+                                             stack_name=stack_name,
+                                             template=template,
+                                             parameters=parameters,
+                                             files=files)
 
             except Exception as e:
                 LOG.error("Error updating Heat Stack for,"
                           " assembly %s" % assembly_id)
                 LOG.exception(e)
+                if adopted_from is not None:
+                    # Still serving the old assembly's app.
+                    objects.registry.Assembly.move_heat_stack(
+                        ctxt, assem.id, adopted_from.id)
                 update_assembly(ctxt, assembly_id, {'status': STATES.ERROR})
                 t_logger.log(logging.ERROR, "Error updating heat stack.")
                 t_logger.upload()
                 return
         else:
             try:
-                getfile_key = "robust-du-handling.sh"
+                getfile_key = DU_HANDLING_FILE
                 file_cnt = None
 
                 try:
@@ -309,14 +392,18 @@ class Handler(object):
                 get_file_dict = {}
                 get_file_dict[getfile_key] = file_cnt
 
-                created_stack = osc.heat().stacks.create(stack_name=stack_name,
-                                                         template=template,
-                                                         parameters=parameters,
-                                                         files=get_file_dict)
+                with timing.span('heat_create', tenant=ctxt.tenant,
+                                 assembly=assembly_id, plan=assem.plan_id):
+                    created_stack = osc.heat().stacks.create(
+                        stack_name=stack_name, template=template,
+                        parameters=parameters, files=get_file_dict)
             except Exception as exp:
                 LOG.error("Error creating Heat Stack for,"
                           " assembly %s" % assembly_id)
                 LOG.exception(exp)
+                # The cached networks may be the reason the stack was
+                # rejected, so look them up again on the next deploy.
+                heat_utils.invalidate_network_parameters(ctxt.tenant)
                 update_assembly(ctxt, assembly_id,
                                 {'status': STATES.ERROR_STACK_CREATE_FAILED})
                 t_logger.log(logging.ERROR, "Error creating heat stack.")
@@ -326,13 +413,9 @@ class Handler(object):
 
             LOG.debug("Stack id: %s" % stack_id)
 
-            comp_name = 'Heat_Stack_for_%s' % assem.name
-            comp_description = 'Heat Stack %s' % (
-                yaml.load(template).get('description'))
             try:
-                objects.registry.Component.assign_and_create(
-                    ctxt, assem, comp_name, 'heat_stack', comp_description,
-                    created_stack['stack']['links'][0]['href'], stack_id)
+                self._assign_stack(ctxt, assem, template, stack_id,
+                                   created_stack['stack']['links'][0]['href'])
             except sqla_exc.IntegrityError:
                 LOG.error("IntegrityError in creating Heat Stack component,"
                           " assembly %s may be deleted" % assembly_id)
@@ -343,12 +426,252 @@ class Handler(object):
         update_assembly(ctxt, assembly_id, {'status': STATES.DEPLOYING})
 
         result = self._check_stack_status(ctxt, assembly_id, osc, stack_id,
-                                          ports, t_logger)
+                                          ports, t_logger, previous=previous)
         assem.status = result
         t_logger.upload()
         if result == STATES.READY:
             self._destroy_other_assemblies(ctxt, assembly_id)
 
+    @tlog.finalize
+    def prepare_deploy(self, ctxt, assembly_id, ports):
+        """Create the stack of an assembly whose DU is still being built.
+
+        The server waits on a pointer object that deploy writes once the
+        DU is uploaded. A stack of the tenant's warm pool is taken if there
+        is one. On any failure deploy creates the stack as usual.
+        """
+        if not self._uses_du_pointer():
+            return
+        assem = objects.registry.Assembly.get_by_id(ctxt, assembly_id)
+        if (assem.status == STATES.DELETING or
+                self._find_id_if_stack_exists(assem) is not None):
+            return
+        if cfg.CONF.deployer.reuse_plan_stack and self._plan_stack_owners(
+                ctxt, assem):
+            # Deploy will update the plan's stack instead.
+            return
+
+        osc = clients.OpenStackClients(ctxt)
+        t_logger = tlog.TenantLogger(ctxt, assem, deployer_log_dir, 'deploy')
+        try:
+            template = catalog.get('templates', 'coreos')
+            pool_stack = self._claim_pool_stack(ctxt, osc, assem, template)
+            warm_pool.refill(ctxt, self)
+            if pool_stack is not None:
+                t_logger.log(logging.DEBUG, "Claimed a booted Heat stack.")
+            else:
+                self._precreate_stack(ctxt, osc, assem, template, ports,
+                                      t_logger)
+                t_logger.log(logging.DEBUG,
+                             "Created Heat stack ahead of the build.")
+        except Exception as ex:
+            LOG.warn("Could not create the stack of assembly %s ahead of "
+                     "its build: %s" % (assembly_id, ex))
+            return
+        # The build may have failed while the stack was set up, too early
+        # for its discard_prepared_stack to find it.
+        assem = objects.registry.Assembly.get_by_id(ctxt, assembly_id)
+        if assem.status == STATES.ERROR:
+            self.discard_prepared_stack(ctxt, assembly_id)
+
+    def _precreate_stack(self, ctxt, osc, assem, template, ports, t_logger):
+        stack_name = self._get_stack_name(assem)
+        location = self._du_pointer_url(osc,
+                                        self._du_pointer_name(stack_name))
+        parameters = self._get_parameters(ctxt, 'vm', location, PENDING_DU,
+                                          assem, ports, osc, t_logger)
+        parameters['wait_timeout'] = cfg.CONF.deployer.du_wait_timeout
+        files = {DU_HANDLING_FILE: catalog.get_from_contrib(DU_HANDLING_FILE)}
+        with timing.span('heat_precreate', tenant=ctxt.tenant,
+                         assembly=assem.id, plan=assem.plan_id):
+            created_stack = osc.heat().stacks.create(
+                stack_name=stack_name, template=template,
+                parameters=parameters, files=files)
+        stack_id = created_stack['stack']['id']
+        try:
+            self._assign_stack(ctxt, assem, template, stack_id,
+                               created_stack['stack']['links'][0]['href'])
+        except Exception:
+            try:
+                osc.heat().stacks.delete(stack_id)
+            except Exception as del_ex:
+                LOG.exception(del_ex)
+            raise
+
+    def discard_prepared_stack(self, ctxt, assembly_id):
+        """Delete the stack prepare_deploy made for a build that failed.
+
+        The assembly is kept, without a stack, so that it can be purged.
+        """
+        assem = objects.registry.Assembly.get_by_id(ctxt, assembly_id)
+        comp = assem.heat_stack_component
+        if assem.status not in (STATES.BUILDING, STATES.ERROR) or comp is None:
+            return
+        try:
+            clients.OpenStackClients(ctxt).heat().stacks.delete(
+                comp.heat_stack_id)
+        except exc.HTTPNotFound:
+            pass
+        except Exception as ex:
+            LOG.warn("Failed to delete the stack of assembly %s: %s" %
+                     (assembly_id, ex))
+            return
+        comp.destroy(ctxt)
+
+    def _uses_du_pointer(self):
+        # Only vm images stored in Swift fetch their DU after booting, so
+        # only their stacks can be created before the DU exists.
+        return (cfg.CONF.api.image_format == 'vm' and
+                cfg.CONF.worker.image_storage == 'swift')
+
+    def pool_key(self):
+        """Return the (flavor, image) the warm pool stacks are booted with."""
+        return cfg.CONF.deployer.flavor, cfg.CONF.deployer.image
+
+    def create_pool_stack(self, ctxt, stack_name):
+        """Boot a stack for the tenant's warm pool.
+
+        Return its (stack_id, resource_uri).
+        """
+        osc = clients.OpenStackClients(ctxt)
+        flavor, image = self.pool_key()
+        wait_timeout = warm_pool.wait_timeout()
+        parameters = {'name': stack_name,
+                      'flavor': flavor,
+                      'image': image,
+                      'location': self._du_pointer_url(
+                          osc, self._du_pointer_name(stack_name)),
+                      'du': PENDING_DU,
+                      'publish_ports': '',
+                      'wait_timeout': wait_timeout}
+        files = {DU_HANDLING_FILE: catalog.get_from_contrib(DU_HANDLING_FILE)}
+        with timing.span('heat_pool_create', tenant=ctxt.tenant):
+            created_stack = osc.heat().stacks.create(
+                stack_name=stack_name,
+                template=catalog.get('templates', 'coreos'),
+                parameters=parameters, files=files,
+                timeout_mins=wait_timeout // 60 + 1)
+        stack = created_stack['stack']
+        return stack['id'], stack['links'][0]['href']
+
+    def delete_pool_stack(self, ctxt, stack_name, stack_id=None):
+        heat = clients.OpenStackClients(ctxt).heat()
+        try:
+            if stack_id is None:
+                # Its refill did not get to record the id.
+                stack_id = heat.stacks.get(stack_name).id
+            heat.stacks.delete(stack_id)
+        except exc.HTTPNotFound:
+            pass
+
+    def _claim_pool_stack(self, ctxt, osc, assem, template):
+        """Hand a stack of the tenant's warm pool to the assembly.
+
+        Return the pool row of the stack, or None if none could be taken.
+        Stacks that cannot be handed over or deleted go back to the pool.
+        """
+        flavor, image = self.pool_key()
+        for attempt in range(POOL_CLAIM_ATTEMPTS):
+            row = warm_pool.claim(ctxt, flavor, image)
+            if row is None:
+                return None
+            try:
+                stack = osc.heat().stacks.get(row.heat_stack_id)
+            except Exception as ex:
+                LOG.debug("Could not read stack %s: %s" % (row.stack_name,
+                                                           ex))
+                stack = None
+            if stack is None or stack.status == 'FAILED':
+                LOG.warn("Discarding broken pool stack %s" % row.stack_name)
+                try:
+                    self.delete_pool_stack(ctxt, row.stack_name,
+                                           row.heat_stack_id)
+                except Exception as ex:
+                    LOG.warn("Failed to delete pool stack %s: %s" %
+                             (row.stack_name, ex))
+                    warm_pool.put_back(row)
+                continue
+            try:
+                self._assign_stack(ctxt, assem, template, row.heat_stack_id,
+                                   row.resource_uri)
+            except Exception as ex:
+                # The assembly may be gone; the stack can serve another.
+                LOG.warn("Could not hand pool stack %s to assembly %s: %s" %
+                         (row.stack_name, assem.uuid, ex))
+                warm_pool.put_back(row)
+                return None
+            return row
+        return None
+
+    def _plan_stack_owners(self, ctxt, assem):
+        """Return the plan's earlier READY assemblies, newest first."""
+        earlier = objects.registry.AssemblyList.get_earlier(
+            assem.id, assem.plan_id, STATES.READY, assem.created_at)
+        return sorted(earlier, key=lambda a: a.created_at, reverse=True)
+
+    def _adopt_plan_stack(self, ctxt, assem):
+        """Take over the stack of the plan's running assembly.
+
+        Return the assembly it was taken from, or None if there was none
+        to take. The old assembly is then retired without a stack delete.
+        """
+        for owner in self._plan_stack_owners(ctxt, assem):
+            if self._find_id_if_stack_exists(owner) is None:
+                continue
+            if objects.registry.Assembly.move_heat_stack(ctxt, owner.id,
+                                                         assem.id):
+                return owner
+        return None
+
+    def _assign_stack(self, ctxt, assem, template, stack_id, resource_uri):
+        comp_name = 'Heat_Stack_for_%s' % assem.name
+        comp_description = 'Heat Stack %s' % (
+            self._get_template_description(template))
+        objects.registry.Component.assign_and_create(
+            ctxt, assem, comp_name, 'heat_stack', comp_description,
+            resource_uri, stack_id)
+
+    def _du_pointer_name(self, stack_name):
+        return '%s.location' % stack_name
+
+    def _du_pointer_url(self, osc, pointer_name):
+        """Return a temp URL of a DU pointer object."""
+        region_name = clients.get_client_option('swift', 'region_name')
+        storage_url = osc.keystone().client.service_catalog.url_for(
+            service_type='object-store', endpoint_type='publicURL',
+            region_name=region_name)
+        storage = urlparse.urlparse(storage_url)
+        path = '%s/%s/%s' % (storage.path.rstrip('/'), DU_CONTAINER,
+                             pointer_name)
+        expires = int(time.time() + int(cfg.CONF.worker.temp_url_ttl))
+        sig = hmac.new(cfg.CONF.worker.temp_url_secret,
+                       'GET\n%d\n%s' % (expires, path),
+                       hashlib.sha1).hexdigest()
+        return '%s://%s%s?temp_url_sig=%s&temp_url_expires=%d' % (
+            cfg.CONF.worker.temp_url_protocol, storage.netloc, path, sig,
+            expires)
+
+    def _waiting_for_du(self, osc, stack_id):
+        try:
+            stack = osc.heat().stacks.get(stack_id)
+        except Exception as ex:
+            LOG.debug("Could not read stack %s: %s" % (stack_id, ex))
+            return False
+        return (stack.parameters or {}).get('du') == PENDING_DU
+
+    def _publish_du(self, ctxt, pointer_name, image_loc, image_name, ports):
+        # Pool stacks are booted before the ports are known, so they come
+        # with the DU. The pointer expires with the temp URL it carries.
+        swift = solum_swiftclient.SwiftClient(ctxt)
+        swift.upload_data(DU_CONTAINER, pointer_name,
+                          '%s %s %s\n' % (image_loc, image_name,
+                                          self._publish_ports(ports)),
+                          headers={'X-Delete-After':
+                                   str(cfg.CONF.worker.temp_url_ttl)})
+
+    def _publish_ports(self, ports):
+        return ' '.join('-p {pt}:{pt}'.format(pt=port) for port in ports)
+
     def _get_template(self, ctxt, image_format, image_storage,
                       image_loc, image_name, assem, ports, t_logger):
         template = None
@@ -412,13 +735,9 @@ class Handler(object):
             parameters = {'name': str(assem.uuid),
                           'flavor': cfg.CONF.deployer.flavor,
                           'image': cfg.CONF.deployer.image}
-            ports_str = ''
-            for port in ports:
-                ports_str += ' -p {pt}:{pt}'.format(pt=port)
-
             parameters['location'] = image_loc
             parameters['du'] = image_name
-            parameters['publish_ports'] = ports_str.strip()
+            parameters['publish_ports'] = self._publish_ports(ports)
         else:
             LOG.debug("Image format %s is not supported." % image_format)
             update_assembly(ctxt, assem.id, {'status': STATES.ERROR})
@@ -426,14 +745,25 @@ class Handler(object):
             t_logger.upload()
         return parameters
 
+    def _stack_version(self, stack):
+        return stack.action, getattr(stack, 'updated_time', None)
+
     def _check_stack_status(self, ctxt, assembly_id, osc, stack_id, ports,
-                            t_logger):
+                            t_logger, previous=None):
+        """Wait for the stack, then for the app on its ports.
+
+        previous is the version of a stack before its update was sent.
+        Until Heat has started the update, the stack's status is still that
+        of the deployment it replaces.
+        """
 
         wait_interval = cfg.CONF.deployer.wait_interval
         growth_factor = cfg.CONF.deployer.growth_factor
+        span_tags = {'tenant': ctxt.tenant, 'assembly': assembly_id}
 
         stack = None
 
+        stack_start = time.time()
         for count in range(cfg.CONF.deployer.max_attempts):
             time.sleep(wait_interval)
             wait_interval *= growth_factor
@@ -443,9 +773,16 @@ class Handler(object):
                 LOG.exception(e)
                 continue
 
+            if previous is not None and (
+                    stack.action != 'UPDATE' or
+                    self._stack_version(stack) == previous):
+                stack = None
+                continue
             if stack.status == 'COMPLETE':
+                timing.record('stack_complete', stack_start, **span_tags)
                 break
             elif stack.status == 'FAILED':
+                heat_utils.invalidate_network_parameters(ctxt.tenant)
                 update_assembly(ctxt, assembly_id,
                                 {'status': STATES.ERROR_STACK_CREATE_FAILED})
                 lg_msg = "App deployment failed: Heat stack creation failure"
@@ -484,6 +821,7 @@ class Handler(object):
 
         successful_ports = set()
         du_is_up = False
+        reachable_start = time.time()
         for count in range(cfg.CONF.deployer.du_attempts):
             for prt in ports:
                 if prt not in successful_ports:
@@ -516,6 +854,7 @@ class Handler(object):
             time.sleep(1)
 
         if du_is_up:
+            timing.record('app_reachable', reachable_start, **span_tags)
             to_update = {'status': STATES.READY}
         else:
             to_update = {'status': STATES.ERROR_CODE_DEPLOYMENT}
@@ -531,6 +870,15 @@ class Handler(object):
             return heat_output._info['outputs'][0]['output_value']
         return None
 
+    def _get_stack_name_of(self, assem):
+        """Name of the stack the assembly holds, which may be adopted."""
+        comp = assem.heat_stack_component
+        uri = getattr(comp, 'resource_uri', None)
+        # Heat links stacks as .../stacks/<stack_name>/<stack_id>
+        if isinstance(uri, six.string_types) and '/stacks/' in uri:
+            return uri.split('/stacks/', 1)[1].split('/')[0]
+        return self._get_stack_name(assem)
+
     def _find_id_if_stack_exists(self, assem):
         if assem.heat_stack_component is not None:
             return assem.heat_stack_component.heat_stack_id
@@ -552,11 +900,13 @@ class Handler(object):
 
         LOG.debug("run_docker:%s" % run_docker)
 
-        template_bdy = yaml.safe_load(template)
-        comp_instance = template_bdy['resources']['compute_instance']
-        user_data = comp_instance['properties']['user_data']
-        user_data['str_replace']['template'] = run_docker
-        comp_instance['properties']['user_data'] = user_data
-        template_bdy['resources']['compute_instance'] = comp_instance
-        template = yaml.dump(template_bdy)
-        return template
+        # Heat accepts the template as a document, so the shared parse of the
+        # catalog template is copied only along the substituted path.
+        return catalog.render(catalog.parse(template), {
+            ('resources', 'compute_instance', 'properties', 'user_data',
+             'str_replace', 'template'): run_docker})
+
+    def _get_template_description(self, template):
+        if not isinstance(template, dict):
+            template = catalog.parse(template)
+        return template.get('description')
@@ -28,6 +28,10 @@ class Handler(object):
         message = ("Deploy %s %s %s" % (assembly_id, image_id, ports))
         LOG.debug("%s" % message)
 
+    def prepare_deploy(self, ctxt, assembly_id, ports):
+        message = ("Prepare deploy %s %s" % (assembly_id, ports))
+        LOG.debug("%s" % message)
+
     def destroy_assembly(self, ctxt, assem_id):
         assem = objects.registry.Assembly.get_by_id(ctxt, assem_id)
         assem.destroy(ctxt)
@@ -0,0 +1,101 @@
+# Copyright 2014 - Rackspace Hosting
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""Background teardown of the assemblies a deploy superseded.
+
+Deleting an assembly waits for Heat to delete its stack and then cleans
+up Swift, which takes minutes. Once a new assembly is READY its deploy
+returns and the assemblies it superseded are queued here, to be torn down
+by a few green threads of the deployer.
+
+The queue is not persistent. Assemblies still queued when the deployer
+stops stay READY, and the next deploy of their plan queues them again.
+"""
+
+import eventlet
+from eventlet import event
+from eventlet import queue
+
+from solum.common import metrics
+from solum.openstack.common import log as logging
+
+LOG = logging.getLogger(__name__)
+
+PENDING = metrics.gauge('solum_deployer_teardowns_pending',
+                        'Superseded assemblies waiting to be torn down.')
+
+
+class Reaper(object):
+    """Tear assemblies down with at most `concurrency` at a time.
+
+    destroy(ctxt, assembly_id) is called for each assembly submitted. A
+    concurrency of 0 calls it right away in the submitting thread.
+    """
+
+    def __init__(self, destroy, concurrency):
+        self._destroy = destroy
+        self._concurrency = concurrency
+        self._queue = queue.LightQueue()
+        # assembly id -> event sent once its teardown is over
+        self._pending = {}
+        self._workers = []
+
+    def submit(self, ctxt, assembly_id):
+        """Queue an assembly; return False if it is already queued."""
+        if self._concurrency <= 0:
+            self.destroy(ctxt, assembly_id)
+            return True
+        if assembly_id in self._pending:
+            return False
+        if not self._workers:
+            self._workers = [eventlet.spawn(self._work)
+                             for i in range(self._concurrency)]
+        self._pending[assembly_id] = event.Event()
+        PENDING.inc()
+        self._queue.put((ctxt, assembly_id))
+        return True
+
+    def destroy(self, ctxt, assembly_id):
+        """Tear an assembly down in this thread.
+
+        If it is already queued or being torn down, wait for that instead,
+        so that no assembly is torn down twice at once.
+        """
+        done = self._pending.get(assembly_id)
+        if done is not None:
+            done.wait()
+            return
+        self._pending[assembly_id] = event.Event()
+        try:
+            self._destroy(ctxt, assembly_id)
+        finally:
+            self._pending.pop(assembly_id).send()
+
+    def _work(self):
+        while True:
+            ctxt, assembly_id = self._queue.get()
+            self._run(ctxt, assembly_id)
+
+    def _run(self, ctxt, assembly_id):
+        try:
+            self._destroy(ctxt, assembly_id)
+        except Exception as ex:
+            LOG.error("Failed to tear down assembly %s" % assembly_id)
+            LOG.exception(ex)
+        finally:
+            self._pending.pop(assembly_id).send()
+            PENDING.dec()
+
+    def __len__(self):
+        return len(self._pending)
@@ -0,0 +1,236 @@
+# Copyright 2014 - Rackspace Hosting
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""Warm pools of stacks booted before the assemblies that use them.
+
+Each tenant deploying vm images stored in Swift may keep a few stacks of
+the configured flavor and image booted and waiting on a DU pointer of
+their own. Deploys claim one instead of creating a stack, so the assembly
+is READY once its container has started.
+
+A tenant's pool is refilled from a green thread after each of its deploys,
+with the credentials of that deploy. Stacks left unclaimed for
+idle_timeout seconds are reaped, so the pools of tenants that stop
+deploying drain away.
+"""
+
+import datetime
+import uuid
+
+import eventlet
+from oslo.config import cfg
+
+from solum.common import keystone_utils
+from solum.common import metrics
+from solum.objects.sqlalchemy import retention as retention_db
+from solum.objects.sqlalchemy import warm_pool as db
+from solum.openstack.common import log as logging
+from solum.openstack.common import timeutils
+
+LOG = logging.getLogger(__name__)
+
+WARM_POOL_OPTS = [
+    cfg.IntOpt('size',
+               default=0,
+               help='Stacks kept booted for each tenant that is not in a '
+                    'tenant class. 0 disables the pool.'),
+    cfg.DictOpt('tenant_classes',
+                default={},
+                help='Class of each tenant, as tenant_id:class pairs.'),
+    cfg.DictOpt('class_sizes',
+                default={},
+                help='Stacks kept booted for each tenant of a class, as '
+                     'class:size pairs.'),
+    cfg.IntOpt('idle_timeout',
+               default=3600,
+               help='Seconds a pool stack waits to be claimed before it is '
+                    'reaped.'),
+    cfg.IntOpt('reap_interval',
+               default=300,
+               help='Seconds between reaps of idle pool stacks by the '
+                    'deployer. 0 disables the periodic reap.'),
+    cfg.IntOpt('batch_size',
+               default=100,
+               help='Pool stacks looked at per query when reaping.'),
+]
+
+opt_group = cfg.OptGroup(name='warm_pool',
+                         title='Options for the warm pools of stacks')
+cfg.CONF.register_group(opt_group)
+cfg.CONF.register_opts(WARM_POOL_OPTS, opt_group)
+
+CLAIMS = metrics.counter('solum_warm_pool_claims_total',
+                         'Deploys that looked for a pool stack by result.')
+CREATED = metrics.counter('solum_warm_pool_created_total',
+                          'Pool stacks created.')
+REAPED = metrics.counter('solum_warm_pool_reaped_total',
+                         'Idle or outdated pool stacks deleted.')
+
+STACK_PREFIX = 'solum-pool-'
+
+# The coreos template's own wait_timeout, which a claimed stack still needs
+# to fetch and start its deployment unit.
+START_TIMEOUT = 600
+
+# Tenants with a refill running in this process.
+_refilling = set()
+
+
+def pool_size(tenant):
+    conf = cfg.CONF.warm_pool
+    tenant_class = conf.tenant_classes.get(tenant)
+    if tenant_class is not None and tenant_class in conf.class_sizes:
+        return int(conf.class_sizes[tenant_class])
+    return conf.size
+
+
+def wait_timeout():
+    """Seconds the server of a pool stack waits for its deployment unit."""
+    return cfg.CONF.warm_pool.idle_timeout + START_TIMEOUT
+
+
+def _fresh_since(now=None):
+    now = now or timeutils.utcnow()
+    return now - datetime.timedelta(seconds=cfg.CONF.warm_pool.idle_timeout)
+
+
+def claim(ctxt, flavor, image):
+    """Take one of the tenant's pool stacks, or return None."""
+    if pool_size(ctxt.tenant) <= 0:
+        return None
+    row = db.claim(ctxt.tenant, flavor, image, _fresh_since())
+    CLAIMS.inc(result='miss' if row is None else 'hit')
+    return row
+
+
+def put_back(row):
+    """Return a taken stack to the pool, to be claimed or reaped again."""
+    try:
+        db.put_back(row)
+    except Exception as ex:
+        LOG.error("Lost track of pool stack %s of tenant %s: %s" %
+                  (row.stack_name, row.project_id, ex))
+
+
+def refill(ctxt, handler):
+    """Top the tenant's pool up from a green thread.
+
+    handler provides pool_key(), create_pool_stack(ctxt, stack_name) and
+    delete_pool_stack(ctxt, stack_name, stack_id).
+    """
+    if pool_size(ctxt.tenant) <= 0 or ctxt.tenant in _refilling:
+        return None
+    _refilling.add(ctxt.tenant)
+    return eventlet.spawn(_refill, ctxt, handler)
+
+
+def _refill(ctxt, handler):
+    try:
+        flavor, image = handler.pool_key()
+        _reap(handler, {ctxt.tenant: ctxt}.get, project_id=ctxt.tenant)
+        missing = pool_size(ctxt.tenant) - db.count(
+            ctxt.tenant, flavor, image, _fresh_since())
+        for i in range(missing):
+            # Reserved first, so that a stack Heat accepted is reaped even
+            # if its id cannot be recorded.
+            stack_name = '%s%s' % (STACK_PREFIX, uuid.uuid4())
+            row_id = db.reserve(ctxt.tenant, flavor, image, stack_name)
+            stack_id, resource_uri = handler.create_pool_stack(ctxt,
+                                                               stack_name)
+            db.set_stack(row_id, stack_id, resource_uri)
+            CREATED.inc()
+    except Exception as ex:
+        LOG.warn("Failed to refill the warm pool of tenant %s: %s" %
+                 (ctxt.tenant, ex))
+    finally:
+        _refilling.discard(ctxt.tenant)
+
+
+def _reap(handler, context_of, project_id=None):
+    flavor, image = handler.pool_key()
+    before = _fresh_since()
+    limit = max(1, cfg.CONF.warm_pool.batch_size)
+    count = 0
+    after_id = 0
+    failed = []
+    while True:
+        rows = db.stale(flavor, image, before, limit, after_id, project_id)
+        if not rows:
+            break
+        after_id = rows[-1].id
+        for row in rows:
+            ctxt = context_of(row.project_id)
+            # Left for when the tenant can be reached again.
+            if ctxt is None or not db.take(row.id):
+                continue
+            try:
+                handler.delete_pool_stack(ctxt, row.stack_name,
+                                          row.heat_stack_id)
+            except Exception as ex:
+                LOG.warn("Failed to delete pool stack %s of tenant %s: %s"
+                         % (row.stack_name, row.project_id, ex))
+                failed.append(row)
+                continue
+            count += 1
+        if len(rows) < limit:
+            break
+    # Put back once done, so this pass does not come across them again.
+    for row in failed:
+        put_back(row)
+    REAPED.inc(count)
+    return count
+
+
+def reap(handler):
+    """Delete the idle and outdated pool stacks of every tenant.
+
+    Stacks live in the tenant's project, so a trust of one of its plans is
+    needed to delete them. Return the number of stacks deleted.
+    """
+    contexts = {}
+
+    def context_of(project_id):
+        if project_id not in contexts:
+            ctxt = None
+            trusted = retention_db.trusted_plan(project_id)
+            if trusted is not None:
+                try:
+                    ctxt = keystone_utils.create_delegation_context(trusted)
+                except Exception as ex:
+                    LOG.warn("No access to tenant %s: %s" % (project_id, ex))
+            contexts[project_id] = ctxt
+        return contexts[project_id]
+
+    count = _reap(handler, context_of)
+    if count:
+        LOG.info("Reaped %d pool stacks" % count)
+    return count
+
+
+def _periodic_reap(handler, interval):
+    while True:
+        eventlet.sleep(interval)
+        try:
+            reap(handler)
+        except Exception as ex:
+            LOG.exception(ex)
+
+
+def start_periodic_reap(handler):
+    """Reap from a green thread of this process if configured to."""
+    interval = cfg.CONF.warm_pool.reap_interval
+    if interval <= 0:
+        return None
+    LOG.info("Reaping idle pool stacks every %s seconds" % interval)
+    return eventlet.spawn(_periodic_reap, handler, interval)
@@ -12,24 +12,136 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import contextlib
 import sys
+import threading
+import time
 
 from oslo.config import cfg
 from oslo.db.sqlalchemy import session
+from sqlalchemy import event
 
+from solum.common import metrics
+from solum.objects.sqlalchemy import profiler
+
+
+REPLICA_OPTS = [
+    cfg.IntOpt('read_your_writes_window',
+               default=10,
+               help='Seconds after a tenant writes during which its reads '
+                    'are served by the primary database rather than by '
+                    'slave_connection.'),
+]
+
+cfg.CONF.register_opts(REPLICA_OPTS, group='database')
 
 _FACADE = None
 
+# Per green thread: whether sessions may be served by the replica.
+_LOCAL = threading.local()
+
+# Tenant -> time of its last write through this process.
+_LAST_WRITE = {}
+_LAST_WRITE_PRUNE_SIZE = 1000
+
+QUERIES = metrics.counter('solum_db_queries_total',
+                          'Database statements executed by statement type.')
+QUERY_LATENCY = metrics.histogram('solum_db_query_duration_seconds',
+                                  'Database statement latency.')
+SESSIONS = metrics.counter('solum_db_sessions_total',
+                           'Sessions handed out by target database.')
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context,
+                           executemany):
+    conn.info.setdefault('query_start', []).append(time.time())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context,
+                          executemany):
+    starts = conn.info.get('query_start')
+    if not starts:
+        return
+    duration = time.time() - starts.pop()
+    verb = statement.split(None, 1)[0].upper() if statement else 'UNKNOWN'
+    QUERIES.inc(statement=verb)
+    QUERY_LATENCY.observe(duration, statement=verb)
+    profiler.record(statement, duration)
+
+
+def instrument_engine(engine):
+    """Count and time the statements executed on the engine."""
+    event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+
 
 def get_facade():
     global _FACADE
 
     if not _FACADE:
         _FACADE = session.EngineFacade.from_config(cfg.CONF)
+        engine = _FACADE.get_engine()
+        instrument_engine(engine)
+        slave_engine = _FACADE.get_engine(use_slave=True)
+        if slave_engine is not engine:
+            instrument_engine(slave_engine)
     return _FACADE
 
 get_engine = lambda: get_facade().get_engine()
-get_session = lambda: get_facade().get_session()
+
+
+def get_session():
+    facade = get_facade()
+    use_slave = (getattr(_LOCAL, 'use_slave', False) and
+                 bool(cfg.CONF.database.slave_connection))
+    SESSIONS.inc(target='replica' if use_slave else 'primary')
+    return facade.get_session(use_slave=use_slave)
+
+
+def record_write(context):
+    """Note that the context's tenant wrote, for read-your-writes."""
+    tenant = getattr(context, 'tenant', None)
+    if tenant is None:
+        return
+    now = time.time()
+    if len(_LAST_WRITE) >= _LAST_WRITE_PRUNE_SIZE:
+        window = cfg.CONF.database.read_your_writes_window
+        for key, written in list(_LAST_WRITE.items()):
+            if now - written > window:
+                _LAST_WRITE.pop(key, None)
+    _LAST_WRITE[tenant] = now
+
+
+def _wrote_recently(tenant):
+    written = _LAST_WRITE.get(tenant)
+    return (written is not None and
+            time.time() - written <= cfg.CONF.database.read_your_writes_window)
+
+
+@contextlib.contextmanager
+def replica_reads(context):
+    """Serve the sessions of the block from the replica, if there is one.
+
+    Tenants that wrote in the last read_your_writes_window seconds keep
+    reading from the primary so that they see their own changes.
+    """
+    previous = getattr(_LOCAL, 'use_slave', False)
+    _LOCAL.use_slave = not _wrote_recently(getattr(context, 'tenant', None))
+    try:
+        yield
+    finally:
+        _LOCAL.use_slave = previous
+
+
+@contextlib.contextmanager
+def primary():
+    """Serve the sessions of the block from the primary."""
+    previous = getattr(_LOCAL, 'use_slave', False)
+    _LOCAL.use_slave = False
+    try:
+        yield
+    finally:
+        _LOCAL.use_slave = previous
 
 
 def get_backend():
@@ -44,9 +44,14 @@ class Assembly(sql.Base, abstract.Assembly):
     username = sa.Column(sa.String(256))
     workflow = sa.Column(sql.YAMLEncodedDict(1024))
     image_id = sa.Column(sa.Integer)
+    version = sa.Column(sa.Integer, nullable=False, server_default='1')
+
+    # Updates check the version they read, so a concurrent change raises
+    # StaleDataError, which is retried, instead of being overwritten.
+    __mapper_args__ = {'version_id_col': version}
 
     def _non_updatable_fields(self):
-        return set(('uuid', 'id', 'project_id'))
+        return set(('uuid', 'id', 'project_id', 'version'))
 
     def _is_updatable(self):
         if self.status == ASSEMBLY_STATES.DELETING:
@@ -54,6 +59,11 @@ class Assembly(sql.Base, abstract.Assembly):
         else:
             return True
 
+    @classmethod
+    def _updatable_criterion(cls):
+        return sa.or_(cls.status.is_(None),
+                      cls.status != ASSEMBLY_STATES.DELETING)
+
     @property
     def plan_uuid(self):
         return objects.registry.Plan.get_by_id(None, self.plan_id).uuid
@@ -75,7 +85,7 @@ class Assembly(sql.Base, abstract.Assembly):
 
     @retry
     def destroy(self, context):
-        session = sql.Base.get_session()
+        session = sql.Base.get_write_session(context)
         with session.begin():
             session.query(component.Component).filter_by(
                 assembly_id=self.id).delete()
@@ -88,6 +98,27 @@ class Assembly(sql.Base, abstract.Assembly):
         return session.query(component.Component).filter_by(
             assembly_id=self.id, component_type='heat_stack').first()
 
+    @classmethod  # Must be top most
+    @retry
+    def move_heat_stack(cls, context, from_id, to_id):
+        """Hand the heat stack of one assembly over to another.
+
+        Return whether it was moved. Nothing is moved if the receiving
+        assembly already has a stack or either of them is being deleted.
+        """
+        session = sql.Base.get_write_session(context)
+        stacks = session.query(component.Component).filter_by(
+            component_type='heat_stack')
+        with session.begin():
+            live = sql.filter_by_project(context, session.query(cls.id).filter(
+                cls.id.in_([from_id, to_id]), cls._updatable_criterion()))
+            if live.count() != 2:
+                return False
+            if stacks.filter_by(assembly_id=to_id).first() is not None:
+                return False
+            return stacks.filter_by(assembly_id=from_id).update(
+                {'assembly_id': to_id}, synchronize_session=False) > 0
+
 
 class AssemblyList(abstract.AssemblyList):
     """Represent a list of assemblies in sqlalchemy."""
@@ -12,10 +12,14 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import threading
+import time
+
 from oslo.config import cfg
 import sqlalchemy as sa
 from sqlalchemy.orm import exc
 
+from solum.common import metrics
 from solum.objects import image as abstract
 from solum.objects.sqlalchemy import models as sql
 from solum.openstack.common import uuidutils
@@ -23,9 +27,55 @@ from solum.openstack.common import uuidutils
 cfg.CONF.import_opt('operator_project_id',
                     'solum.api.handlers.language_pack_handler',
                     group='api')
+cfg.CONF.import_opt('operator_lp_cache_ttl',
+                    'solum.api.handlers.language_pack_handler',
+                    group='api')
 
 operator_id = cfg.CONF.api.operator_project_id
 
+_lock = threading.Lock()
+# (generation, expiry time, detached READY operator LPs)
+_operator_lps = (0, 0, [])
+
+
+def _ready_operator_lps():
+    """Return the READY language packs of the operator, cached."""
+    global _operator_lps
+    generation, expires, lps = _operator_lps
+    now = time.time()
+    if expires > now:
+        metrics.record_cache('operator_language_packs', True)
+        return lps
+
+    metrics.record_cache('operator_language_packs', False)
+    session = Image.get_session()
+    lps = session.query(Image).filter_by(
+        artifact_type='language_pack', status='READY',
+        project_id=operator_id).all()
+    for lp in lps:
+        session.expunge(lp)
+    ttl = cfg.CONF.api.operator_lp_cache_ttl
+    if ttl > 0:
+        with _lock:
+            # Not cached if invalidated while loading.
+            if _operator_lps[0] == generation:
+                _operator_lps = (generation, now + ttl, lps)
+    return lps
+
+
+def invalidate_operator_lps():
+    """Forget the cached operator language packs of this process."""
+    global _operator_lps
+    with _lock:
+        _operator_lps = (_operator_lps[0] + 1, 0, [])
+
+
+def _own_or_operators(context, query):
+    """Return the tenant's row of the query, or else the operator's."""
+    return query.filter(
+        Image.project_id.in_([operator_id, context.tenant])).order_by(
+        sa.case([(Image.project_id == context.tenant, 0)], else_=1)).first()
+
 
 class Image(sql.Base, abstract.Image):
     """Represent a image in sqlalchemy."""
@@ -50,6 +100,9 @@ class Image(sql.Base, abstract.Image):
     artifact_type = sa.Column(sa.String(36))
     external_ref = sa.Column(sa.String(1024))
     docker_image_name = sa.Column(sa.String(512))
+    version = sa.Column(sa.Integer, nullable=False, server_default='1')
+
+    __mapper_args__ = {'version_id_col': version}
 
     @classmethod
     def get_lp_by_name_or_uuid(cls, context, name_or_uuid,
@@ -78,9 +131,12 @@ class Image(sql.Base, abstract.Image):
             result = session.query(cls).filter_by(
                 artifact_type='language_pack', name=name)
             if include_operators_lp is True:
-                result = result.filter(
-                    Image.project_id.in_([operator_id, context.tenant]))
-                return result.one()
+                # The tenant's own language pack wins over an operator one
+                # of the same name.
+                lp = _own_or_operators(context, result)
+                if lp is None:
+                    raise exc.NoResultFound()
+                return lp
             else:
                 return sql.filter_by_project(context, result).one()
         except exc.NoResultFound:
@@ -92,18 +148,20 @@ class Image(sql.Base, abstract.Image):
         session = Image.get_session()
         result = session.query(cls)
         result = result.filter_by(artifact_type='language_pack')
-        result = sql.filter_by_project(context, result)
+        result = sql.filter_by_project(context, result).all()
 
         # Include Languagepacks that have been created by the operator, and
         # are in the 'READY' state.
         # The operator LP is identified based on the operator_project_id
         # config setting in solum.conf
-        oper_result = session.query(cls)
-        oper_result = oper_result.filter_by(artifact_type='language_pack')
-        oper_result = oper_result.filter_by(status='READY')
-        oper_result = oper_result.filter_by(project_id=operator_id)
+        ids = set(lp.id for lp in result)
+        return result + [lp for lp in _ready_operator_lps()
+                         if lp.id not in ids]
 
-        return result.union(oper_result).all()
+    @classmethod
+    def invalidate_operator_lps(cls):
+        """Forget the cached operator language packs of this process."""
+        invalidate_operator_lps()
 
 
 class ImageList(abstract.ImageList):
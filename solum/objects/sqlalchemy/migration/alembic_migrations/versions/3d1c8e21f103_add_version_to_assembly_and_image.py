@@ -0,0 +1,41 @@
+# Copyright 2015 - Rackspace
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Add version to assembly and image tables
+
+Revision ID: 3d1c8e21f103
+Revises: 1393c21ea82c
+Create Date: 2015-06-15 10:12:03.518204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '3d1c8e21f103'
+down_revision = '1393c21ea82c'
+
+
+def upgrade():
+    op.add_column('assembly',
+                  sa.Column('version', sa.Integer, nullable=False,
+                            server_default='1'))
+    op.add_column('image',
+                  sa.Column('version', sa.Integer, nullable=False,
+                            server_default='1'))
+
+
+def downgrade():
+    op.drop_column('assembly', 'version')
+    op.drop_column('image', 'version')
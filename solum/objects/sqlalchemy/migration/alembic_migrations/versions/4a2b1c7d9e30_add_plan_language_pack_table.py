@@ -0,0 +1,67 @@
+# Copyright 2015 - Rackspace
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Add plan_language_pack table
+
+Revision ID: 4a2b1c7d9e30
+Revises: 3d1c8e21f103
+Create Date: 2015-06-22 14:40:51.207415
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from solum.objects.sqlalchemy import models
+from solum.objects.sqlalchemy import plan
+from solum.openstack.common import timeutils
+
+# revision identifiers, used by Alembic.
+revision = '4a2b1c7d9e30'
+down_revision = '3d1c8e21f103'
+
+
+def upgrade():
+    reference = op.create_table(
+        'plan_language_pack',
+        sa.Column('id', sa.Integer, primary_key=True, nullable=False),
+        sa.Column('plan_id', sa.Integer, sa.ForeignKey('plan.id'),
+                  nullable=False),
+        sa.Column('project_id', sa.String(length=36)),
+        sa.Column('language_pack', sa.String(length=255), nullable=False),
+        sa.Column('created_at', sa.DateTime, default=timeutils.utcnow),
+        sa.Column('updated_at', sa.DateTime, onupdate=timeutils.utcnow),
+        )
+    op.create_index('ix_plan_language_pack_plan_id', 'plan_language_pack',
+                    ['plan_id'])
+    op.create_index('ix_plan_language_pack_language_pack',
+                    'plan_language_pack', ['language_pack'])
+
+    # Reference the language packs of the existing plans.
+    plans = sa.sql.table('plan',
+                         sa.sql.column('id', sa.Integer),
+                         sa.sql.column('project_id', sa.String),
+                         sa.sql.column('raw_content',
+                                       models.YAMLEncodedDict(2048)))
+    now = timeutils.utcnow()
+    rows = []
+    for row in op.get_bind().execute(sa.select([plans])):
+        for lp in plan.language_packs(row.raw_content):
+            rows.append({'plan_id': row.id, 'project_id': row.project_id,
+                         'language_pack': lp, 'created_at': now})
+    if rows:
+        op.bulk_insert(reference, rows)
+
+
+def downgrade():
+    op.drop_table('plan_language_pack')
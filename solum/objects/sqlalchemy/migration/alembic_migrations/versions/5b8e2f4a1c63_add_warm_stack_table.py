@@ -0,0 +1,50 @@
+# Copyright 2015 - Rackspace
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Add warm_stack table
+
+Revision ID: 5b8e2f4a1c63
+Revises: 4a2b1c7d9e30
+Create Date: 2015-07-06 11:12:37.518304
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from solum.openstack.common import timeutils
+
+# revision identifiers, used by Alembic.
+revision = '5b8e2f4a1c63'
+down_revision = '4a2b1c7d9e30'
+
+
+def upgrade():
+    op.create_table(
+        'warm_stack',
+        sa.Column('id', sa.Integer, primary_key=True, nullable=False),
+        sa.Column('project_id', sa.String(length=36), nullable=False),
+        sa.Column('flavor', sa.String(length=255), nullable=False),
+        sa.Column('image', sa.String(length=255), nullable=False),
+        sa.Column('heat_stack_id', sa.String(length=36)),
+        sa.Column('stack_name', sa.String(length=255), nullable=False),
+        sa.Column('resource_uri', sa.String(length=1024)),
+        sa.Column('created_at', sa.DateTime, default=timeutils.utcnow),
+        sa.Column('updated_at', sa.DateTime, onupdate=timeutils.utcnow),
+        )
+    op.create_index('ix_warm_stack_project_id_flavor_image', 'warm_stack',
+                    ['project_id', 'flavor', 'image'])
+
+
+def downgrade():
+    op.drop_table('warm_stack')
@@ -18,6 +18,7 @@ SQLAlchemy models for application data.
 
 import functools
 import json
+import random
 import time
 
 from oslo.config import cfg
@@ -31,30 +32,71 @@ from sqlalchemy.orm import exc as orm_exc
 from sqlalchemy import types
 
 from solum.common import exception
+from solum.common import metrics
 from solum.common import yamlutils
 from solum import objects
 from solum.objects import sqlalchemy as object_sqla
 from solum.openstack.common import log as logging
+from solum.openstack.common import timeutils
 from solum.openstack.common import uuidutils
 
 LOG = logging.getLogger(__name__)
 
 
+RETRY_OPTS = [
+    cfg.IntOpt('deadlock_max_retries',
+               default=3,
+               help='Attempts made at a DB call that hit a deadlock or a '
+                    'concurrent update. At least one is always made.'),
+    cfg.FloatOpt('deadlock_retry_interval',
+                 default=0.05,
+                 help='Base of the exponential backoff between those '
+                      'attempts, in seconds.'),
+    cfg.FloatOpt('deadlock_max_retry_interval',
+                 default=2.0,
+                 help='Longest backoff between those attempts, in seconds.'),
+]
+
+cfg.CONF.register_opts(RETRY_OPTS, group='database')
+
+RETRIES = metrics.counter('solum_db_retries_total',
+                          'DB calls retried by call and error.')
+RETRIES_EXHAUSTED = metrics.counter('solum_db_retries_exhausted_total',
+                                    'DB calls that failed on every attempt.')
+
+
+def _backoff(tries):
+    """Return a full-jitter exponential delay for the given attempt.
+
+    Randomizing the whole delay keeps the callers that collided once from
+    colliding again on every retry.
+    """
+    conf = cfg.CONF.database
+    ceiling = min(conf.deadlock_max_retry_interval,
+                  conf.deadlock_retry_interval * (2 ** tries))
+    return random.uniform(0, ceiling)
+
+
 def retry(fun):
     """Decorator to retry a DB call if certain exception was received."""
     @functools.wraps(fun)
     def _wrapper(*args, **kwargs):
-        max_retries = kwargs.pop('max_retries', 3)
+        # The call is made at least once, however it is configured.
+        max_retries = max(1, kwargs.pop(
+            'max_retries', cfg.CONF.database.deadlock_max_retries))
         for tries in range(max_retries):
             try:
                 return fun(*args, **kwargs)
-            except (db_exc.DBDeadlock, orm_exc.StaleDataError):
+            except (db_exc.DBDeadlock, orm_exc.StaleDataError) as ex:
                 LOG.warning("Failed DB call %s. Retrying %s more times." %
                             (fun.__name__, max_retries - tries - 1))
                 if tries + 1 >= max_retries:
+                    RETRIES_EXHAUSTED.inc(call=fun.__name__)
                     raise
-
-                time.sleep(0.5)
+                RETRIES.inc(call=fun.__name__, error=type(ex).__name__)
+                # time is green in all the services, so this only parks the
+                # current green thread.
+                time.sleep(_backoff(tries))
     return _wrapper
 
 
@@ -118,6 +160,13 @@ class SolumBase(models.TimestampMixin, models.ModelBase):
     def get_session(cls):
         return object_sqla.get_session()
 
+    @classmethod
+    def get_write_session(cls, context):
+        """Return a primary session for a write on behalf of context."""
+        object_sqla.record_write(context)
+        with object_sqla.primary():
+            return SolumBase.get_session()
+
     @classmethod
     def get_by_id(cls, context, item_id):
         try:
@@ -144,7 +193,7 @@ class SolumBase(models.TimestampMixin, models.ModelBase):
             raise exception.ObjectNotUnique(name=cls.__tablename__)
 
     def _non_updatable_fields(self):
-        return set(('uuid', 'id'))
+        return set(('uuid', 'id', 'version'))
 
     def _lazyhasattr(self, name):
         return any(name in d for d in (self.__dict__,
@@ -153,17 +202,83 @@ class SolumBase(models.TimestampMixin, models.ModelBase):
     def _is_updatable(self):
         return True
 
+    def _save_derived(self, session):
+        """Write rows derived from this object in its transaction."""
+        pass
+
     def update(self, data):
         for field in set(six.iterkeys(data)) - self._non_updatable_fields():
             if self._lazyhasattr(field):
                 setattr(self, field, data[field])
 
+    @classmethod
+    def _updatable_criterion(cls):
+        """Return the SQL form of _is_updatable(), None if always true."""
+        return None
+
+    @classmethod
+    def _in_place_values(cls, data):
+        """Return the column values to UPDATE for data.
+
+        Return None when data sets something other than plain columns, such
+        as a property, which only the ORM path can apply.
+        """
+        columns = cls.__table__.columns
+        skipped = cls()._non_updatable_fields()
+        values = {}
+        for field, value in six.iteritems(data):
+            if field in skipped:
+                continue
+            if field in columns:
+                values[field] = value
+            elif field in cls.__dict__:
+                return None
+        return values
+
+    @classmethod
+    def update_in_place(cls, context, id_or_uuid, data):
+        """Apply data with a single UPDATE statement.
+
+        Return whether a row was updated; rows that do not exist, belong to
+        another project or are not updatable are left alone. Falls back to
+        update_and_save() when the model needs the ORM to apply data.
+        """
+        values = cls._in_place_values(data)
+        if values is None:
+            try:
+                return cls.update_and_save(context, id_or_uuid,
+                                           data)._is_updatable()
+            except exception.ResourceNotFound:
+                return False
+        if not values:
+            return False
+        return cls._update_row(context, id_or_uuid, values)
+
+    @classmethod  # Must be top most
+    @retry
+    def _update_row(cls, context, id_or_uuid, values):
+        values = dict(values, updated_at=timeutils.utcnow())
+        if 'version' in cls.__table__.columns:
+            values['version'] = cls.version + 1
+
+        session = SolumBase.get_write_session(context)
+        with session.begin():
+            if uuidutils.is_uuid_like(id_or_uuid):
+                query = session.query(cls).filter_by(uuid=id_or_uuid)
+            else:
+                query = session.query(cls).filter_by(id=id_or_uuid)
+            query = filter_by_project(context, query)
+            criterion = cls._updatable_criterion()
+            if criterion is not None:
+                query = query.filter(criterion)
+            return query.update(values, synchronize_session=False) > 0
+
     @classmethod  # Must be top most
     @retry
     def update_and_save(cls, context, id_or_uuid, data):
         is_uuid = uuidutils.is_uuid_like(id_or_uuid)
         try:
-            session = SolumBase.get_session()
+            session = SolumBase.get_write_session(context)
             with session.begin():
                 if is_uuid:
                     query = session.query(cls).filter_by(uuid=id_or_uuid)
@@ -173,6 +288,7 @@ class SolumBase(models.TimestampMixin, models.ModelBase):
                 if obj._is_updatable():
                     obj.update(data)
                     session.merge(obj)
+                    obj._save_derived(session)
             return obj
         except orm_exc.NoResultFound:
             cls._raise_not_found(id_or_uuid)
@@ -182,21 +298,22 @@ class SolumBase(models.TimestampMixin, models.ModelBase):
         if objects.transition_schema():
             self.add_forward_schema_changes()
 
-        session = SolumBase.get_session()
+        session = SolumBase.get_write_session(context)
         with session.begin():
-            session.merge(self)
+            session.merge(self)._save_derived(session)
 
     def create(self, context):
-        session = SolumBase.get_session()
+        session = SolumBase.get_write_session(context)
         try:
             with session.begin():
                 session.add(self)
+                self._save_derived(session)
         except (db_exc.DBDuplicateEntry):
             self.__class__._raise_duplicate_object()
 
     @retry
     def destroy(self, context):
-        session = SolumBase.get_session()
+        session = SolumBase.get_write_session(context)
         with session.begin():
             session.query(self.__class__).filter_by(
                 id=self.id).delete()
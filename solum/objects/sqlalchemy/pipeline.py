@@ -85,7 +85,7 @@ class Pipeline(sql.Base, abstract.Pipeline):
             pipeline_id=self.id).all()
 
     def destroy(self, context):
-        session = sql.Base.get_session()
+        session = sql.Base.get_write_session(context)
         with session.begin():
             session.query(execution.Execution).filter_by(
                 pipeline_id=self.id).delete()
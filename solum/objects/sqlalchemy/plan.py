@@ -12,6 +12,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import six
 import sqlalchemy as sa
 
 from solum.common import exception
@@ -19,6 +20,33 @@ from solum.objects import plan as abstract
 from solum.objects.sqlalchemy import models as sql
 
 
+def language_packs(raw_content):
+    """Return the language packs the artifacts of a plan refer to."""
+    lps = set()
+    for artifact in (raw_content or {}).get('artifacts') or []:
+        lp = isinstance(artifact, dict) and artifact.get('language_pack')
+        if lp and isinstance(lp, six.string_types):
+            lps.add(lp)
+    return lps
+
+
+class PlanLanguagePack(sql.Base):
+    """A language pack, by name or uuid, that a plan refers to.
+
+    Maintained from the plan's raw_content whenever the plan is written,
+    so that finding the plans using a language pack is an indexed lookup.
+    """
+
+    __tablename__ = 'plan_language_pack'
+    __table_args__ = sql.table_args()
+
+    id = sa.Column(sa.Integer, primary_key=True, autoincrement=True)
+    plan_id = sa.Column(sa.Integer, sa.ForeignKey('plan.id'),
+                        nullable=False, index=True)
+    project_id = sa.Column(sa.String(36))
+    language_pack = sa.Column(sa.String(255), nullable=False, index=True)
+
+
 class Plan(sql.Base, abstract.Plan):
     """Represent a plan in sqlalchemy."""
 
@@ -50,9 +78,42 @@ class Plan(sql.Base, abstract.Plan):
         except sa.orm.exc.NoResultFound:
             cls._raise_trigger_not_found(trigger_id)
 
+    @classmethod
+    def language_pack_in_use(cls, context, names):
+        """Return whether a plan of the project refers to any of names."""
+        query = sql.model_query(context, PlanLanguagePack).filter(
+            PlanLanguagePack.language_pack.in_(list(names)))
+        return query.first() is not None
+
     def _non_updatable_fields(self):
         return set(('uuid', 'id', 'project_id'))
 
+    @classmethod
+    def _in_place_values(cls, data):
+        if 'raw_content' in data:
+            # The language pack references are derived from it.
+            return None
+        return super(Plan, cls)._in_place_values(data)
+
+    def _save_derived(self, session):
+        # The plan id is needed for the references of a new plan.
+        session.flush()
+        session.query(PlanLanguagePack).filter_by(
+            plan_id=self.id).delete(synchronize_session=False)
+        for lp in language_packs(self.raw_content):
+            session.add(PlanLanguagePack(plan_id=self.id,
+                                         project_id=self.project_id,
+                                         language_pack=lp))
+
+    @sql.retry
+    def destroy(self, context):
+        session = sql.Base.get_write_session(context)
+        with session.begin():
+            session.query(PlanLanguagePack).filter_by(
+                plan_id=self.id).delete()
+            session.query(self.__class__).filter_by(
+                id=self.id).delete()
+
     def refined_content(self):
         if self.raw_content and self.uuid:
             self.raw_content['uuid'] = self.uuid
@@ -0,0 +1,175 @@
+# Copyright 2014 - Rackspace Hosting
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""Per-request SQL query profiler.
+
+Statements are attributed to the profile active in the current thread, if
+any. Profiles are started around API requests and RPC messages when
+[db_profiler] enabled is set, and can be used directly in tests to assert
+query budgets:
+
+    with profiler.profile(max_queries=2) as prof:
+        objects.registry.Assembly.get_by_uuid(ctxt, uuid)
+"""
+
+import contextlib
+import functools
+import os
+import threading
+import traceback
+
+from oslo.config import cfg
+
+from solum.common import metrics
+from solum.openstack.common import log as logging
+
+LOG = logging.getLogger(__name__)
+
+PROFILER_OPTS = [
+    cfg.BoolOpt('enabled',
+                default=False,
+                help='Profile the SQL statements issued by each API request '
+                     'and RPC message.'),
+    cfg.FloatOpt('slow_query_threshold',
+                 default=0.5,
+                 help='Statements taking longer than this many seconds are '
+                      'logged with the code that issued them.'),
+    cfg.IntOpt('stack_depth',
+               default=5,
+               help='Number of Solum stack frames logged for slow '
+                    'statements.'),
+]
+
+opt_group = cfg.OptGroup(name='db_profiler',
+                         title='Options for the SQL query profiler')
+cfg.CONF.register_group(opt_group)
+cfg.CONF.register_opts(PROFILER_OPTS, opt_group)
+
+QUERIES_PER_REQUEST = metrics.histogram(
+    'solum_db_queries_per_request', 'Statements issued per profiled request.',
+    buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500))
+SLOW_QUERIES = metrics.counter('solum_db_slow_queries_total',
+                               'Statements slower than the slow threshold.')
+
+_SOLUM_DIR = os.path.dirname(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))))
+
+# The profiler's own frames and the engine event handler feeding it.
+_IGNORED_FRAMES = ('_origin', 'record', '_after_cursor_execute')
+
+_LOCAL = threading.local()
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+class QueryProfile(object):
+    def __init__(self, request_id=None):
+        self.request_id = request_id
+        self.query_count = 0
+        self.total_time = 0.0
+        self.slow_queries = []
+
+    def record(self, statement, duration):
+        self.query_count += 1
+        self.total_time += duration
+        if duration >= cfg.CONF.db_profiler.slow_query_threshold:
+            self.slow_queries.append({'statement': statement,
+                                      'duration': duration,
+                                      'origin': _origin()})
+
+    def __repr__(self):
+        return ('<QueryProfile %s: %d queries in %.3fs, %d slow>' %
+                (self.request_id, self.query_count, self.total_time,
+                 len(self.slow_queries)))
+
+
+def _origin():
+    """Return the innermost Solum frames that issued a statement."""
+    frames = [f for f in traceback.extract_stack()
+              if f[0].startswith(_SOLUM_DIR) and
+              f[2] not in _IGNORED_FRAMES]
+    depth = cfg.CONF.db_profiler.stack_depth
+    return ['%s:%d in %s' % (os.path.relpath(f[0], _SOLUM_DIR), f[1], f[2])
+            for f in frames[-depth:]]
+
+
+def current():
+    return getattr(_LOCAL, 'profile', None)
+
+
+def record(statement, duration):
+    """Attribute a statement to the active profile, if there is one."""
+    prof = current()
+    if prof is not None:
+        prof.record(statement, duration)
+
+
+def start(request_id=None):
+    prof = QueryProfile(request_id)
+    _LOCAL.profile = prof
+    return prof
+
+
+def stop():
+    prof = current()
+    _LOCAL.profile = None
+    if prof is None:
+        return None
+
+    QUERIES_PER_REQUEST.observe(prof.query_count)
+    if prof.slow_queries:
+        SLOW_QUERIES.inc(len(prof.slow_queries))
+    if cfg.CONF.db_profiler.enabled:
+        LOG.info("Request %s issued %d queries in %.3fs" %
+                 (prof.request_id, prof.query_count, prof.total_time))
+        for slow in prof.slow_queries:
+            LOG.warn("Slow query (%.3fs) in request %s from %s: %s" %
+                     (slow['duration'], prof.request_id,
+                      ' <- '.join(reversed(slow['origin'])),
+                      slow['statement']))
+    return prof
+
+
+@contextlib.contextmanager
+def profile(request_id=None, max_queries=None):
+    """Profile the enclosed block, optionally enforcing a query budget."""
+    prof = start(request_id)
+    try:
+        yield prof
+    finally:
+        stop()
+    if max_queries is not None and prof.query_count > max_queries:
+        raise QueryBudgetExceeded("%d queries issued, budget was %d" %
+                                  (prof.query_count, max_queries))
+
+
+class ProfiledEndpoint(object):
+    """Profile the SQL statements issued while handling RPC messages."""
+
+    def __init__(self, endpoint):
+        self._endpoint = endpoint
+
+    def __getattr__(self, name):
+        attr = getattr(self._endpoint, name)
+        if (name.startswith('_') or not callable(attr) or
+                not cfg.CONF.db_profiler.enabled):
+            return attr
+
+        @functools.wraps(attr)
+        def wrapper(ctxt, *args, **kwargs):
+            with profile(getattr(ctxt, 'request_id', None)):
+                return attr(ctxt, *args, **kwargs)
+        return wrapper
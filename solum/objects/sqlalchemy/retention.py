@@ -0,0 +1,139 @@
+# Copyright 2014 - Rackspace Hosting
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""Batched queries used to purge historical rows.
+
+Every function works on at most `limit` rows and every delete runs in its
+own short transaction, so purging never holds long locks.
+
+A cutoff policy is a (default_cutoff, {project_id: cutoff}) tuple; rows
+created before the cutoff of their project are eligible.
+"""
+
+import sqlalchemy as sa
+
+from solum.objects.sqlalchemy import assembly
+from solum.objects.sqlalchemy import component
+from solum.objects.sqlalchemy import image
+from solum.objects.sqlalchemy import models as sql
+from solum.objects.sqlalchemy import plan
+from solum.objects.sqlalchemy import userlog
+
+
+def _expired(model, policy):
+    default_cutoff, tenant_cutoffs = policy
+    clauses = [sa.and_(model.project_id == project_id,
+                       model.created_at < cutoff)
+               for project_id, cutoff in tenant_cutoffs.items()]
+    default = model.created_at < default_cutoff
+    if tenant_cutoffs:
+        default = sa.and_(~model.project_id.in_(list(tenant_cutoffs)),
+                          default)
+    clauses.append(default)
+    return sa.or_(*clauses)
+
+
+def _has_stack():
+    return sa.exists().where(sa.and_(
+        component.Component.assembly_id == assembly.Assembly.id,
+        component.Component.component_type == 'heat_stack'))
+
+
+def _expired_assembly_ids(session, policy, statuses, limit):
+    return [row.id for row in session.query(assembly.Assembly.id).filter(
+        assembly.Assembly.status.in_(statuses),
+        _expired(assembly.Assembly, policy),
+        ~_has_stack()).limit(limit)]
+
+
+@sql.retry
+def purge_assemblies(policy, statuses, limit):
+    """Delete expired assemblies in the given states and their components.
+
+    Assemblies that still have a heat stack are left for the deployer to
+    tear down. Return the number of assemblies deleted.
+    """
+    session = sql.Base.get_session()
+    ids = _expired_assembly_ids(session, policy, statuses, limit)
+    if not ids:
+        return 0
+    with session.begin():
+        # Locked and checked again in case an assembly was picked up since
+        # it was selected, so that none loses its components.
+        ids = [row.id for row in session.query(assembly.Assembly.id).filter(
+            assembly.Assembly.id.in_(ids),
+            assembly.Assembly.status.in_(statuses),
+            ~_has_stack()).with_lockmode('update')]
+        if not ids:
+            return 0
+        session.query(component.Component).filter(
+            component.Component.assembly_id.in_(ids)).delete(
+            synchronize_session=False)
+        return session.query(assembly.Assembly).filter(
+            assembly.Assembly.id.in_(ids)).delete(
+            synchronize_session=False)
+
+
+def orphaned_images(policy, limit, after_id=0):
+    """Return expired deployment images no assembly refers to."""
+    session = sql.Base.get_session()
+    referenced = sa.exists().where(
+        assembly.Assembly.image_id == image.Image.id)
+    return session.query(image.Image).filter(
+        image.Image.id > after_id,
+        sa.or_(image.Image.artifact_type.is_(None),
+               image.Image.artifact_type != 'language_pack'),
+        _expired(image.Image, policy),
+        ~referenced).order_by(image.Image.id).limit(limit).all()
+
+
+def orphaned_userlogs(policy, limit, after_id=0):
+    """Return expired userlogs whose assembly or image is gone."""
+    session = sql.Base.get_session()
+    assembly_exists = sa.exists().where(
+        assembly.Assembly.uuid == userlog.Userlog.resource_uuid)
+    image_exists = sa.exists().where(
+        image.Image.uuid == userlog.Userlog.resource_uuid)
+    return session.query(userlog.Userlog).filter(
+        userlog.Userlog.id > after_id,
+        _expired(userlog.Userlog, policy),
+        ~assembly_exists, ~image_exists).order_by(
+        userlog.Userlog.id).limit(limit).all()
+
+
+@sql.retry
+def delete_rows(model, ids):
+    """Delete rows of a model by id in one transaction."""
+    if not ids:
+        return 0
+    session = sql.Base.get_session()
+    with session.begin():
+        return session.query(model).filter(model.id.in_(ids)).delete(
+            synchronize_session=False)
+
+
+def delete_images(ids):
+    return delete_rows(image.Image, ids)
+
+
+def delete_userlogs(ids):
+    return delete_rows(userlog.Userlog, ids)
+
+
+def trusted_plan(project_id):
+    """Return a plan of the project carrying a trust, if there is one."""
+    session = sql.Base.get_session()
+    return session.query(plan.Plan).filter(
+        plan.Plan.project_id == project_id,
+        plan.Plan.trust_id.isnot(None)).first()
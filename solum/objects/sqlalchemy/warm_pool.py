@@ -0,0 +1,129 @@
+# Copyright 2014 - Rackspace Hosting
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""Stacks the deployer created ahead of any assembly, waiting to be claimed.
+
+A row is reserved before its stack is created and gets the stack id once
+Heat has accepted it, so that no pool stack exists without a row. A row
+is taken out of the pool by deleting it, so that a stack is only ever
+handed to one deployer, whether it claims or reaps it.
+"""
+
+import sqlalchemy as sa
+
+from solum.objects.sqlalchemy import models as sql
+
+
+class WarmStack(sql.Base):
+    """A booted stack of a tenant waiting for a deployment unit."""
+
+    __tablename__ = 'warm_stack'
+    __table_args__ = (sa.Index('ix_warm_stack_project_id_flavor_image',
+                               'project_id', 'flavor', 'image'),
+                      sql.table_args() or {})
+
+    id = sa.Column(sa.Integer, primary_key=True, autoincrement=True)
+    project_id = sa.Column(sa.String(36), nullable=False)
+    flavor = sa.Column(sa.String(255), nullable=False)
+    image = sa.Column(sa.String(255), nullable=False)
+    # Unset while the stack is being created.
+    heat_stack_id = sa.Column(sa.String(36))
+    stack_name = sa.Column(sa.String(255), nullable=False)
+    resource_uri = sa.Column(sa.String(1024))
+
+
+def _available(session, project_id, flavor, image, since):
+    return session.query(WarmStack).filter(
+        WarmStack.project_id == project_id,
+        WarmStack.flavor == flavor,
+        WarmStack.image == image,
+        WarmStack.created_at >= since)
+
+
+@sql.retry
+def reserve(project_id, flavor, image, stack_name):
+    """Record a stack about to be created; return the id of its row."""
+    row = WarmStack(project_id=project_id, flavor=flavor, image=image,
+                    stack_name=stack_name)
+    session = sql.Base.get_session()
+    with session.begin():
+        session.add(row)
+    return row.id
+
+
+@sql.retry
+def set_stack(row_id, heat_stack_id, resource_uri):
+    """Record the stack of a reserved row; return whether it was there."""
+    session = sql.Base.get_session()
+    with session.begin():
+        return session.query(WarmStack).filter_by(id=row_id).update(
+            {'heat_stack_id': heat_stack_id, 'resource_uri': resource_uri},
+            synchronize_session=False) > 0
+
+
+@sql.retry
+def put_back(row):
+    """Return a taken row to the pool, keeping its age."""
+    session = sql.Base.get_session()
+    with session.begin():
+        session.add(WarmStack(project_id=row.project_id, flavor=row.flavor,
+                              image=row.image,
+                              heat_stack_id=row.heat_stack_id,
+                              stack_name=row.stack_name,
+                              resource_uri=row.resource_uri,
+                              created_at=row.created_at))
+
+
+def count(project_id, flavor, image, since):
+    """Return the number of stacks created since then, booting or not."""
+    session = sql.Base.get_session()
+    return _available(session, project_id, flavor, image, since).count()
+
+
+@sql.retry
+def take(row_id):
+    """Take a stack out of the pool; return whether this call got it."""
+    session = sql.Base.get_session()
+    with session.begin():
+        return session.query(WarmStack).filter_by(id=row_id).delete(
+            synchronize_session=False) > 0
+
+
+def claim(project_id, flavor, image, since):
+    """Take the oldest available stack out of the pool, if there is one."""
+    session = sql.Base.get_session()
+    candidates = _available(session, project_id, flavor, image, since).filter(
+        WarmStack.heat_stack_id.isnot(None)).order_by(
+        WarmStack.created_at).limit(5)
+    for row in candidates.all():
+        if take(row.id):
+            return row
+    return None
+
+
+def stale(flavor, image, before, limit, after_id=0, project_id=None):
+    """Return stacks created before then or for another flavor or image.
+
+    Stacks still being created are only stale once they are old.
+    """
+    session = sql.Base.get_session()
+    query = session.query(WarmStack).filter(
+        WarmStack.id > after_id,
+        sa.or_(WarmStack.created_at < before,
+               sa.and_(WarmStack.heat_stack_id.isnot(None),
+                       sa.or_(WarmStack.flavor != flavor,
+                              WarmStack.image != image))))
+    if project_id is not None:
+        query = query.filter(WarmStack.project_id == project_id)
+    return query.order_by(WarmStack.id).limit(limit).all()
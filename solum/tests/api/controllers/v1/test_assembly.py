@@ -16,6 +16,7 @@ import json
 
 import mock
 
+from solum.api import conditional
 from solum.api.controllers.v1 import assembly
 from solum.api.controllers.v1.datamodel import assembly as assemblymodel
 from solum.common import exception
@@ -51,6 +52,33 @@ class TestAssemblyController(base.BaseTestCase):
         hand_get.assert_called_with('test_id')
         self.assertEqual(200, resp_mock.status)
 
+    def test_assembly_get_not_modified(self, AssemblyHandler,
+                                       resp_mock, request_mock):
+        hand_get = AssemblyHandler.return_value.get
+        hand_get.return_value = fakes.FakeAssembly()
+        request_mock.headers = {'If-None-Match': '*'}
+        resp = assembly.AssemblyController('test_id').get()
+        self.assertIsNone(resp['result'])
+        self.assertEqual(304, resp_mock.status)
+
+    @mock.patch('solum.common.watch.wait_for_change')
+    def test_assembly_get_wait_for_change_timeout(self, wait_for_change,
+                                                  AssemblyHandler,
+                                                  resp_mock, request_mock):
+        fake_assembly = fakes.FakeAssembly()
+        AssemblyHandler.return_value.get.return_value = fake_assembly
+        wait_for_change.return_value = fake_assembly
+        request_mock.headers = {}
+        request_mock.host_url = 'http://localhost'
+        etag = conditional.resource_validators(fake_assembly)[0]
+        resp = assembly.AssemblyController('test_id').get(
+            wait_for_change='"%s"' % etag, timeout=5)
+        self.assertEqual(fake_assembly.id, wait_for_change.call_args[0][0])
+        self.assertEqual(etag, wait_for_change.call_args[0][3])
+        self.assertEqual(5, wait_for_change.call_args[0][4])
+        self.assertIsNone(resp['result'])
+        self.assertEqual(304, resp_mock.status)
+
     def test_assembly_get_not_found(self, AssemblyHandler,
                                     resp_mock, request_mock):
         hand_get = AssemblyHandler.return_value.get
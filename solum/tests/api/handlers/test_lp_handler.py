@@ -57,15 +57,16 @@ class TestLanguagePackHandler(base.BaseTestCase):
         fi.update.assert_called_once_with(data)
         fi.create.assert_called_once_with(self.ctx)
 
+    @mock.patch('solum.common.watch.notify_lp_changed')
     @mock.patch('solum.common.solum_swiftclient.SwiftClient.delete_object')
     @mock.patch('solum.api.handlers.userlog_handler.UserlogHandler')
-    @mock.patch('solum.objects.registry.PlanList')
-    def test_languagepack_delete(self, mock_planlist, mock_log_handler,
-                                 mock_swift_delete, mock_img):
+    @mock.patch('solum.objects.registry.Plan')
+    def test_languagepack_delete(self, mock_plan, mock_log_handler,
+                                 mock_swift_delete, mock_notify, mock_img):
         fi = fakes.FakeImage()
         mock_img.get_lp_by_name_or_uuid.return_value = fi
         mock_img.destroy.return_value = {}
-        mock_planlist.get_all.return_value = {}
+        mock_plan.language_pack_in_use.return_value = False
 
         handler = language_pack_handler.LanguagePackHandler(self.ctx)
         handler.delete('test_lp')
@@ -78,34 +79,39 @@ class TestLanguagePackHandler(base.BaseTestCase):
         log_handler = mock_log_handler.return_value
         log_handler.delete.assert_called_once_with(fi.uuid)
         fi.destroy.assert_called_once_with(self.ctx)
+        mock_img.invalidate_operator_lps.assert_called_once_with()
+        mock_notify.assert_called_once_with(self.ctx, fi.id)
 
-    @mock.patch('solum.objects.registry.PlanList')
-    def test_languagepack_delete_with_plan_using_lp(self, mock_planlist,
+    @mock.patch('solum.objects.registry.Plan')
+    def test_languagepack_delete_with_plan_using_lp(self, mock_plan,
                                                     mock_img):
         fi = fakes.FakeImage()
         fi.name = 'test_lp'
         mock_img.get_lp_by_name_or_uuid.return_value = fi
         mock_img.destroy.return_value = {}
-        mock_planlist.get_all.return_value = [fakes.FakePlan()]
+        mock_plan.language_pack_in_use.return_value = True
         handler = language_pack_handler.LanguagePackHandler(self.ctx)
         self.assertRaises(exc.LPStillReferenced, handler.delete, 'test_lp')
         mock_img.get_lp_by_name_or_uuid.assert_called_once_with(
             self.ctx, 'test_lp')
-        mock_planlist.get_all.assert_called_once()
+        mock_plan.language_pack_in_use.assert_called_once_with(
+            self.ctx, [fi.name, fi.uuid])
         assert not fi.destroy.called
 
+    @mock.patch('solum.common.watch.notify_lp_changed')
     @mock.patch('solum.common.solum_swiftclient.SwiftClient.delete_object')
     @mock.patch('solum.api.handlers.userlog_handler.UserlogHandler')
-    @mock.patch('solum.objects.registry.PlanList')
+    @mock.patch('solum.objects.registry.Plan')
     def test_languagepack_delete_with_plan_not_using_lp(self,
-                                                        mock_planlist,
+                                                        mock_plan,
                                                         mock_log_handler,
                                                         mock_swift_delete,
+                                                        mock_notify,
                                                         mock_img):
         fi = fakes.FakeImage()
         mock_img.get_lp_by_name_or_uuid.return_value = fi
         mock_img.destroy.return_value = {}
-        mock_planlist.get_all.return_value = [fakes.FakePlan()]
+        mock_plan.language_pack_in_use.return_value = False
 
         handler = language_pack_handler.LanguagePackHandler(self.ctx)
         handler.delete('lp_name')
@@ -115,7 +121,8 @@ class TestLanguagePackHandler(base.BaseTestCase):
         docker_image_name = fi.docker_image_name
         img_filename = docker_image_name.split('-', 1)[1]
         mock_swift_delete.assert_called_once_with('solum_lp', img_filename)
-        mock_planlist.get_all.assert_called_once()
+        mock_plan.language_pack_in_use.assert_called_once_with(
+            self.ctx, [fi.name, fi.uuid])
         log_handler = mock_log_handler.return_value
         log_handler.delete.assert_called_once_with(fi.uuid)
         fi.destroy.assert_called_once_with(self.ctx)
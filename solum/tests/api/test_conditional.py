@@ -0,0 +1,88 @@
+# Copyright 2014 - Rackspace Hosting
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import datetime
+
+import mock
+
+from solum.api import conditional
+from solum.tests import base
+from solum.tests import fakes
+
+
+@mock.patch('pecan.request', new_callable=fakes.FakePecanRequest)
+@mock.patch('pecan.response', new_callable=fakes.FakePecanResponse)
+class TestConditional(base.BaseTestCase):
+    def setUp(self):
+        super(TestConditional, self).setUp()
+        self.assembly = fakes.FakeAssembly()
+        self.assembly.updated_at = datetime.datetime(2014, 10, 1, 12, 0, 0)
+
+    def test_resource_etag_changes_on_update(self, resp_mock, request_mock):
+        etag, last_modified = conditional.resource_validators(self.assembly)
+        self.assertEqual(self.assembly.updated_at, last_modified)
+        self.assembly.updated_at += datetime.timedelta(microseconds=1)
+        self.assertNotEqual(
+            etag, conditional.resource_validators(self.assembly)[0])
+        self.assertNotEqual(
+            etag, conditional.resource_validators(self.assembly, True)[0])
+
+    def test_resource_etag_changes_with_version(self, resp_mock,
+                                                request_mock):
+        self.assembly.version = 1
+        etag = conditional.resource_validators(self.assembly)[0]
+        self.assembly.version = 2
+        self.assertNotEqual(
+            etag, conditional.resource_validators(self.assembly)[0])
+
+    def test_collection_etag_changes_on_delete(self, resp_mock,
+                                               request_mock):
+        other = fakes.FakeAssembly()
+        other.uuid = 'other_uuid'
+        other.updated_at = None
+        other.created_at = datetime.datetime(2014, 9, 1)
+        etag = conditional.collection_etag([self.assembly, other])
+        self.assertNotEqual(
+            etag, conditional.collection_etag([self.assembly]))
+
+    def test_collection_ignores_if_modified_since(self, resp_mock,
+                                                  request_mock):
+        request_mock.headers = {'If-Modified-Since':
+                                'Wed, 01 Oct 2014 12:00:00 GMT'}
+        self.assertFalse(conditional.not_modified(
+            conditional.collection_etag([self.assembly])))
+
+    def test_if_none_match(self, resp_mock, request_mock):
+        etag, last_modified = conditional.resource_validators(self.assembly)
+        request_mock.headers = {'If-None-Match': '"other", "%s"' % etag}
+        self.assertTrue(conditional.not_modified(etag, last_modified))
+        self.assertEqual(etag, resp_mock.etag)
+        self.assertEqual(last_modified, resp_mock.last_modified)
+
+        request_mock.headers = {'If-None-Match': '"other"',
+                                'If-Modified-Since':
+                                'Wed, 01 Oct 2014 12:00:00 GMT'}
+        self.assertFalse(conditional.not_modified(etag, last_modified))
+
+    def test_if_modified_since(self, resp_mock, request_mock):
+        request_mock.headers = {'If-Modified-Since':
+                                'Wed, 01 Oct 2014 12:00:00 GMT'}
+        self.assertTrue(conditional.not_modified(
+            'etag', self.assembly.updated_at))
+        self.assertFalse(conditional.not_modified(
+            'etag', self.assembly.updated_at + datetime.timedelta(0, 1)))
+
+    def test_unconditional_request(self, resp_mock, request_mock):
+        request_mock.headers = {}
+        self.assertFalse(conditional.not_modified('etag'))
@@ -14,6 +14,7 @@
 
 import mock
 
+from solum.common import context
 from solum.common.rpc import service
 from solum.tests import base
 
@@ -39,3 +40,38 @@ class APITest(base.BaseTestCase):
         rpc_api._cast = mock.MagicMock()
         rpc_api.echo('foo')
         rpc_api._cast.assert_called_once_with('echo', message='foo')
+
+
+class SerializerTest(base.BaseTestCase):
+
+    def test_plain_payload_is_not_copied(self):
+        payload = {'status': 'BUILDING', 'ports': [80, 443], 'ref': None}
+        serializer = service.JsonPayloadSerializer()
+        self.assertIs(payload, serializer.serialize_entity(None, payload))
+
+    def test_complex_payload_is_converted(self):
+        payload = {'ports': (80, 443)}
+        serializer = service.JsonPayloadSerializer()
+        self.assertEqual({'ports': [80, 443]},
+                         serializer.serialize_entity(None, payload))
+
+    def test_serialize_context(self):
+        ctx = context.RequestContext(auth_token='t', tenant='t1',
+                                     auth_token_info={'access': {}})
+        serializer = service.RequestContextSerializer()
+        self.assertEqual({'access': {}},
+                         serializer.serialize_context(ctx)['auth_token_info'])
+
+    def test_serialize_compact_context(self):
+        ctx = context.RequestContext(auth_token='t', tenant='t1',
+                                     request_id='r1',
+                                     auth_token_info={'access': {}})
+        serializer = service.RequestContextSerializer(compact=True)
+        data = serializer.serialize_context(ctx)
+        self.assertNotIn('auth_token_info', data)
+        self.assertNotIn('user_identity', data)
+        self.assertNotIn('trust_id', data)
+        ctx = serializer.deserialize_context(data)
+        self.assertEqual('t1', ctx.tenant)
+        self.assertEqual('r1', ctx.request_id)
+        self.assertIsNone(ctx.auth_token_info)
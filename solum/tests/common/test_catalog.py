@@ -14,10 +14,12 @@
 
 import os.path
 
+import fixtures
 import mock
 
 from solum.common import catalog
 from solum.common import exception
+from solum.openstack.common.fixture import config
 from solum.tests import base
 
 
@@ -56,4 +58,43 @@ class TestCatalog(base.BaseTestCase):
                         create=True) as m_open:
             m_open.side_effect = IOError('test')
             self.assertRaises(exception.ObjectNotFound,
-                              catalog.get, 'test', 'test_data')
\ No newline at end of file
+                              catalog.get, 'test', 'test_data')
+
+    def test_get_cached_until_modified(self):
+        path = self.useFixture(fixtures.TempDir()).path
+        self.useFixture(config.Config()).config(source_path=path)
+        os.makedirs(os.path.join(path, 'etc', 'solum', 'test'))
+        file_path = os.path.join(path, 'etc', 'solum', 'test', 'data.yaml')
+        with open(file_path, 'w') as fd:
+            fd.write('description: one\n')
+        self.assertEqual('description: one\n', catalog.get('test', 'data'))
+
+        with mock.patch('solum.common.catalog.open', create=True) as m_open:
+            self.assertEqual('description: one\n',
+                             catalog.get('test', 'data'))
+            self.assertFalse(m_open.called)
+
+        with open(file_path, 'w') as fd:
+            fd.write('description: two\n')
+        os.utime(file_path, (0, 0))
+        self.assertEqual('description: two\n', catalog.get('test', 'data'))
+
+    def test_parse(self):
+        doc = catalog.parse('description: test\n')
+        self.assertEqual({'description': 'test'}, doc)
+        self.assertIs(doc, catalog.parse('description: test\n'))
+
+    def test_render_copy_on_write(self):
+        doc = catalog.parse('description: test\n'
+                            'resources:\n'
+                            '  server:\n'
+                            '    properties: {user_data: old, flavor: m1}\n'
+                            '  volume: {size: 1}\n')
+        rendered = catalog.render(doc, {
+            ('resources', 'server', 'properties', 'user_data'): 'new'})
+        props = rendered['resources']['server']['properties']
+        self.assertEqual({'user_data': 'new', 'flavor': 'm1'}, props)
+        self.assertEqual('old',
+                         doc['resources']['server']['properties']['user_data'])
+        self.assertIs(doc['resources']['volume'],
+                      rendered['resources']['volume'])
@@ -95,3 +95,10 @@ class TestContext(base.BaseTestCase):
         self.assertEqual(ctx_dict['roles'], ['admin', 'member'])
         self.assertEqual(ctx_dict['auth_url'], 'fake_auth_url')
         self.assertEqual(ctx_dict['trust_id'], 'fake_trust_id')
+
+    def test_context_from_dict(self):
+        ctx = context.RequestContext.from_dict({'tenant': '_tenant_',
+                                                'request_id': '_request_id_',
+                                                'user_identity': '- - -'})
+        self.assertEqual('_tenant_', ctx.tenant)
+        self.assertEqual('_request_id_', ctx.request_id)
@@ -0,0 +1,83 @@
+# Copyright 2014 - Rackspace Hosting
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import mock
+from oslo.config import cfg
+
+from solum.common import heat_utils
+from solum.tests import base
+
+
+class TestNetworkParameters(base.BaseTestCase):
+    def setUp(self):
+        super(TestNetworkParameters, self).setUp()
+        heat_utils.invalidate_network_parameters()
+        self.addCleanup(heat_utils.invalidate_network_parameters)
+        self.osc = mock.MagicMock()
+        self.osc.context.tenant = 't1'
+        self.neutron = self.osc.neutron.return_value
+
+        def list_networks(**filters):
+            if filters.get('router:external'):
+                return {'networks': [{'id': 'public'}]}
+            if filters.get('tenant_id') == 't1':
+                return {'networks': [{'id': 'private',
+                                      'subnets': ['subnet']}]}
+            return {'networks': []}
+        self.neutron.list_networks.side_effect = list_networks
+
+    def test_filtered_queries(self):
+        params = heat_utils.get_network_parameters(self.osc)
+        self.assertEqual({'public_net': 'public', 'private_net': 'private',
+                          'private_subnet': 'subnet'}, params)
+        self.neutron.list_networks.assert_any_call(
+            fields=['id'], **{'router:external': True})
+        self.neutron.list_networks.assert_any_call(
+            tenant_id='t1', fields=['id', 'subnets'],
+            **{'router:external': False})
+
+    def test_shared_private_network(self):
+        self.osc.context.tenant = 't2'
+        params = heat_utils.get_network_parameters(self.osc)
+        self.assertNotIn('private_net', params)
+        self.neutron.list_networks.assert_called_with(
+            shared=True, fields=['id', 'subnets'],
+            **{'router:external': False})
+
+    def test_cached_per_tenant(self):
+        heat_utils.get_network_parameters(self.osc)
+        params = heat_utils.get_network_parameters(self.osc)
+        params['public_net'] = 'changed'
+        self.assertEqual(2, self.neutron.list_networks.call_count)
+        self.assertEqual('public',
+                         heat_utils.get_network_parameters(self.osc)
+                         ['public_net'])
+
+        self.osc.context.tenant = 't2'
+        heat_utils.get_network_parameters(self.osc)
+        self.assertEqual(5, self.neutron.list_networks.call_count)
+
+    def test_invalidate(self):
+        heat_utils.get_network_parameters(self.osc)
+        heat_utils.invalidate_network_parameters('t1')
+        heat_utils.get_network_parameters(self.osc)
+        self.assertEqual(4, self.neutron.list_networks.call_count)
+
+    def test_cache_disabled(self):
+        cfg.CONF.set_override('network_parameters_cache_ttl', 0)
+        self.addCleanup(cfg.CONF.clear_override,
+                        'network_parameters_cache_ttl')
+        heat_utils.get_network_parameters(self.osc)
+        heat_utils.get_network_parameters(self.osc)
+        self.assertEqual(4, self.neutron.list_networks.call_count)
@@ -0,0 +1,93 @@
+# Copyright 2014 - Rackspace Hosting
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import mock
+
+from solum.common import metrics
+from solum.tests import base
+
+
+class TestRegistry(base.BaseTestCase):
+    def setUp(self):
+        super(TestRegistry, self).setUp()
+        self.registry = metrics.Registry()
+
+    def test_counter(self):
+        c = self.registry.counter('calls_total', 'Calls.')
+        c.inc(method='deploy')
+        c.inc(2, method='deploy')
+        self.assertEqual(3, c.value(method='deploy'))
+        self.assertEqual(0, c.value(method='build'))
+
+    def test_get_or_create(self):
+        c = self.registry.counter('calls_total', 'Calls.')
+        self.assertIs(c, self.registry.counter('calls_total', 'Calls.'))
+        self.assertRaises(ValueError, self.registry.gauge, 'calls_total',
+                          'Calls.')
+
+    def test_gauge_in_progress(self):
+        g = self.registry.gauge('active', 'Active.')
+        with g.track_in_progress(stage='build'):
+            self.assertEqual(1, g.value(stage='build'))
+        self.assertEqual(0, g.value(stage='build'))
+
+    def test_histogram(self):
+        h = self.registry.histogram('latency', 'Latency.', buckets=(1, 5))
+        h.observe(0.5)
+        h.observe(3)
+        h.observe(10)
+        self.assertEqual((3, 13.5), h.value())
+        samples = dict(h.samples())
+        self.assertEqual(1, samples['latency_bucket{le="1.0"}'])
+        self.assertEqual(2, samples['latency_bucket{le="5.0"}'])
+        self.assertEqual(3, samples['latency_bucket{le="+Inf"}'])
+
+    def test_render(self):
+        self.registry.counter('calls_total', 'Calls.').inc(method='echo')
+        self.assertEqual('# HELP calls_total Calls.\n'
+                         '# TYPE calls_total counter\n'
+                         'calls_total{method="echo"} 1.0\n',
+                         self.registry.render())
+
+
+class TestInstrumentedEndpoint(base.BaseTestCase):
+    def test_counts_calls(self):
+        endpoint = mock.MagicMock()
+        endpoint.deploy.return_value = 'ok'
+        instrumented = metrics.InstrumentedEndpoint(endpoint)
+        calls = metrics.counter('solum_rpc_calls_total', '')
+        before = calls.value(method='deploy', outcome='success')
+
+        self.assertEqual('ok', instrumented.deploy('ctxt', assembly_id=1))
+        endpoint.deploy.assert_called_once_with('ctxt', assembly_id=1)
+        self.assertEqual(before + 1,
+                         calls.value(method='deploy', outcome='success'))
+
+    def test_counts_errors(self):
+        endpoint = mock.MagicMock()
+        endpoint.deploy.side_effect = ValueError
+        instrumented = metrics.InstrumentedEndpoint(endpoint)
+        calls = metrics.counter('solum_rpc_calls_total', '')
+        before = calls.value(method='deploy', outcome='error')
+
+        self.assertRaises(ValueError, instrumented.deploy, 'ctxt')
+        self.assertEqual(before + 1,
+                         calls.value(method='deploy', outcome='error'))
+
+    def test_metrics_app(self):
+        start_response = mock.MagicMock()
+        body = metrics._metrics_app({'PATH_INFO': '/metrics'},
+                                    start_response)
+        self.assertEqual([metrics.REGISTRY.render()], body)
+        self.assertEqual('200 OK', start_response.call_args[0][0])
@@ -56,3 +56,16 @@ class SwiftClientTest(base.BaseTestCase):
         swift = swiftclient.SwiftClient(ctxt)
         self.assertRaises(exc.InvalidObjectSizeError,
                           swift.upload, 'filepath', 'fake-container', 'fname')
+
+    @mock.patch('solum.common.solum_swiftclient.SwiftClient._get_swift_client')
+    def test_swift_client_delete_objects(self, mock_swift_client):
+        ctxt = utils.dummy_context()
+        mock_client = mock_swift_client.return_value
+
+        swift = swiftclient.SwiftClient(ctxt)
+        self.assertEqual([], swift.delete_objects('solum_du', ['a', 'b']))
+        mock_client.delete_object.assert_has_calls([
+            mock.call('solum_du', 'a',
+                      query_string='multipart-manifest=delete'),
+            mock.call('solum_du', 'b',
+                      query_string='multipart-manifest=delete')])
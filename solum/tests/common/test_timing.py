@@ -0,0 +1,83 @@
+# Copyright 2014 - Rackspace Hosting
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import mock
+from oslo.config import cfg
+
+import solum
+from solum.common import timing
+from solum.common import trace_data
+from solum.tests import base
+
+
+class TestTiming(base.BaseTestCase):
+    def setUp(self):
+        super(TestTiming, self).setUp()
+        self.sink = mock.MagicMock()
+        timing._SINK = self.sink
+        self.addCleanup(timing.reset_sink)
+        solum.TLS.trace = trace_data.TraceData()
+
+    def test_record(self):
+        span = timing.record('clone', 10.0, 12.5, assembly=4, plan=None)
+        self.assertEqual({'name': 'clone', 'start': 10.0, 'duration': 2.5,
+                          'tags': {'assembly': 4}}, span)
+        self.sink.emit.assert_called_once_with(span)
+        self.assertEqual([span], solum.TLS.trace.spans)
+
+    def test_span(self):
+        with timing.span('prepare_env', tenant='t1') as tags:
+            tags['assembly'] = 3
+        span = solum.TLS.trace.spans[0]
+        self.assertEqual('prepare_env', span['name'])
+        self.assertEqual({'tenant': 't1', 'assembly': 3}, span['tags'])
+
+    def test_span_records_on_error(self):
+        def fail():
+            with timing.span('heat_create'):
+                raise ValueError()
+        self.assertRaises(ValueError, fail)
+        self.assertEqual(1, self.sink.emit.call_count)
+
+    def test_clear_drops_spans(self):
+        timing.record('clone', 1.0, 2.0)
+        solum.TLS.trace.clear()
+        self.assertEqual([], solum.TLS.trace.spans)
+
+    def test_parse_stage_timing(self):
+        line = 'stage_timing=lp_load:1412164800000:1500'
+        self.assertEqual(('lp_load', 1412164800.0, 1412164801.5),
+                         timing.parse_stage_timing(line))
+        self.assertIsNone(timing.parse_stage_timing('created_image_id=abc'))
+        self.assertIsNone(timing.parse_stage_timing('stage_timing=bad'))
+        self.assertIsNone(timing.parse_stage_timing('stage_timing=a:1500'))
+
+    def test_get_sink(self):
+        timing.reset_sink()
+        cfg.CONF.set_override('sink', 'noop', group='timing')
+        self.assertIsInstance(timing.get_sink(), timing.NoopSink)
+
+    @mock.patch('socket.socket')
+    def test_statsd_sink(self, mock_socket):
+        sink = timing.StatsdSink()
+        sink.emit({'name': 'build', 'start': 0.0, 'duration': 1.25,
+                   'tags': {}})
+        mock_socket.return_value.sendto.assert_called_once_with(
+            'solum.build:1250|ms', ('127.0.0.1', 8125))
+
+    @mock.patch('solum.common.timing.LOG')
+    def test_log_sink(self, mock_log):
+        timing.LogSink().emit({'name': 'build', 'start': 0.0,
+                               'duration': 1.0, 'tags': {'plan': object}})
+        self.assertTrue(mock_log.info.called)
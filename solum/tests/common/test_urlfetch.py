@@ -114,3 +114,35 @@ class TestUrlFetch(base.BaseTestCase):
         mock_urlopen.side_effect = moves.urllib.error.URLError('oops')
         self.assertRaises(IOError, urlfetch.get, url, FETCH_SIZE_OK,
                           allowed_schemes=['file'])
+
+    @mock.patch('six.moves.urllib.request.urlopen')
+    def test_file_scheme_max_size(self, mock_urlopen):
+        url = 'file:///etc/profile'
+        mock_urlopen.return_value = moves.cStringIO('{ "foo": "bar" }')
+        self.assertRaises(IOError, urlfetch.get, url, 5,
+                          allowed_schemes=['file'])
+
+    @mock.patch('solum.common.urlfetch.requests.get')
+    def test_iter_content(self, mock_get):
+        url = 'http://example.com/plan'
+        mock_get.return_value = Response('{ "foo": "bar" }')
+        chunks = urlfetch.iter_content(url, FETCH_SIZE_OK, chunk_size=8)
+        self.assertEqual(['{ "foo":', ' "bar" }'], list(chunks))
+
+    @mock.patch('solum.common.urlfetch.requests.get')
+    def test_iter_content_max_size(self, mock_get):
+        url = 'http://example.com/plan'
+        mock_get.return_value = Response('{ "foo": "bar" }')
+        chunks = urlfetch.iter_content(url, 10, chunk_size=8)
+        self.assertEqual('{ "foo":', next(chunks))
+        self.assertRaises(IOError, next, chunks)
+
+    @mock.patch('solum.common.urlfetch.requests.get')
+    def test_get_file(self, mock_get):
+        url = 'http://example.com/plan'
+        data = b'x' * 100
+        mock_get.return_value = Response(data)
+        fd = urlfetch.get_file(url, FETCH_SIZE_OK, chunk_size=16,
+                               spool_size=32)
+        self.assertTrue(fd._rolled)
+        self.assertEqual(data, fd.read())
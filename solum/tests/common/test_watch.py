@@ -0,0 +1,107 @@
+# Copyright 2014 - Rackspace Hosting
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import mock
+from oslo.config import cfg
+
+from solum.common import watch
+from solum.tests import base
+from solum.tests import utils
+
+
+class TestWatchers(base.BaseTestCase):
+    def test_notify(self):
+        watchers = watch.Watchers()
+        with watchers.watch('a1') as event:
+            self.assertEqual(1, len(watchers))
+            self.assertEqual(0, watchers.notify('other'))
+            self.assertFalse(event.is_set())
+            self.assertEqual(1, watchers.notify('a1'))
+            self.assertTrue(event.is_set())
+        self.assertEqual(0, len(watchers))
+        self.assertEqual(0, watchers.notify('a1'))
+
+    def test_endpoint(self):
+        watchers = mock.MagicMock()
+        watch.Endpoint(watchers).assembly_changed(utils.dummy_context(),
+                                                  'a1', 'READY')
+        watchers.notify.assert_called_once_with('a1')
+
+
+class TestWaitForChange(base.BaseTestCase):
+    def setUp(self):
+        super(TestWaitForChange, self).setUp()
+        self.watchers = watch.Watchers()
+
+    def test_changed_already(self):
+        load = mock.MagicMock(return_value='new')
+        obj = watch.wait_for_change('a1', load, lambda o: o, 'old', 10,
+                                    watchers=self.watchers)
+        self.assertEqual('new', obj)
+        self.assertEqual(1, load.call_count)
+
+    def test_notified_between_load_and_wait(self):
+        states = ['old', 'new']
+
+        def load():
+            # The update lands right after the first read.
+            self.watchers.notify('a1')
+            return states.pop(0)
+
+        obj = watch.wait_for_change('a1', load, lambda o: o, 'old', 10,
+                                    watchers=self.watchers)
+        self.assertEqual('new', obj)
+        self.assertEqual([], states)
+
+    def test_timeout(self):
+        load = mock.MagicMock(return_value='old')
+        cfg.CONF.set_override('max_timeout', 0, group='watch')
+        obj = watch.wait_for_change('a1', load, lambda o: o, 'old', 10,
+                                    watchers=self.watchers)
+        self.assertEqual('old', obj)
+        self.assertEqual(1, load.call_count)
+        self.assertEqual(0, len(self.watchers))
+
+
+class TestNotifyChanged(base.BaseTestCase):
+    @mock.patch.object(watch, 'API')
+    def test_notify(self, mock_api):
+        ctxt = utils.dummy_context()
+        watch.notify_changed(ctxt, 12, 'READY')
+        mock_api.assert_called_once_with(context=ctxt)
+        mock_api.return_value.assembly_changed.assert_called_once_with(
+            12, 'READY')
+
+    @mock.patch.object(watch, 'API')
+    def test_notify_failure_ignored(self, mock_api):
+        mock_api.return_value.assembly_changed.side_effect = IOError
+        watch.notify_changed(utils.dummy_context(), 12, 'READY')
+
+    @mock.patch.object(watch, 'API')
+    def test_notify_disabled(self, mock_api):
+        cfg.CONF.set_override('notify_status_changes', False, group='watch')
+        watch.notify_changed(utils.dummy_context(), 12)
+        self.assertFalse(mock_api.called)
+
+    @mock.patch.object(watch, 'API')
+    def test_notify_lp_changed(self, mock_api):
+        ctxt = utils.dummy_context()
+        watch.notify_lp_changed(ctxt, 7)
+        mock_api.return_value.language_pack_changed.assert_called_once_with(
+            7)
+
+    @mock.patch('solum.objects.registry')
+    def test_endpoint_lp_changed(self, mock_registry):
+        watch.Endpoint(watch.Watchers()).language_pack_changed(None, 7)
+        mock_registry.Image.invalidate_operator_lps.assert_called_once_with()
@@ -0,0 +1,105 @@
+# Copyright 2014 - Rackspace Hosting
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import datetime
+import json
+
+import mock
+from oslo.config import cfg
+
+from solum.conductor import retention
+from solum.tests import base
+
+NOW = datetime.datetime(2014, 10, 1)
+
+
+def _image(id, docker_image_name=None, project_id='t1'):
+    return mock.MagicMock(id=id, docker_image_name=docker_image_name,
+                          project_id=project_id)
+
+
+def _userlog(id, location, strategy='swift', project_id='t1'):
+    return mock.MagicMock(id=id, location=location, strategy=strategy,
+                          project_id=project_id,
+                          strategy_info=json.dumps({'container': 'logs'}))
+
+
+@mock.patch('solum.conductor.retention.db')
+class TestPurge(base.BaseTestCase):
+    def test_policy(self, mock_db):
+        cfg.CONF.set_override('retention_days', 30, group='purge')
+        cfg.CONF.set_override('tenant_retention_days',
+                              {'t1': '7', 'keeper': '0'}, group='purge')
+        default, tenants = retention.get_policy(NOW)
+        self.assertEqual(NOW - datetime.timedelta(days=30), default)
+        self.assertEqual(NOW - datetime.timedelta(days=7), tenants['t1'])
+        self.assertEqual(retention._FOREVER, tenants['keeper'])
+
+    def test_purge_assemblies_in_batches(self, mock_db):
+        mock_db.purge_assemblies.side_effect = [2, 2, 1]
+        mock_db.orphaned_images.return_value = []
+        mock_db.orphaned_userlogs.return_value = []
+        result = retention.purge(batch_size=2, now=NOW)
+        self.assertEqual(5, result['assembly'])
+        self.assertEqual(3, mock_db.purge_assemblies.call_count)
+
+    @mock.patch('solum.conductor.retention._SwiftCleaner')
+    def test_purge_images(self, mock_cleaner, mock_db):
+        mock_db.purge_assemblies.return_value = 0
+        mock_db.orphaned_images.return_value = [
+            _image(1), _image(2, 'du-kept'), _image(3, 'du-gone')]
+        mock_db.delete_images.side_effect = len
+        mock_db.orphaned_userlogs.return_value = []
+        cleaner = mock_cleaner.return_value
+        cleaner.delete.return_value = ['kept']
+
+        result = retention.purge(batch_size=10, now=NOW)
+        self.assertEqual(2, result['image'])
+        self.assertEqual('t1', cleaner.delete.call_args[0][0])
+        self.assertEqual('solum_du', cleaner.delete.call_args[0][1])
+        self.assertEqual(set(['kept', 'gone']),
+                         set(cleaner.delete.call_args[0][2]))
+        self.assertEqual(set([1, 3]),
+                         set(mock_db.delete_images.call_args[0][0]))
+
+    @mock.patch('solum.conductor.retention._SwiftCleaner')
+    def test_purge_userlogs_pages(self, mock_cleaner, mock_db):
+        mock_db.purge_assemblies.return_value = 0
+        mock_db.orphaned_images.return_value = []
+        mock_db.orphaned_userlogs.side_effect = [
+            [_userlog(1, 'a'), _userlog(2, 'b')], [_userlog(3, 'c')]]
+        mock_db.delete_userlogs.side_effect = len
+        mock_cleaner.return_value.delete.return_value = []
+
+        result = retention.purge(batch_size=2, now=NOW)
+        self.assertEqual(3, result['userlogs'])
+        self.assertEqual(2, mock_db.orphaned_userlogs.call_args[0][2])
+
+    @mock.patch('solum.common.keystone_utils.create_delegation_context')
+    def test_swift_cleaner_without_trust(self, mock_deleg, mock_db):
+        mock_db.trusted_plan.return_value = None
+        cleaner = retention._SwiftCleaner()
+        self.assertEqual(['a'], cleaner.delete('t1', 'logs', ['a']))
+        self.assertFalse(mock_deleg.called)
+
+    @mock.patch('solum.common.solum_swiftclient.SwiftClient')
+    @mock.patch('solum.common.keystone_utils.create_delegation_context')
+    def test_swift_cleaner(self, mock_deleg, mock_swift, mock_db):
+        mock_swift.return_value.delete_objects.return_value = []
+        cleaner = retention._SwiftCleaner()
+        self.assertEqual([], cleaner.delete('t1', 'logs', ['a']))
+        self.assertEqual([], cleaner.delete('t1', 'logs', ['b']))
+        mock_deleg.assert_called_once_with(mock_db.trusted_plan.return_value)
+        mock_swift.return_value.delete_objects.assert_called_with('logs',
+                                                                  ['b'])
@@ -14,6 +14,7 @@
 
 import json
 
+import fixtures
 from heatclient import exc
 import mock
 from oslo.config import cfg
@@ -25,6 +26,7 @@ from solum.objects import assembly
 from solum.tests import base
 from solum.tests import fakes
 from solum.tests import utils
+from solum.uploaders import tenant_logger as tlog
 
 
 STATES = assembly.States
@@ -141,6 +143,510 @@ class HandlerTest(base.BaseTestCase):
                                                        'fake_id')
         m_log.log.assert_called_once()
 
+    @mock.patch('solum.deployer.handlers.heat.tlog')
+    @mock.patch('solum.common.catalog.get')
+    @mock.patch('solum.common.catalog.get_from_contrib')
+    @mock.patch('solum.objects.registry')
+    @mock.patch('solum.common.clients.OpenStackClients')
+    def test_prepare_deploy(self, mock_clients, mock_registry, mock_contrib,
+                            mock_get_templ, m_log):
+        handler = heat_handler.Handler()
+        fake_assembly = fakes.FakeAssembly()
+        mock_registry.Assembly.get_by_id.return_value = fake_assembly
+        handler._find_id_if_stack_exists = mock.MagicMock(return_value=None)
+        handler._du_pointer_url = mock.MagicMock(return_value='http://p')
+        fake_template = self._get_fake_template()
+        mock_get_templ.return_value = fake_template
+        mock_contrib.return_value = "robust_file"
+
+        cfg.CONF.api.image_format = "vm"
+        cfg.CONF.worker.image_storage = "swift"
+        cfg.CONF.deployer.flavor = "flavor"
+        cfg.CONF.deployer.image = "coreos"
+        cfg.CONF.deployer.du_wait_timeout = 1800
+        stacks = mock_clients.return_value.heat.return_value.stacks
+        stacks.create.return_value = {"stack": {
+            "id": "fake_id",
+            "links": [{"href": "http://fake.ref",
+                       "rel": "self"}]}}
+
+        handler.prepare_deploy(self.ctx, 77, [80])
+
+        parameters = {'name': fake_assembly.uuid,
+                      'flavor': "flavor",
+                      'image': "coreos",
+                      'location': 'http://p',
+                      'du': heat_handler.PENDING_DU,
+                      'publish_ports': '-p 80:80',
+                      'wait_timeout': 1800}
+        stacks.create.assert_called_once_with(
+            stack_name='faker-test_uuid', template=fake_template,
+            parameters=parameters,
+            files={self._get_key(): "robust_file"})
+        mock_registry.Component.assign_and_create.assert_called_once_with(
+            self.ctx, fake_assembly, 'Heat_Stack_for_faker', 'heat_stack',
+            'Heat Stack test', 'http://fake.ref', 'fake_id')
+
+    @mock.patch('solum.uploaders.tenant_logger.local_uploader')
+    @mock.patch('solum.deployer.warm_pool.refill')
+    @mock.patch('solum.deployer.handlers.heat.Handler._claim_pool_stack')
+    @mock.patch('solum.common.catalog.get')
+    @mock.patch('solum.objects.registry')
+    @mock.patch('solum.common.clients.OpenStackClients')
+    def test_prepare_deploy_uploads_log(self, mock_clients, mock_registry,
+                                        mock_get_templ, mock_claim,
+                                        mock_refill, mock_uploader):
+        log_dir = self.useFixture(fixtures.TempDir()).path
+        self.useFixture(fixtures.MonkeyPatch(
+            'solum.deployer.handlers.heat.deployer_log_dir', log_dir))
+        handler = heat_handler.Handler()
+        fake_assembly = fakes.FakeAssembly()
+        fake_assembly.heat_stack_component = None
+        mock_registry.Assembly.get_by_id.return_value = fake_assembly
+        cfg.CONF.api.image_format = "vm"
+        cfg.CONF.worker.image_storage = "swift"
+
+        handler.prepare_deploy(self.ctx, 77, [80])
+
+        self.assertEqual(0, len(tlog.WRITERS))
+        upload = mock_uploader.LocalStorage.return_value.upload_log
+        upload.assert_called_once_with()
+
+    @mock.patch('solum.objects.registry')
+    @mock.patch('solum.common.clients.OpenStackClients')
+    def test_prepare_deploy_docker(self, mock_clients, mock_registry):
+        handler = heat_handler.Handler()
+        cfg.CONF.api.image_format = "docker"
+        cfg.CONF.worker.image_storage = "glance"
+
+        handler.prepare_deploy(self.ctx, 77, [80])
+
+        self.assertFalse(mock_registry.Assembly.get_by_id.called)
+        self.assertFalse(mock_clients.called)
+
+    @mock.patch('solum.deployer.handlers.heat.tlog')
+    @mock.patch('solum.common.catalog.get')
+    @mock.patch('solum.common.catalog.get_from_contrib')
+    @mock.patch('solum.objects.registry')
+    @mock.patch('solum.common.clients.OpenStackClients')
+    def test_prepare_deploy_component_failure(self, mock_clients,
+                                              mock_registry, mock_contrib,
+                                              mock_get_templ, m_log):
+        handler = heat_handler.Handler()
+        mock_registry.Assembly.get_by_id.return_value = fakes.FakeAssembly()
+        mock_registry.Component.assign_and_create.side_effect = Exception
+        handler._find_id_if_stack_exists = mock.MagicMock(return_value=None)
+        handler._du_pointer_url = mock.MagicMock(return_value='http://p')
+        mock_get_templ.return_value = self._get_fake_template()
+
+        cfg.CONF.api.image_format = "vm"
+        cfg.CONF.worker.image_storage = "swift"
+        stacks = mock_clients.return_value.heat.return_value.stacks
+        stacks.create.return_value = {"stack": {
+            "id": "fake_id",
+            "links": [{"href": "http://fake.ref",
+                       "rel": "self"}]}}
+
+        handler.prepare_deploy(self.ctx, 77, [80])
+
+        stacks.delete.assert_called_once_with('fake_id')
+
+    @mock.patch('solum.deployer.handlers.heat.tlog')
+    @mock.patch('solum.deployer.warm_pool.refill')
+    @mock.patch('solum.common.catalog.get')
+    @mock.patch('solum.common.catalog.get_from_contrib')
+    @mock.patch('solum.objects.registry')
+    @mock.patch('solum.common.clients.OpenStackClients')
+    def test_prepare_deploy_after_build_failed(self, mock_clients,
+                                               mock_registry, mock_contrib,
+                                               mock_get_templ, mock_refill,
+                                               m_log):
+        handler = heat_handler.Handler()
+        failed = fakes.FakeAssembly()
+        failed.status = 'ERROR'
+        mock_registry.Assembly.get_by_id.side_effect = [fakes.FakeAssembly(),
+                                                        failed]
+        handler._find_id_if_stack_exists = mock.MagicMock(return_value=None)
+        handler._claim_pool_stack = mock.MagicMock(return_value=None)
+        handler._du_pointer_url = mock.MagicMock(return_value='http://p')
+        handler.discard_prepared_stack = mock.MagicMock()
+        mock_get_templ.return_value = self._get_fake_template()
+        cfg.CONF.api.image_format = "vm"
+        cfg.CONF.worker.image_storage = "swift"
+        stacks = mock_clients.return_value.heat.return_value.stacks
+        stacks.create.return_value = {"stack": {
+            "id": "fake_id",
+            "links": [{"href": "http://fake.ref",
+                       "rel": "self"}]}}
+
+        handler.prepare_deploy(self.ctx, 77, [80])
+
+        handler.discard_prepared_stack.assert_called_once_with(self.ctx, 77)
+
+    @mock.patch('solum.objects.registry')
+    @mock.patch('solum.common.clients.OpenStackClients')
+    def test_discard_prepared_stack(self, mock_clients, mock_registry):
+        handler = heat_handler.Handler()
+        fake_assembly = fakes.FakeAssembly()
+        fake_assembly.status = 'ERROR'
+        comp = fake_assembly.heat_stack_component
+        mock_registry.Assembly.get_by_id.return_value = fake_assembly
+        stacks = mock_clients.return_value.heat.return_value.stacks
+
+        handler.discard_prepared_stack(self.ctx, 77)
+
+        stacks.delete.assert_called_once_with(comp.heat_stack_id)
+        comp.destroy.assert_called_once_with(self.ctx)
+
+    @mock.patch('solum.objects.registry')
+    @mock.patch('solum.common.clients.OpenStackClients')
+    def test_discard_prepared_stack_deploying(self, mock_clients,
+                                              mock_registry):
+        handler = heat_handler.Handler()
+        fake_assembly = fakes.FakeAssembly()
+        fake_assembly.status = 'DEPLOYING'
+        mock_registry.Assembly.get_by_id.return_value = fake_assembly
+        stacks = mock_clients.return_value.heat.return_value.stacks
+
+        handler.discard_prepared_stack(self.ctx, 77)
+
+        self.assertFalse(stacks.delete.called)
+        self.assertFalse(fake_assembly.heat_stack_component.destroy.called)
+
+    @mock.patch('solum.common.solum_swiftclient.SwiftClient.upload_data')
+    @mock.patch('solum.deployer.handlers.heat.tlog')
+    @mock.patch('solum.deployer.handlers.heat.update_assembly')
+    @mock.patch('solum.common.catalog.get')
+    @mock.patch('solum.objects.registry')
+    @mock.patch('solum.common.clients.OpenStackClients')
+    def test_deploy_publishes_du_to_prepared_stack(self, mock_clients,
+                                                   mock_registry,
+                                                   mock_get_templ, mock_ua,
+                                                   m_log, mock_upload):
+        handler = heat_handler.Handler()
+        fake_assembly = fakes.FakeAssembly()
+        mock_registry.Assembly.get_by_id.return_value = fake_assembly
+        mock_get_templ.return_value = self._get_fake_template()
+        handler._find_id_if_stack_exists = mock.MagicMock(return_value='42')
+        handler._check_stack_status = mock.MagicMock()
+
+        cfg.CONF.api.image_format = "vm"
+        cfg.CONF.worker.image_storage = "swift"
+        cfg.CONF.worker.temp_url_ttl = "600"
+        stacks = mock_clients.return_value.heat.return_value.stacks
+        stacks.get.return_value.parameters = {'du': heat_handler.PENDING_DU}
+
+        handler.deploy(self.ctx, 77, 'http://a.b/c?sig=v', 'du-name', [80])
+
+        mock_upload.assert_called_once_with(
+            'solum_du', 'faker-test_uuid.location',
+            'http://a.b/c?sig=v du-name -p 80:80\n',
+            headers={'X-Delete-After': '600'})
+        self.assertFalse(stacks.update.called)
+        self.assertFalse(stacks.create.called)
+        mock_ua.assert_called_once_with(self.ctx, 77,
+                                        {'status': STATES.DEPLOYING})
+        handler._check_stack_status.assert_called_once_with(
+            self.ctx, 77, mock.ANY, '42', [80], mock.ANY,
+            previous=None)
+
+    @mock.patch('solum.deployer.warm_pool.refill')
+    @mock.patch('solum.deployer.warm_pool.claim')
+    @mock.patch('solum.common.solum_swiftclient.SwiftClient.upload_data')
+    @mock.patch('solum.deployer.handlers.heat.tlog')
+    @mock.patch('solum.deployer.handlers.heat.update_assembly')
+    @mock.patch('solum.common.catalog.get')
+    @mock.patch('solum.objects.registry')
+    @mock.patch('solum.common.clients.OpenStackClients')
+    def test_deploy_claims_pool_stack(self, mock_clients, mock_registry,
+                                      mock_get_templ, mock_ua, m_log,
+                                      mock_upload, mock_claim, mock_refill):
+        handler = heat_handler.Handler()
+        fake_assembly = fakes.FakeAssembly()
+        mock_registry.Assembly.get_by_id.return_value = fake_assembly
+        mock_get_templ.return_value = self._get_fake_template()
+        handler._find_id_if_stack_exists = mock.MagicMock(return_value=None)
+        handler._check_stack_status = mock.MagicMock()
+        mock_claim.return_value = mock.MagicMock(
+            heat_stack_id='pool_id', stack_name='solum-pool-1',
+            resource_uri='http://heat/stacks/solum-pool-1/pool_id')
+
+        cfg.CONF.api.image_format = "vm"
+        cfg.CONF.worker.image_storage = "swift"
+        cfg.CONF.worker.temp_url_ttl = "600"
+        stacks = mock_clients.return_value.heat.return_value.stacks
+        stacks.get.return_value.status = 'IN_PROGRESS'
+
+        handler.deploy(self.ctx, 77, 'http://a.b/c?sig=v', 'du-name', [80])
+
+        mock_registry.Component.assign_and_create.assert_called_once_with(
+            self.ctx, fake_assembly, 'Heat_Stack_for_faker', 'heat_stack',
+            'Heat Stack test', 'http://heat/stacks/solum-pool-1/pool_id',
+            'pool_id')
+        mock_upload.assert_called_once_with(
+            'solum_du', 'solum-pool-1.location',
+            'http://a.b/c?sig=v du-name -p 80:80\n',
+            headers={'X-Delete-After': '600'})
+        self.assertFalse(stacks.create.called)
+        mock_refill.assert_called_once_with(self.ctx, handler)
+        handler._check_stack_status.assert_called_once_with(
+            self.ctx, 77, mock.ANY, 'pool_id', [80], mock.ANY,
+            previous=None)
+
+    @mock.patch('solum.deployer.warm_pool.refill')
+    @mock.patch('solum.deployer.warm_pool.claim')
+    @mock.patch('solum.common.solum_swiftclient.SwiftClient.upload_data')
+    @mock.patch('solum.deployer.handlers.heat.tlog')
+    @mock.patch('solum.deployer.handlers.heat.update_assembly')
+    @mock.patch('solum.common.catalog.get')
+    @mock.patch('solum.objects.registry')
+    @mock.patch('solum.common.clients.OpenStackClients')
+    def test_prepare_deploy_claims_pool_stack(self, mock_clients,
+                                              mock_registry, mock_get_templ,
+                                              mock_ua, m_log, mock_upload,
+                                              mock_claim, mock_refill):
+        handler = heat_handler.Handler()
+        fake_assembly = fakes.FakeAssembly()
+        fake_assembly.heat_stack_component = None
+        mock_registry.Assembly.get_by_id.return_value = fake_assembly
+        mock_get_templ.return_value = self._get_fake_template()
+        handler._check_stack_status = mock.MagicMock()
+        mock_claim.return_value = mock.MagicMock(
+            heat_stack_id='pool_id', stack_name='solum-pool-1',
+            resource_uri='http://heat/v1/t/stacks/solum-pool-1/pool_id')
+
+        def assign(ctxt, assem, name, comp_type, description, uri, stack_id):
+            assem.heat_stack_component = mock.MagicMock(
+                heat_stack_id=stack_id, resource_uri=uri)
+        mock_registry.Component.assign_and_create.side_effect = assign
+
+        cfg.CONF.api.image_format = "vm"
+        cfg.CONF.worker.image_storage = "swift"
+        cfg.CONF.worker.temp_url_ttl = "600"
+        stacks = mock_clients.return_value.heat.return_value.stacks
+        stacks.get.return_value.status = 'IN_PROGRESS'
+        stacks.get.return_value.parameters = {'du': heat_handler.PENDING_DU}
+
+        handler.prepare_deploy(self.ctx, 77, [80])
+        handler.deploy(self.ctx, 77, 'http://a.b/c?sig=v', 'du-name', [80])
+
+        self.assertEqual(1, mock_claim.call_count)
+        mock_upload.assert_called_once_with(
+            'solum_du', 'solum-pool-1.location',
+            'http://a.b/c?sig=v du-name -p 80:80\n',
+            headers={'X-Delete-After': '600'})
+        self.assertFalse(stacks.create.called)
+        self.assertFalse(stacks.update.called)
+        handler._check_stack_status.assert_called_once_with(
+            self.ctx, 77, mock.ANY, 'pool_id', [80], mock.ANY,
+            previous=None)
+
+    @mock.patch('solum.deployer.warm_pool.claim')
+    @mock.patch('solum.objects.registry')
+    def test_claim_pool_stack_discards_failed(self, mock_registry,
+                                              mock_claim):
+        handler = heat_handler.Handler()
+        handler.delete_pool_stack = mock.MagicMock()
+        broken = mock.MagicMock(heat_stack_id='broken',
+                                stack_name='solum-pool-1')
+        booted = mock.MagicMock(heat_stack_id='booted')
+        mock_claim.side_effect = [broken, booted]
+        osc = mock.MagicMock()
+        osc.heat.return_value.stacks.get.side_effect = [
+            mock.MagicMock(status='FAILED'),
+            mock.MagicMock(status='COMPLETE')]
+
+        row = handler._claim_pool_stack(self.ctx, osc, fakes.FakeAssembly(),
+                                        self._get_fake_template())
+
+        self.assertEqual(booted, row)
+        handler.delete_pool_stack.assert_called_once_with(
+            self.ctx, 'solum-pool-1', 'broken')
+        self.assertEqual(
+            1, mock_registry.Component.assign_and_create.call_count)
+
+    @mock.patch('solum.deployer.warm_pool.put_back')
+    @mock.patch('solum.deployer.warm_pool.claim')
+    @mock.patch('solum.objects.registry')
+    def test_claim_pool_stack_keeps_undeletable(self, mock_registry,
+                                                mock_claim, mock_put_back):
+        handler = heat_handler.Handler()
+        handler.delete_pool_stack = mock.MagicMock(side_effect=Exception)
+        broken = mock.MagicMock(heat_stack_id='broken')
+        mock_claim.side_effect = [broken, None]
+        osc = mock.MagicMock()
+        osc.heat.return_value.stacks.get.return_value.status = 'FAILED'
+
+        self.assertIsNone(handler._claim_pool_stack(
+            self.ctx, osc, fakes.FakeAssembly(), self._get_fake_template()))
+        mock_put_back.assert_called_once_with(broken)
+
+    @mock.patch('solum.deployer.warm_pool.put_back')
+    @mock.patch('solum.deployer.warm_pool.claim')
+    @mock.patch('solum.objects.registry')
+    def test_claim_pool_stack_assembly_gone(self, mock_registry, mock_claim,
+                                            mock_put_back):
+        handler = heat_handler.Handler()
+        handler.delete_pool_stack = mock.MagicMock()
+        row = mock.MagicMock(heat_stack_id='booted')
+        mock_claim.return_value = row
+        mock_registry.Component.assign_and_create.side_effect = Exception
+        osc = mock.MagicMock()
+        osc.heat.return_value.stacks.get.return_value.status = 'COMPLETE'
+
+        self.assertIsNone(handler._claim_pool_stack(
+            self.ctx, osc, fakes.FakeAssembly(), self._get_fake_template()))
+        self.assertFalse(handler.delete_pool_stack.called)
+        mock_put_back.assert_called_once_with(row)
+
+    @mock.patch('solum.common.clients.OpenStackClients')
+    def test_delete_pool_stack_by_name(self, mock_clients):
+        handler = heat_handler.Handler()
+        stacks = mock_clients.return_value.heat.return_value.stacks
+        stacks.get.return_value.id = 'pool_id'
+
+        handler.delete_pool_stack(self.ctx, 'solum-pool-1')
+
+        stacks.get.assert_called_once_with('solum-pool-1')
+        stacks.delete.assert_called_once_with('pool_id')
+        stacks.get.side_effect = exc.HTTPNotFound
+        handler.delete_pool_stack(self.ctx, 'solum-pool-2')
+
+    @mock.patch('solum.common.catalog.get')
+    @mock.patch('solum.common.catalog.get_from_contrib')
+    @mock.patch('solum.common.clients.OpenStackClients')
+    def test_create_pool_stack(self, mock_clients, mock_contrib,
+                               mock_get_templ):
+        handler = heat_handler.Handler()
+        handler._du_pointer_url = mock.MagicMock(return_value='http://p')
+        mock_get_templ.return_value = 'template'
+        mock_contrib.return_value = 'robust_file'
+        cfg.CONF.deployer.flavor = 'flavor'
+        cfg.CONF.deployer.image = 'coreos'
+        cfg.CONF.set_override('idle_timeout', 3000, group='warm_pool')
+        stacks = mock_clients.return_value.heat.return_value.stacks
+        stacks.create.return_value = {"stack": {
+            "id": "pool_id",
+            "links": [{"href": "http://fake.ref", "rel": "self"}]}}
+
+        stack_name = 'solum-pool-1'
+        stack_id, uri = handler.create_pool_stack(self.ctx, stack_name)
+
+        self.assertEqual('pool_id', stack_id)
+        self.assertEqual('http://fake.ref', uri)
+        handler._du_pointer_url.assert_called_once_with(
+            mock.ANY, '%s.location' % stack_name)
+        stacks.create.assert_called_once_with(
+            stack_name=stack_name, template='template',
+            parameters={'name': stack_name, 'flavor': 'flavor',
+                        'image': 'coreos', 'location': 'http://p',
+                        'du': heat_handler.PENDING_DU, 'publish_ports': '',
+                        'wait_timeout': 3600},
+            files={self._get_key(): 'robust_file'}, timeout_mins=61)
+
+    def _reuse_plan_stack_deploy(self, mock_clients, mock_registry,
+                                 mock_get_templ):
+        handler = heat_handler.Handler()
+        fake_assembly = fakes.FakeAssembly()
+        old_assembly = fakes.FakeAssembly()
+        old_assembly.id = 7
+        old_assembly.uuid = 'old_uuid'
+        mock_registry.Assembly.get_by_id.return_value = fake_assembly
+        mock_registry.AssemblyList.get_earlier.return_value = [old_assembly]
+        mock_registry.Assembly.move_heat_stack.return_value = True
+        mock_get_templ.return_value = self._get_fake_template()
+        # The old assembly's stack, then the same stack once adopted.
+        handler._find_id_if_stack_exists = mock.MagicMock(
+            side_effect=[None, '42', '42'])
+        handler._get_stack_name_of = mock.MagicMock(
+            return_value='faker-old_uuid')
+        handler._check_stack_status = mock.MagicMock()
+
+        cfg.CONF.api.image_format = "docker"
+        cfg.CONF.deployer.reuse_plan_stack = True
+        return handler, fake_assembly
+
+    @mock.patch('solum.common.catalog.get_from_contrib')
+    @mock.patch('solum.common.heat_utils.get_network_parameters')
+    @mock.patch('solum.deployer.handlers.heat.tlog')
+    @mock.patch('solum.deployer.handlers.heat.update_assembly')
+    @mock.patch('solum.common.catalog.get')
+    @mock.patch('solum.objects.registry')
+    @mock.patch('solum.common.clients.OpenStackClients')
+    def test_deploy_reuses_plan_stack(self, mock_clients, mock_registry,
+                                      mock_get_templ, mock_ua, m_log,
+                                      mock_net, mock_contrib):
+        handler, fake_assembly = self._reuse_plan_stack_deploy(
+            mock_clients, mock_registry, mock_get_templ)
+        mock_net.return_value = {}
+        mock_contrib.return_value = "robust_file"
+
+        handler.deploy(self.ctx, 77, 'img', 'du-name', [80])
+
+        mock_registry.Assembly.move_heat_stack.assert_called_once_with(
+            self.ctx, 7, fake_assembly.id)
+        stacks = mock_clients.return_value.heat.return_value.stacks
+        self.assertFalse(stacks.create.called)
+        stacks.update.assert_called_once_with(
+            '42', stack_name='faker-old_uuid', template=mock.ANY,
+            parameters={'app_name': 'faker', 'image': 'img', 'port': 80},
+            files={self._get_key(): "robust_file"})
+        stack = stacks.get.return_value
+        handler._check_stack_status.assert_called_once_with(
+            self.ctx, 77, mock.ANY, '42', [80], mock.ANY,
+            previous=(stack.action, stack.updated_time))
+
+    @mock.patch('solum.common.catalog.get_from_contrib')
+    @mock.patch('solum.common.heat_utils.get_network_parameters')
+    @mock.patch('solum.deployer.handlers.heat.tlog')
+    @mock.patch('solum.deployer.handlers.heat.update_assembly')
+    @mock.patch('solum.common.catalog.get')
+    @mock.patch('solum.objects.registry')
+    @mock.patch('solum.common.clients.OpenStackClients')
+    def test_deploy_reuse_update_failure(self, mock_clients, mock_registry,
+                                         mock_get_templ, mock_ua, m_log,
+                                         mock_net, mock_contrib):
+        handler, fake_assembly = self._reuse_plan_stack_deploy(
+            mock_clients, mock_registry, mock_get_templ)
+        mock_net.return_value = {}
+        stacks = mock_clients.return_value.heat.return_value.stacks
+        stacks.update.side_effect = Exception
+
+        handler.deploy(self.ctx, 77, 'img', 'du-name', [80])
+
+        self.assertEqual(
+            [mock.call(self.ctx, 7, fake_assembly.id),
+             mock.call(self.ctx, fake_assembly.id, 7)],
+            mock_registry.Assembly.move_heat_stack.call_args_list)
+        mock_ua.assert_called_once_with(self.ctx, 77,
+                                        {'status': STATES.ERROR})
+        self.assertFalse(handler._check_stack_status.called)
+
+    def test_get_stack_name_of(self):
+        handler = heat_handler.Handler()
+        assem = fakes.FakeAssembly()
+        assem.heat_stack_component.resource_uri = (
+            'http://heat/v1/t/stacks/faker-old_uuid/42')
+        self.assertEqual('faker-old_uuid', handler._get_stack_name_of(assem))
+        assem.heat_stack_component = None
+        self.assertEqual('faker-test_uuid',
+                         handler._get_stack_name_of(assem))
+
+    @mock.patch('solum.common.clients.get_client_option')
+    def test_du_pointer_url(self, mock_option):
+        handler = heat_handler.Handler()
+        osc = mock.MagicMock()
+        catalog = osc.keystone.return_value.client.service_catalog
+        catalog.url_for.return_value = 'http://swift:8080/v1/AUTH_t'
+        cfg.CONF.worker.temp_url_protocol = 'https'
+
+        url = handler._du_pointer_url(osc, 'faker-test_uuid.location')
+
+        self.assertTrue(url.startswith(
+            'https://swift:8080/v1/AUTH_t/solum_du/faker-test_uuid.location'
+            '?temp_url_sig='))
+        self.assertIn('&temp_url_expires=', url)
+
     @mock.patch('solum.deployer.handlers.heat.tlog')
     @mock.patch('solum.deployer.handlers.heat.update_assembly')
     @mock.patch('solum.common.catalog.get')
@@ -539,6 +1045,39 @@ class HandlerTest(base.BaseTestCase):
                                         {'status':
                                          STATES.ERROR_STACK_CREATE_FAILED})
 
+    @mock.patch('solum.deployer.handlers.heat.update_assembly')
+    @mock.patch('solum.common.clients.OpenStackClients')
+    def test_check_stack_status_waits_for_update(self, mock_clients,
+                                                 mock_ua):
+        handler = heat_handler.Handler()
+        handler._parse_server_url = mock.MagicMock(return_value=None)
+        old = mock.MagicMock(action='CREATE', status='COMPLETE',
+                             updated_time=None)
+        started = mock.MagicMock(action='UPDATE', status='IN_PROGRESS',
+                                 updated_time='t1')
+        done = mock.MagicMock(action='UPDATE', status='COMPLETE',
+                              updated_time='t1')
+        mock_clients.heat().stacks.get.side_effect = [old, started, done]
+
+        cfg.CONF.set_override('wait_interval', 0, group='deployer')
+        cfg.CONF.set_override('growth_factor', 1, group='deployer')
+        cfg.CONF.set_override('max_attempts', 3, group='deployer')
+
+        handler._check_stack_status(self.ctx, 77, mock_clients, 'fake_id',
+                                    [80], mock.MagicMock(),
+                                    previous=('CREATE', None))
+        self.assertEqual(3, mock_clients.heat().stacks.get.call_count)
+        handler._parse_server_url.assert_called_once_with(done)
+
+        mock_clients.heat().stacks.get.side_effect = [old]
+        mock_ua.reset_mock()
+        cfg.CONF.set_override('max_attempts', 1, group='deployer')
+        handler._check_stack_status(self.ctx, 77, mock_clients, 'fake_id',
+                                    [80], mock.MagicMock(),
+                                    previous=('CREATE', None))
+        mock_ua.assert_called_once_with(
+            self.ctx, 77, {'status': STATES.ERROR_STACK_CREATE_FAILED})
+
     def test_parse_server_url(self):
         handler = heat_handler.Handler()
         heat_output = mock.MagicMock()
@@ -714,9 +1253,10 @@ class HandlerTest(base.BaseTestCase):
         self.assertEqual(old_app.plan_uuid, new_app.plan_uuid)
         mr.AssemblyList.get_earlier.return_value = [old_app]
 
-        handler.destroy_assembly = mock.MagicMock()
+        handler._superseded = mock.MagicMock()
         handler._destroy_other_assemblies(self.ctx, new_app.id)
-        handler.destroy_assembly.assert_called_once_with(self.ctx, old_app.id)
+        handler._superseded.submit.assert_called_once_with(
+            self.ctx, old_app.id)
 
     @mock.patch('solum.objects.registry')
     def test_successful_deploy_preserves_others(self, mr):
@@ -735,9 +1275,9 @@ class HandlerTest(base.BaseTestCase):
         self.assertNotEqual(old_app.plan_uuid, new_app.plan_uuid)
         mr.AssemblyList.get_earlier.return_value = [old_app]
 
-        handler.destroy_assembly = mock.MagicMock()
+        handler._superseded = mock.MagicMock()
         handler._destroy_other_assemblies(self.ctx, new_app.id)
-        self.assertEqual(1, handler.destroy_assembly.call_count)
+        self.assertEqual(1, handler._superseded.submit.call_count)
 
     @mock.patch('solum.objects.registry')
     def test_successful_deploy_preserves_notreadies(self, mr):
@@ -756,9 +1296,9 @@ class HandlerTest(base.BaseTestCase):
         self.assertEqual(old_app.plan_uuid, new_app.plan_uuid)
         mr.AssemblyList.get_earlier.return_value = []
 
-        handler.destroy_assembly = mock.MagicMock()
+        handler._superseded = mock.MagicMock()
         handler._destroy_other_assemblies(self.ctx, new_app.id)
-        self.assertEqual(0, handler.destroy_assembly.call_count)
+        self.assertEqual(0, handler._superseded.submit.call_count)
 
     @mock.patch('solum.objects.registry')
     def test_unsuccessful_deploy_preserves_everyone(self, mr):
@@ -777,9 +1317,28 @@ class HandlerTest(base.BaseTestCase):
         self.assertEqual(old_app.plan_uuid, new_app.plan_uuid)
         mr.AssemblyList.get_earlier.return_value = []
 
-        handler.destroy_assembly = mock.MagicMock()
+        handler._superseded = mock.MagicMock()
         handler._destroy_other_assemblies(self.ctx, new_app.id)
-        self.assertEqual(0, handler.destroy_assembly.call_count)
+        self.assertEqual(0, handler._superseded.submit.call_count)
+
+    @mock.patch('solum.objects.registry')
+    def test_destroy_app_skips_queued(self, mr):
+        handler = heat_handler.Handler()
+        queued = fakes.FakeAssembly()
+        queued.id = 8
+        other = fakes.FakeAssembly()
+        other.id = 9
+        queued.plan_id = other.plan_id = 5
+        mr.AssemblyList.get_all.return_value = [queued, other]
+        handler._superseded._pending[queued.id] = mock.MagicMock()
+
+        mock_destroy = handler._superseded._destroy = mock.MagicMock()
+        handler.destroy_app(self.ctx, 5)
+
+        mock_destroy.assert_called_once_with(self.ctx, other.id)
+        handler._superseded._pending[queued.id].wait.assert_called_once_with()
+        mr.Plan.get_by_id.return_value.destroy.assert_called_once_with(
+            self.ctx)
 
     def _get_key(self):
         return "robust-du-handling.sh"
@@ -0,0 +1,76 @@
+# Copyright 2014 - Rackspace Hosting
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import mock
+
+from solum.deployer import teardown
+from solum.tests import base
+from solum.tests import utils
+
+
+class TestReaper(base.BaseTestCase):
+    def setUp(self):
+        super(TestReaper, self).setUp()
+        self.ctx = utils.dummy_context()
+        self.destroy = mock.MagicMock()
+
+    def test_inline(self):
+        reaper = teardown.Reaper(self.destroy, 0)
+        self.assertTrue(reaper.submit(self.ctx, 7))
+        self.destroy.assert_called_once_with(self.ctx, 7)
+        self.assertEqual(0, len(reaper))
+
+    @mock.patch('eventlet.spawn')
+    def test_submit_queues_once(self, mock_spawn):
+        reaper = teardown.Reaper(self.destroy, 2)
+        self.assertTrue(reaper.submit(self.ctx, 7))
+        self.assertFalse(reaper.submit(self.ctx, 7))
+        self.assertTrue(reaper.submit(self.ctx, 8))
+        self.assertEqual(2, mock_spawn.call_count)
+        self.assertEqual(2, len(reaper))
+        self.assertFalse(self.destroy.called)
+
+        reaper._run(*reaper._queue.get())
+        self.destroy.assert_called_once_with(self.ctx, 7)
+        self.assertEqual(1, len(reaper))
+        self.assertTrue(reaper.submit(self.ctx, 7))
+
+    @mock.patch('eventlet.spawn')
+    def test_run_survives_failure(self, mock_spawn):
+        self.destroy.side_effect = Exception
+        reaper = teardown.Reaper(self.destroy, 1)
+        reaper.submit(self.ctx, 7)
+        reaper._run(*reaper._queue.get())
+        self.assertEqual(0, len(reaper))
+
+    @mock.patch('eventlet.spawn')
+    def test_destroy_waits_for_queued(self, mock_spawn):
+        reaper = teardown.Reaper(self.destroy, 1)
+        reaper.submit(self.ctx, 7)
+        done = reaper._pending[7]
+        with mock.patch.object(done, 'wait') as mock_wait:
+            reaper.destroy(self.ctx, 7)
+        mock_wait.assert_called_once_with()
+        self.assertFalse(self.destroy.called)
+
+    def test_destroy_blocks_submit(self):
+        reaper = teardown.Reaper(self.destroy, 1)
+
+        def destroy(ctxt, assembly_id):
+            self.assertFalse(reaper.submit(ctxt, assembly_id))
+        self.destroy.side_effect = destroy
+
+        reaper.destroy(self.ctx, 7)
+        self.destroy.assert_called_once_with(self.ctx, 7)
+        self.assertEqual(0, len(reaper))
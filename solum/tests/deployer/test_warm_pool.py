@@ -0,0 +1,126 @@
+# Copyright 2014 - Rackspace Hosting
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import mock
+from oslo.config import cfg
+
+from solum.deployer import warm_pool
+from solum.tests import base
+from solum.tests import utils
+
+
+def _row(id, project_id='t1'):
+    return mock.MagicMock(id=id, project_id=project_id,
+                          heat_stack_id='stack-%d' % id,
+                          stack_name='solum-pool-%d' % id)
+
+
+@mock.patch('solum.deployer.warm_pool.db')
+class TestWarmPool(base.BaseTestCase):
+    def setUp(self):
+        super(TestWarmPool, self).setUp()
+        self.ctx = utils.dummy_context()
+        self.handler = mock.MagicMock()
+        self.handler.pool_key.return_value = ('m1.small', 'coreos')
+        cfg.CONF.set_override('size', 2, group='warm_pool')
+
+    def test_pool_size(self, mock_db):
+        cfg.CONF.set_override('tenant_classes', {'big': 'gold', 'odd': 'x'},
+                              group='warm_pool')
+        cfg.CONF.set_override('class_sizes', {'gold': '5'},
+                              group='warm_pool')
+        self.assertEqual(5, warm_pool.pool_size('big'))
+        self.assertEqual(2, warm_pool.pool_size('odd'))
+        self.assertEqual(2, warm_pool.pool_size('other'))
+
+    def test_claim_disabled(self, mock_db):
+        cfg.CONF.set_override('size', 0, group='warm_pool')
+        self.assertIsNone(warm_pool.claim(self.ctx, 'm1.small', 'coreos'))
+        self.assertFalse(mock_db.claim.called)
+
+    def test_claim(self, mock_db):
+        row = _row(1)
+        mock_db.claim.return_value = row
+        self.assertEqual(row, warm_pool.claim(self.ctx, 'm1.small',
+                                              'coreos'))
+        mock_db.claim.assert_called_once_with(self.ctx.tenant, 'm1.small',
+                                              'coreos', mock.ANY)
+
+    @mock.patch('eventlet.spawn')
+    def test_refill_spawns_once(self, mock_spawn, mock_db):
+        warm_pool.refill(self.ctx, self.handler)
+        warm_pool.refill(self.ctx, self.handler)
+        mock_spawn.assert_called_once_with(warm_pool._refill, self.ctx,
+                                           self.handler)
+        warm_pool._refilling.discard(self.ctx.tenant)
+
+    def test_refill_creates_missing(self, mock_db):
+        mock_db.stale.return_value = []
+        mock_db.count.return_value = 1
+        mock_db.reserve.return_value = 5
+        self.handler.create_pool_stack.return_value = ('id', 'uri')
+        warm_pool._refill(self.ctx, self.handler)
+        mock_db.reserve.assert_called_once_with(self.ctx.tenant, 'm1.small',
+                                                'coreos', mock.ANY)
+        stack_name = mock_db.reserve.call_args[0][3]
+        self.assertTrue(stack_name.startswith(warm_pool.STACK_PREFIX))
+        self.handler.create_pool_stack.assert_called_once_with(self.ctx,
+                                                               stack_name)
+        mock_db.set_stack.assert_called_once_with(5, 'id', 'uri')
+        self.assertNotIn(self.ctx.tenant, warm_pool._refilling)
+
+    def test_refill_reserves_before_create(self, mock_db):
+        mock_db.stale.return_value = []
+        mock_db.count.return_value = 0
+        mock_db.reserve.side_effect = Exception
+        warm_pool._refill(self.ctx, self.handler)
+        self.assertFalse(self.handler.create_pool_stack.called)
+
+    @mock.patch('solum.common.keystone_utils.create_delegation_context')
+    @mock.patch('solum.deployer.warm_pool.retention_db')
+    def test_reap(self, mock_retention, mock_delegate, mock_db):
+        cfg.CONF.set_override('batch_size', 2, group='warm_pool')
+        mock_db.stale.side_effect = [[_row(1), _row(2, 'untrusted')],
+                                     [_row(3)]]
+        mock_db.take.return_value = True
+        mock_retention.trusted_plan.side_effect = (
+            lambda project_id: None if project_id == 'untrusted' else 'plan')
+        trusted_ctx = mock.MagicMock()
+        mock_delegate.return_value = trusted_ctx
+
+        self.assertEqual(2, warm_pool.reap(self.handler))
+
+        self.assertEqual(
+            [mock.call(trusted_ctx, 'solum-pool-1', 'stack-1'),
+             mock.call(trusted_ctx, 'solum-pool-3', 'stack-3')],
+            self.handler.delete_pool_stack.call_args_list)
+        self.assertEqual(1, mock_delegate.call_count)
+        mock_db.stale.assert_called_with('m1.small', 'coreos', mock.ANY, 2,
+                                         2, None)
+
+    def test_reap_puts_back_undeleted(self, mock_db):
+        row = _row(1)
+        mock_db.stale.return_value = [row]
+        mock_db.take.return_value = True
+        self.handler.delete_pool_stack.side_effect = Exception
+        self.assertEqual(0, warm_pool._reap(self.handler,
+                                            lambda project_id: self.ctx))
+        mock_db.put_back.assert_called_once_with(row)
+
+    def test_reap_skips_claimed(self, mock_db):
+        mock_db.stale.return_value = [_row(1)]
+        mock_db.take.return_value = False
+        self.assertEqual(0, warm_pool._reap(self.handler,
+                                            lambda project_id: self.ctx))
+        self.assertFalse(self.handler.delete_pool_stack.called)
@@ -83,6 +83,77 @@ class TestAssembly(base.BaseTestCase):
         updated = assembly.Assembly().get_by_id(self.ctx, self.data[0]['id'])
         self.assertEqual('DELETING', getattr(updated, 'status'))
 
+    def test_update_in_place(self):
+        before = assembly.Assembly().get_by_id(self.ctx, self.data[0]['id'])
+        self.assertTrue(assembly.Assembly.update_in_place(
+            self.ctx, self.data[0]['id'], {'status': 'READY', 'id': 99}))
+        updated = assembly.Assembly().get_by_id(self.ctx, self.data[0]['id'])
+        self.assertEqual('READY', updated.status)
+        self.assertEqual(before.version + 1, updated.version)
+
+    def test_update_in_place_deleting(self):
+        assembly.Assembly.update_in_place(self.ctx, self.data[0]['id'],
+                                          {'status': 'DELETING'})
+        self.assertFalse(assembly.Assembly.update_in_place(
+            self.ctx, self.data[0]['uuid'], {'status': 'READY'}))
+        updated = assembly.Assembly().get_by_id(self.ctx, self.data[0]['id'])
+        self.assertEqual('DELETING', updated.status)
+
+    def test_update_in_place_other_project(self):
+        other = utils.dummy_context(tenant_id='other_project')
+        self.assertFalse(assembly.Assembly.update_in_place(
+            other, self.data[0]['id'], {'status': 'READY'}))
+        self.assertFalse(assembly.Assembly.update_in_place(
+            self.ctx, 12345, {'status': 'READY'}))
+
+    def test_update_in_place_falls_back_for_properties(self):
+        with mock.patch.object(assembly.Assembly,
+                               'update_and_save') as update_and_save:
+            self.assertTrue(assembly.Assembly.update_in_place(
+                self.ctx, self.data[0]['id'], {'plan_uuid': 'p1'}))
+        update_and_save.assert_called_once_with(
+            self.ctx, self.data[0]['id'], {'plan_uuid': 'p1'})
+
+    def _stack(self, assem_id):
+        comp = registry.Component()
+        comp.uuid = str(uuid.uuid4())
+        comp.name = 'stack'
+        comp.component_type = 'heat_stack'
+        comp.heat_stack_id = 'stack-id'
+        comp.assembly_id = assem_id
+        comp.create(self.ctx)
+        return comp
+
+    def _new_assembly(self):
+        new = dict(self.data[0], uuid=str(uuid.uuid4()), name='assembly2')
+        del new['id']
+        utils.create_models_from_data(assembly.Assembly, [new], self.ctx)
+        return new
+
+    def test_move_heat_stack(self):
+        old = assembly.Assembly().get_by_id(self.ctx, self.data[0]['id'])
+        comp = self._stack(old.id)
+        new = self._new_assembly()
+        self.assertTrue(assembly.Assembly.move_heat_stack(
+            self.ctx, old.id, new['id']))
+        self.assertIsNone(old.heat_stack_component)
+        moved = assembly.Assembly().get_by_id(self.ctx, new['id'])
+        self.assertEqual(comp.id, moved.heat_stack_component.id)
+        # Only once.
+        self.assertFalse(assembly.Assembly.move_heat_stack(
+            self.ctx, old.id, new['id']))
+
+    def test_move_heat_stack_deleting(self):
+        old_id = self.data[0]['id']
+        self._stack(old_id)
+        new = self._new_assembly()
+        assembly.Assembly.update_in_place(self.ctx, new['id'],
+                                          {'status': 'DELETING'})
+        self.assertFalse(assembly.Assembly.move_heat_stack(
+            self.ctx, old_id, new['id']))
+        old = assembly.Assembly().get_by_id(self.ctx, old_id)
+        self.assertIsNotNone(old.heat_stack_component)
+
     @mock.patch('solum.objects.sqlalchemy.models.SolumBase.get_session')
     @mock.patch('solum.objects.sqlalchemy.models.LOG')
     def test_update_and_save_raise_exp(self, mock_log, mock_sess):
@@ -67,6 +67,47 @@ class TestImage(base.BaseTestCase):
                                          self.data[0]['uuid'],
                                          False)
 
+    def _lp(self, ctx, uuid, name):
+        lp = image.Image()
+        lp.update({'uuid': uuid, 'name': name, 'project_id': ctx.tenant,
+                   'artifact_type': 'language_pack', 'status': 'READY'})
+        lp.create(ctx)
+        return lp
+
+    @mock.patch.object(image, 'operator_id', 'operator')
+    def test_operator_lps_cached(self):
+        image.invalidate_operator_lps()
+        self.addCleanup(image.invalidate_operator_lps)
+        op_ctx = utils.dummy_context(tenant_id='operator')
+        op_lp = self._lp(op_ctx, 'b3a6c6b6-1a88-4c63-a0a2-8b6f0d4e8a51',
+                         'op-lp')
+
+        lps = image.Image.get_all_languagepacks(self.ctx)
+        self.assertEqual(['op-lp'], [lp.name for lp in lps])
+        image.Image.update_in_place(op_ctx, op_lp.id, {'status': 'ERROR'})
+        self.assertEqual(1, len(image.Image.get_all_languagepacks(self.ctx)))
+        image.Image.invalidate_operator_lps()
+        self.assertEqual([], image.Image.get_all_languagepacks(self.ctx))
+
+    @mock.patch.object(image, 'operator_id', 'operator')
+    def test_get_lp_prefers_own(self):
+        op_ctx = utils.dummy_context(tenant_id='operator')
+        op_lp = self._lp(op_ctx, 'b3a6c6b6-1a88-4c63-a0a2-8b6f0d4e8a51',
+                         'shared')
+        own_lp = self._lp(self.ctx, 'c6e1b0a4-57f1-4b9e-9a3d-2c7e5f0d9b12',
+                          'shared')
+        self._lp(op_ctx, '0f3c2a8e-9d41-4b7a-8e6f-5a1d2c3b4e5f', 'op-only')
+
+        found = image.Image.get_lp_by_name_or_uuid(
+            self.ctx, 'shared', include_operators_lp=True)
+        self.assertEqual(own_lp.uuid, found.uuid)
+        found = image.Image.get_lp_by_name_or_uuid(
+            self.ctx, op_lp.uuid, include_operators_lp=True)
+        self.assertEqual(op_lp.uuid, found.uuid)
+        found = image.Image.get_lp_by_name_or_uuid(
+            self.ctx, 'op-only', include_operators_lp=True)
+        self.assertEqual('operator', found.project_id)
+
 
 class TestStates(base.BaseTestCase):
     def test_as_dict(self):
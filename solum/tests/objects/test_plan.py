@@ -50,3 +50,30 @@ class TestPlan(base.BaseTestCase):
         pl = plan.Plan().get_by_uuid(self.ctx, self.data[0]['uuid'])
         for key, value in self.data[0].items():
             self.assertEqual(value, getattr(pl, key))
+
+    def test_language_pack_references(self):
+        pl = plan.Plan()
+        pl.uuid = 'test-uuid-456'
+        pl.project_id = self.ctx.tenant
+        pl.raw_content = {'artifacts': [{'language_pack': 'java'},
+                                        {'language_pack': 'python'}]}
+        pl.create(self.ctx)
+        self.assertTrue(plan.Plan.language_pack_in_use(self.ctx, ['python']))
+        self.assertFalse(plan.Plan.language_pack_in_use(self.ctx, ['ruby']))
+
+        plan.Plan.update_and_save(self.ctx, pl.uuid, {'raw_content': {
+            'artifacts': [{'language_pack': 'ruby'}]}})
+        self.assertTrue(plan.Plan.language_pack_in_use(self.ctx, ['ruby']))
+        self.assertFalse(plan.Plan.language_pack_in_use(self.ctx, ['java']))
+
+        other = utils.dummy_context(tenant_id='other_project')
+        self.assertFalse(plan.Plan.language_pack_in_use(other, ['ruby']))
+
+        plan.Plan.get_by_uuid(self.ctx, pl.uuid).destroy(self.ctx)
+        self.assertFalse(plan.Plan.language_pack_in_use(self.ctx, ['ruby']))
+
+    def test_language_packs(self):
+        self.assertEqual(set(), plan.language_packs(None))
+        self.assertEqual(set(['a', 'b']), plan.language_packs(
+            {'artifacts': [{'language_pack': 'a'}, {'language_pack': 'b'},
+                           {'language_pack': 'a'}, {'name': 'c'}]}))
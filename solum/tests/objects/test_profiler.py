@@ -0,0 +1,78 @@
+# Copyright 2014 - Rackspace Hosting
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import mock
+from oslo.config import cfg
+
+from solum.objects.sqlalchemy import profiler
+from solum.tests import base
+
+
+class TestProfiler(base.BaseTestCase):
+    def setUp(self):
+        super(TestProfiler, self).setUp()
+        self.addCleanup(profiler.stop)
+
+    def test_record_without_profile(self):
+        profiler.record('SELECT 1', 0.1)
+        self.assertIsNone(profiler.current())
+
+    def test_profile(self):
+        with profiler.profile('req-1') as prof:
+            profiler.record('SELECT 1', 0.1)
+            profiler.record('UPDATE plan', 0.2)
+        self.assertIsNone(profiler.current())
+        self.assertEqual('req-1', prof.request_id)
+        self.assertEqual(2, prof.query_count)
+        self.assertAlmostEqual(0.3, prof.total_time)
+        self.assertEqual([], prof.slow_queries)
+
+    def test_slow_query_origin(self):
+        cfg.CONF.set_override('slow_query_threshold', 0.5,
+                              group='db_profiler')
+        self.addCleanup(cfg.CONF.reset)
+        with profiler.profile() as prof:
+            profiler.record('SELECT * FROM plan', 0.75)
+        slow = prof.slow_queries[0]
+        self.assertEqual('SELECT * FROM plan', slow['statement'])
+        self.assertIn('test_slow_query_origin', slow['origin'][-1])
+
+    def test_query_budget(self):
+        def over_budget():
+            with profiler.profile(max_queries=1):
+                profiler.record('SELECT 1', 0.0)
+                profiler.record('SELECT 2', 0.0)
+        self.assertRaises(profiler.QueryBudgetExceeded, over_budget)
+
+        with profiler.profile(max_queries=1) as prof:
+            profiler.record('SELECT 1', 0.0)
+        self.assertEqual(1, prof.query_count)
+
+    def test_profiled_endpoint(self):
+        cfg.CONF.set_override('enabled', True, group='db_profiler')
+        self.addCleanup(cfg.CONF.reset)
+        seen = []
+
+        def build(ctxt, assembly_id):
+            profiler.record('SELECT 1', 0.0)
+            seen.append(profiler.current())
+        endpoint = mock.MagicMock()
+        endpoint.build.side_effect = build
+        ctxt = mock.MagicMock(request_id='req-2')
+
+        profiler.ProfiledEndpoint(endpoint).build(ctxt, assembly_id=1)
+        endpoint.build.assert_called_once_with(ctxt, assembly_id=1)
+        self.assertEqual('req-2', seen[0].request_id)
+        self.assertEqual(1, seen[0].query_count)
+        self.assertIsNone(profiler.current())
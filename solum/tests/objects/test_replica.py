@@ -0,0 +1,75 @@
+# Copyright 2014 - Rackspace Hosting
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import mock
+from oslo.config import cfg
+
+from solum.objects import sqlalchemy as object_sqla
+from solum.tests import base
+from solum.tests import utils
+
+
+@mock.patch.object(object_sqla, 'get_facade')
+class TestReplicaRouting(base.BaseTestCase):
+    def setUp(self):
+        super(TestReplicaRouting, self).setUp()
+        cfg.CONF.set_override('slave_connection', 'sqlite://',
+                              group='database')
+        cfg.CONF.set_override('read_your_writes_window', 10,
+                              group='database')
+        self.ctx = utils.dummy_context(tenant_id='reader')
+        self.addCleanup(object_sqla._LAST_WRITE.clear)
+
+    def _use_slave(self, facade):
+        return facade.return_value.get_session.call_args[1]['use_slave']
+
+    def test_primary_by_default(self, facade):
+        object_sqla.get_session()
+        self.assertFalse(self._use_slave(facade))
+
+    def test_replica_reads(self, facade):
+        with object_sqla.replica_reads(self.ctx):
+            object_sqla.get_session()
+            self.assertTrue(self._use_slave(facade))
+            with object_sqla.primary():
+                object_sqla.get_session()
+                self.assertFalse(self._use_slave(facade))
+        object_sqla.get_session()
+        self.assertFalse(self._use_slave(facade))
+
+    def test_no_slave_connection(self, facade):
+        cfg.CONF.set_override('slave_connection', None, group='database')
+        with object_sqla.replica_reads(self.ctx):
+            object_sqla.get_session()
+        self.assertFalse(self._use_slave(facade))
+
+    def test_read_your_writes(self, facade):
+        object_sqla.record_write(self.ctx)
+        with object_sqla.replica_reads(self.ctx):
+            object_sqla.get_session()
+        self.assertFalse(self._use_slave(facade))
+
+        other = utils.dummy_context(tenant_id='other')
+        with object_sqla.replica_reads(other):
+            object_sqla.get_session()
+        self.assertTrue(self._use_slave(facade))
+
+    @mock.patch('time.time')
+    def test_write_window_expires(self, mock_time, facade):
+        mock_time.return_value = 100
+        object_sqla.record_write(self.ctx)
+        mock_time.return_value = 111
+        with object_sqla.replica_reads(self.ctx):
+            object_sqla.get_session()
+        self.assertTrue(self._use_slave(facade))
@@ -0,0 +1,126 @@
+# Copyright 2014 - Rackspace Hosting
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import datetime
+import uuid
+
+import mock
+
+from solum.objects.sqlalchemy import assembly
+from solum.objects.sqlalchemy import component
+from solum.objects.sqlalchemy import image
+from solum.objects.sqlalchemy import retention
+from solum.objects.sqlalchemy import userlog
+from solum.tests import base
+from solum.tests import utils
+
+NOW = datetime.datetime(2014, 10, 1)
+OLD = NOW - datetime.timedelta(days=60)
+
+
+class TestRetention(base.BaseTestCase):
+    def setUp(self):
+        super(TestRetention, self).setUp()
+        self.db = self.useFixture(utils.Database())
+        self.ctx = utils.dummy_context()
+        self.policy = (NOW - datetime.timedelta(days=30), {})
+
+    def _assembly(self, status, created_at, project_id=None):
+        data = [{'uuid': str(uuid.uuid4()),
+                 'project_id': project_id or self.ctx.tenant,
+                 'plan_id': 1,
+                 'status': status,
+                 'created_at': created_at}]
+        utils.create_models_from_data(assembly.Assembly, data, self.ctx)
+        return data[0]['id']
+
+    def _ids(self, model):
+        session = utils.get_dummy_session()
+        return set(row.id for row in session.query(model))
+
+    def test_purge_assemblies(self):
+        old_error = self._assembly('ERROR', OLD)
+        new_error = self._assembly('ERROR', NOW)
+        old_ready = self._assembly('READY', OLD)
+        with_stack = self._assembly('ERROR', OLD)
+        utils.create_models_from_data(
+            component.Component,
+            [{'assembly_id': old_error, 'component_type': 'Image_Build'},
+             {'assembly_id': with_stack, 'component_type': 'heat_stack'}],
+            self.ctx)
+
+        self.assertEqual(1, retention.purge_assemblies(self.policy,
+                                                       ['ERROR'], 10))
+        self.assertEqual(set([new_error, old_ready, with_stack]),
+                         self._ids(assembly.Assembly))
+        self.assertEqual(1, len(self._ids(component.Component)))
+
+    def test_purge_rechecks_status(self):
+        picked_up = self._assembly('BUILDING', OLD)
+        utils.create_models_from_data(
+            component.Component,
+            [{'assembly_id': picked_up, 'component_type': 'Image_Build'}],
+            self.ctx)
+        # As if it had been selected while still in ERROR.
+        with mock.patch.object(retention, '_expired_assembly_ids',
+                               return_value=[picked_up]):
+            self.assertEqual(0, retention.purge_assemblies(self.policy,
+                                                           ['ERROR'], 10))
+        self.assertEqual(set([picked_up]), self._ids(assembly.Assembly))
+        self.assertEqual(1, len(self._ids(component.Component)))
+
+    def test_tenant_policy(self):
+        mine = self._assembly('ERROR', OLD)
+        theirs = self._assembly('ERROR', OLD, project_id='keeper')
+        policy = (self.policy[0], {'keeper': OLD - datetime.timedelta(1)})
+        self.assertEqual(1, retention.purge_assemblies(policy, ['ERROR'],
+                                                       10))
+        self.assertEqual(set([theirs]), self._ids(assembly.Assembly))
+        self.assertNotIn(mine, self._ids(assembly.Assembly))
+
+    def test_orphaned_images(self):
+        data = [{'uuid': str(uuid.uuid4()), 'created_at': OLD,
+                 'project_id': self.ctx.tenant},
+                {'uuid': str(uuid.uuid4()), 'created_at': OLD,
+                 'project_id': self.ctx.tenant},
+                {'uuid': str(uuid.uuid4()), 'created_at': OLD,
+                 'project_id': self.ctx.tenant,
+                 'artifact_type': 'language_pack'}]
+        utils.create_models_from_data(image.Image, data, self.ctx)
+        assem = self._assembly('READY', OLD)
+        session = utils.get_dummy_session()
+        with session.begin():
+            session.query(assembly.Assembly).filter_by(id=assem).update(
+                {'image_id': data[1]['id']})
+
+        orphans = retention.orphaned_images(self.policy, 10)
+        self.assertEqual([data[0]['id']], [img.id for img in orphans])
+        self.assertEqual([], retention.orphaned_images(self.policy, 10,
+                                                       data[0]['id']))
+
+    def test_orphaned_userlogs(self):
+        kept = self._assembly('READY', OLD)
+        kept_uuid = assembly.Assembly.get_by_id(self.ctx, kept).uuid
+        data = [{'resource_uuid': kept_uuid, 'created_at': OLD,
+                 'project_id': self.ctx.tenant},
+                {'resource_uuid': str(uuid.uuid4()), 'created_at': OLD,
+                 'project_id': self.ctx.tenant},
+                {'resource_uuid': str(uuid.uuid4()), 'created_at': NOW,
+                 'project_id': self.ctx.tenant}]
+        utils.create_models_from_data(userlog.Userlog, data, self.ctx)
+
+        orphans = retention.orphaned_userlogs(self.policy, 10)
+        self.assertEqual([data[1]['id']], [ulog.id for ulog in orphans])
+        self.assertEqual(1, retention.delete_userlogs([data[1]['id']]))
+        self.assertEqual(0, retention.delete_userlogs([]))
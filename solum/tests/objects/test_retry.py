@@ -0,0 +1,85 @@
+# Copyright 2014 - Rackspace Hosting
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import mock
+from oslo.config import cfg
+from oslo.db import exception as db_exc
+
+from solum.objects.sqlalchemy import models
+from solum.tests import base
+
+
+@mock.patch('solum.objects.sqlalchemy.models.time.sleep')
+class TestRetry(base.BaseTestCase):
+    def setUp(self):
+        super(TestRetry, self).setUp()
+        cfg.CONF.set_override('deadlock_retry_interval', 0.1,
+                              group='database')
+        cfg.CONF.set_override('deadlock_max_retry_interval', 0.3,
+                              group='database')
+        cfg.CONF.set_override('deadlock_max_retries', 4, group='database')
+
+    def test_backoff_is_capped(self, mock_sleep):
+        for tries in range(10):
+            delay = models._backoff(tries)
+            self.assertTrue(0 <= delay <= min(0.3, 0.1 * 2 ** tries))
+
+    @mock.patch('random.uniform')
+    def test_retries_with_backoff(self, mock_uniform, mock_sleep):
+        mock_uniform.side_effect = lambda low, high: high
+        calls = []
+
+        @models.retry
+        def deadlocks_twice():
+            calls.append(1)
+            if len(calls) < 3:
+                raise db_exc.DBDeadlock()
+            return 'done'
+
+        retries = models.RETRIES.value(call='deadlocks_twice',
+                                       error='DBDeadlock')
+        self.assertEqual('done', deadlocks_twice())
+        self.assertEqual([mock.call(0.1), mock.call(0.2)],
+                         mock_sleep.call_args_list)
+        self.assertEqual(retries + 2,
+                         models.RETRIES.value(call='deadlocks_twice',
+                                              error='DBDeadlock'))
+
+    def test_gives_up(self, mock_sleep):
+        @models.retry
+        def always_deadlocks():
+            raise db_exc.DBDeadlock()
+
+        exhausted = models.RETRIES_EXHAUSTED.value(call='always_deadlocks')
+        self.assertRaises(db_exc.DBDeadlock, always_deadlocks)
+        self.assertEqual(3, mock_sleep.call_count)
+        self.assertEqual(exhausted + 1,
+                         models.RETRIES_EXHAUSTED.value(
+                             call='always_deadlocks'))
+        self.assertRaises(db_exc.DBDeadlock, always_deadlocks,
+                          max_retries=1)
+        self.assertEqual(3, mock_sleep.call_count)
+
+    def test_always_calls_once(self, mock_sleep):
+        cfg.CONF.set_override('deadlock_max_retries', 0, group='database')
+        calls = []
+
+        @models.retry
+        def succeeds():
+            calls.append(1)
+            return 'done'
+
+        self.assertEqual('done', succeeds())
+        self.assertEqual('done', succeeds(max_retries=-1))
+        self.assertEqual(2, len(calls))
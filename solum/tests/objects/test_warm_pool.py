@@ -0,0 +1,97 @@
+# Copyright 2014 - Rackspace Hosting
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import datetime
+
+from solum.objects.sqlalchemy import warm_pool
+from solum.tests import base
+from solum.tests import utils
+
+NOW = datetime.datetime(2014, 10, 1)
+OLD = NOW - datetime.timedelta(hours=2)
+SINCE = NOW - datetime.timedelta(hours=1)
+
+
+class TestWarmPool(base.BaseTestCase):
+    def setUp(self):
+        super(TestWarmPool, self).setUp()
+        self.db = self.useFixture(utils.Database())
+        self.ctx = utils.dummy_context()
+
+    def _stack(self, created_at, project_id='t1', flavor='m1.small'):
+        data = [{'project_id': project_id,
+                 'flavor': flavor,
+                 'image': 'coreos',
+                 'heat_stack_id': 'stack',
+                 'stack_name': 'solum-pool',
+                 'created_at': created_at}]
+        utils.create_models_from_data(warm_pool.WarmStack, data, self.ctx)
+        return data[0]['id']
+
+    def test_claim_oldest_available(self):
+        self._stack(OLD)
+        self._stack(NOW, project_id='t2')
+        self._stack(NOW, flavor='m1.large')
+        newer = self._stack(NOW)
+        older = self._stack(NOW - datetime.timedelta(minutes=5))
+
+        self.assertEqual(2, warm_pool.count('t1', 'm1.small', 'coreos',
+                                            SINCE))
+        self.assertEqual(older, warm_pool.claim('t1', 'm1.small', 'coreos',
+                                                SINCE).id)
+        self.assertEqual(newer, warm_pool.claim('t1', 'm1.small', 'coreos',
+                                                SINCE).id)
+        self.assertIsNone(warm_pool.claim('t1', 'm1.small', 'coreos',
+                                          SINCE))
+
+    def test_reserved_not_claimed(self):
+        row_id = warm_pool.reserve('t1', 'm1.small', 'coreos', 'solum-pool')
+        self.assertEqual(1, warm_pool.count('t1', 'm1.small', 'coreos',
+                                            SINCE))
+        self.assertIsNone(warm_pool.claim('t1', 'm1.small', 'coreos',
+                                          SINCE))
+        self.assertEqual([], warm_pool.stale('m1.large', 'coreos', SINCE,
+                                             10))
+
+        self.assertTrue(warm_pool.set_stack(row_id, 'stack', 'uri'))
+        row = warm_pool.claim('t1', 'm1.small', 'coreos', SINCE)
+        self.assertEqual(('stack', 'uri'), (row.heat_stack_id,
+                                            row.resource_uri))
+        self.assertFalse(warm_pool.set_stack(row_id, 'stack', 'uri'))
+
+    def test_put_back_keeps_age(self):
+        self._stack(OLD)
+        row = warm_pool.stale('m1.small', 'coreos', SINCE, 10)[0]
+        self.assertTrue(warm_pool.take(row.id))
+        warm_pool.put_back(row)
+        stale = warm_pool.stale('m1.small', 'coreos', SINCE, 10)
+        self.assertEqual([OLD], [r.created_at for r in stale])
+
+    def test_take_once(self):
+        row_id = self._stack(NOW)
+        self.assertTrue(warm_pool.take(row_id))
+        self.assertFalse(warm_pool.take(row_id))
+
+    def test_stale(self):
+        old = self._stack(OLD)
+        other_flavor = self._stack(NOW, flavor='m1.large')
+        self._stack(NOW)
+        other_tenant = self._stack(OLD, project_id='t2')
+
+        stale = warm_pool.stale('m1.small', 'coreos', SINCE, 10)
+        self.assertEqual([old, other_flavor, other_tenant],
+                         [row.id for row in stale])
+        stale = warm_pool.stale('m1.small', 'coreos', SINCE, 10,
+                                after_id=old, project_id='t1')
+        self.assertEqual([other_flavor], [row.id for row in stale])
@@ -0,0 +1,91 @@
+# Copyright 2014 - Rackspace Hosting
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import json
+import logging
+
+import fixtures
+import mock
+
+from solum.tests import base
+from solum.tests import fakes
+from solum.tests import utils
+from solum.uploaders import tenant_logger as tlog
+
+
+class TenantLoggerTest(base.BaseTestCase):
+    def setUp(self):
+        super(TenantLoggerTest, self).setUp()
+        self.log_dir = self.useFixture(fixtures.TempDir()).path
+        self.ctxt = utils.dummy_context()
+        self.assembly = fakes.FakeAssembly()
+
+    def _logger(self, stage='deploy'):
+        t_logger = tlog.TenantLogger(self.ctxt, self.assembly, self.log_dir,
+                                     stage)
+        t_logger.uploader = mock.MagicMock()
+        return t_logger
+
+    def test_log_and_upload(self):
+        t_logger = self._logger()
+        t_logger.log(logging.DEBUG, 'Deploying')
+        self.assertEqual(1, len(tlog.WRITERS))
+        t_logger.upload()
+        self.assertEqual(0, len(tlog.WRITERS))
+        t_logger.uploader.upload_log.assert_called_once_with()
+
+        with open(t_logger.path) as fd:
+            level, line = fd.read().split(' - ', 1)
+        self.assertEqual('DEBUG', level)
+        self.assertEqual('Deploying', json.loads(line)['message'])
+
+    def test_shared_writer(self):
+        first = self._logger()
+        second = self._logger()
+        first.log(logging.DEBUG, 'one')
+        second.log(logging.ERROR, 'two')
+        self.assertEqual(1, len(tlog.WRITERS))
+        first.upload()
+        with open(first.path) as fd:
+            self.assertEqual(2, len(fd.readlines()))
+        second.upload()
+        self.assertEqual(0, len(tlog.WRITERS))
+
+    def test_close_uploads_pending_lines(self):
+        with self._logger() as t_logger:
+            t_logger.log(logging.DEBUG, 'one')
+            t_logger.upload()
+            t_logger.log(logging.ERROR, 'two')
+        self.assertEqual(2, t_logger.uploader.upload_log.call_count)
+        self.assertEqual(0, len(tlog.WRITERS))
+
+        t_logger.close()
+        self.assertEqual(2, t_logger.uploader.upload_log.call_count)
+
+    def test_finalize(self):
+        created = []
+
+        @tlog.finalize
+        def deploy(fail):
+            t_logger = self._logger()
+            created.append(t_logger)
+            t_logger.log(logging.DEBUG, 'Deploying')
+            if fail:
+                raise ValueError()
+
+        deploy(False)
+        self.assertRaises(ValueError, deploy, True)
+        for t_logger in created:
+            t_logger.uploader.upload_log.assert_called_once_with()
+        self.assertEqual(0, len(tlog.WRITERS))
@@ -466,6 +466,7 @@ class HandlerTest(base.BaseTestCase):
 
         self.assertEqual(expected, mock_a_update.call_args_list)
 
+    @mock.patch('solum.worker.handlers.shell.Handler._checkout_source')
     @mock.patch('solum.worker.handlers.shell.Handler._get_environment')
     @mock.patch('solum.objects.registry')
     @mock.patch('subprocess.Popen')
@@ -474,7 +475,7 @@ class HandlerTest(base.BaseTestCase):
     @mock.patch('solum.deployer.api.API.deploy')
     def test_unittest_build_deploy(self, mock_deploy, mock_a_update,
                                    mock_b_update, mock_popen, mock_registry,
-                                   mock_get_env):
+                                   mock_get_env, mock_checkout):
         handler = shell_handler.Handler()
         fake_assembly = fakes.FakeAssembly()
         fake_glance_id = str(uuid.uuid4())
@@ -486,8 +487,9 @@ class HandlerTest(base.BaseTestCase):
         mock_popen.return_value.communicate.return_value = [
             'foo\ncreated_image_id=%s\ndocker_image_name=%s' %
             (fake_glance_id, fake_image_name), None]
-        test_env = mock_environment()
-        mock_get_env.return_value = test_env
+        mock_get_env.return_value = mock_environment()
+        mock_checkout.return_value = '/dev/shm/src/abcd'
+        test_env = dict(mock_environment(), SOURCE_DIR='/dev/shm/src/abcd')
         git_info = mock_git_info()
         handler.launch_workflow(
             self.ctx, build_id=5, git_info=git_info,
@@ -530,21 +532,34 @@ class HandlerTest(base.BaseTestCase):
                               ports=[80])]
         self.assertEqual(expected, mock_deploy.call_args_list)
 
+        # One environment and checkout for both stages.
+        self.assertEqual(1, mock_get_env.call_count)
+        mock_checkout.assert_called_once_with(self.ctx, git_info, 44,
+                                              mock.ANY)
+
+        if self.base_image_id != 'auto':
+            # Resolved once for the whole workflow.
+            lookup = mock_registry.Image.get_lp_by_name_or_uuid
+            lookup.assert_called_once_with(self.ctx, self.base_image_id,
+                                           include_operators_lp=True)
+
+    @mock.patch('solum.worker.handlers.shell.Handler._checkout_source')
     @mock.patch('solum.worker.handlers.shell.Handler._do_build')
     @mock.patch('solum.worker.handlers.shell.Handler._get_environment')
     @mock.patch('subprocess.Popen')
     @mock.patch('solum.worker.handlers.shell.update_assembly_status')
     @mock.patch('solum.objects.registry')
     def test_unittest_no_build(self, mock_registry, mock_a_update, mock_popen,
-                               mock_get_env, mock_do_build):
+                               mock_get_env, mock_do_build, mock_checkout):
         handler = shell_handler.Handler()
         mock_assembly = mock.MagicMock()
         mock_registry.Assembly.get_by_id.return_value = mock_assembly
         fake_image = fakes.FakeImage()
         mock_registry.Image.get_lp_by_name_or_uuid.return_value = fake_image
         mock_popen.return_value.wait.return_value = 1
+        mock_get_env.return_value = mock_environment()
+        mock_checkout.return_value = None
         test_env = mock_environment()
-        mock_get_env.return_value = test_env
         git_info = mock_git_info()
         handler.launch_workflow(
             self.ctx, build_id=5, git_info=git_info, name='new_app',
@@ -570,6 +585,125 @@ class HandlerTest(base.BaseTestCase):
 
         assert not mock_do_build.called
 
+    @mock.patch('solum.deployer.api.API.prepare_deploy')
+    def test_pipelined_deploy(self, mock_prepare):
+        cfg.CONF.set_override('pipelined_deploy', True, group='worker')
+        handler = shell_handler.Handler()
+        handler._do_build = mock.MagicMock(return_value=('loc', 'du'))
+        handler._do_deploy = mock.MagicMock()
+
+        handler.launch_workflow(
+            self.ctx, build_id=5, git_info=mock_git_info(), ports=[80],
+            name='new_app', base_image_id='1-2-3-4', source_format='heroku',
+            image_format='docker', assembly_id=44,
+            workflow=['build', 'deploy'], test_cmd=None, run_cmd=None)
+
+        mock_prepare.assert_called_once_with(assembly_id=44, ports=[80])
+        handler._do_deploy.assert_called_once_with(self.ctx, 44, [80],
+                                                   'loc', 'du')
+
+    @mock.patch('solum.deployer.api.API.discard_prepared_stack')
+    @mock.patch('solum.deployer.api.API.prepare_deploy')
+    def test_pipelined_build_failure(self, mock_prepare, mock_discard):
+        cfg.CONF.set_override('pipelined_deploy', True, group='worker')
+        handler = shell_handler.Handler()
+        handler._do_build = mock.MagicMock(return_value=(None, None))
+        handler._do_deploy = mock.MagicMock()
+
+        handler.launch_workflow(
+            self.ctx, build_id=5, git_info=mock_git_info(), ports=[80],
+            name='new_app', base_image_id='1-2-3-4', source_format='heroku',
+            image_format='docker', assembly_id=44,
+            workflow=['build', 'deploy'], test_cmd=None, run_cmd=None)
+
+        mock_discard.assert_called_once_with(assembly_id=44)
+        self.assertFalse(handler._do_deploy.called)
+
+        mock_discard.reset_mock()
+        handler._do_build.side_effect = ValueError
+        self.assertRaises(ValueError, handler.launch_workflow,
+                          self.ctx, build_id=5, git_info=mock_git_info(),
+                          ports=[80], name='new_app',
+                          base_image_id='1-2-3-4', source_format='heroku',
+                          image_format='docker', assembly_id=44,
+                          workflow=['build', 'deploy'], test_cmd=None,
+                          run_cmd=None)
+        mock_discard.assert_called_once_with(assembly_id=44)
+
+    @mock.patch('solum.deployer.api.API.prepare_deploy')
+    def test_pipelined_deploy_needs_deploy(self, mock_prepare):
+        cfg.CONF.set_override('pipelined_deploy', True, group='worker')
+        handler = shell_handler.Handler()
+        handler._do_build = mock.MagicMock(return_value=('loc', 'du'))
+
+        handler.launch_workflow(
+            self.ctx, build_id=5, git_info=mock_git_info(), ports=[80],
+            name='new_app', base_image_id='1-2-3-4', source_format='heroku',
+            image_format='docker', assembly_id=44, workflow=['build'],
+            test_cmd=None, run_cmd=None)
+
+        self.assertFalse(mock_prepare.called)
+
+
+class TestWorkflowContext(base.BaseTestCase):
+    def setUp(self):
+        super(TestWorkflowContext, self).setUp()
+        self.ctx = utils.dummy_context()
+        self.handler = mock.MagicMock()
+        self.handler._get_environment.return_value = mock_environment()
+
+    def test_environment_prepared_once(self):
+        wf_ctx = shell_handler.WorkflowContext(self.ctx, mock_git_info(), 44,
+                                               test_cmd='tox', run_cmd='run')
+        env = wf_ctx.get_environment(self.handler, 'custom')
+        env['TEST'] = 'x'
+        self.assertEqual(mock_environment(),
+                         wf_ctx.get_environment(self.handler, 'custom'))
+        self.handler._get_environment.assert_called_once_with(
+            self.ctx, 'git://example.com/foo', assembly_id=44,
+            test_cmd='tox', run_cmd='run', lp_access='custom')
+        self.assertFalse(self.handler._checkout_source.called)
+
+    @mock.patch('shutil.rmtree')
+    def test_shared_source(self, mock_rmtree):
+        self.handler._checkout_source.return_value = '/src/abcd'
+        wf_ctx = shell_handler.WorkflowContext(self.ctx, mock_git_info(), 44,
+                                               share_source=True)
+        env = wf_ctx.get_environment(self.handler, 'custom')
+        self.assertEqual('/src/abcd', env['SOURCE_DIR'])
+        wf_ctx.get_environment(self.handler, 'custom')
+        self.assertEqual(1, self.handler._checkout_source.call_count)
+        wf_ctx.cleanup()
+        mock_rmtree.assert_called_once_with('/src/abcd', ignore_errors=True)
+
+    def test_checkout_failed(self):
+        self.handler._checkout_source.return_value = None
+        wf_ctx = shell_handler.WorkflowContext(self.ctx, mock_git_info(), 44,
+                                               share_source=True)
+        env = wf_ctx.get_environment(self.handler, 'custom')
+        self.assertNotIn('SOURCE_DIR', env)
+        wf_ctx.cleanup()
+
+    @mock.patch('shutil.rmtree')
+    @mock.patch('subprocess.Popen')
+    def test_checkout_source(self, mock_popen, mock_rmtree):
+        cfg.CONF.set_override('source_checkout_dir', '/src', group='worker')
+        mock_popen.return_value.returncode = 0
+        handler = shell_handler.Handler()
+        env = mock_environment()
+        self.assertEqual('/src/abcd', handler._checkout_source(
+            self.ctx, mock_git_info(), 44, env))
+        script = os.path.join(handler.proj_dir, 'contrib', 'common',
+                              'checkout-app')
+        mock_popen.assert_called_once_with(
+            [script, 'git://example.com/foo', '', '/src/abcd'], env=env,
+            stdout=-1)
+
+        mock_popen.return_value.returncode = 1
+        self.assertIsNone(handler._checkout_source(
+            self.ctx, mock_git_info(), 44, env))
+        mock_rmtree.assert_called_once_with('/src/abcd', ignore_errors=True)
+
 
 class HandlerUtilityTest(base.BaseTestCase):
     def setUp(self):
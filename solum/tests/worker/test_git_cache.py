@@ -0,0 +1,89 @@
+# Copyright 2014 - Rackspace Hosting
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import fcntl
+import os
+
+import fixtures
+import mock
+from oslo.config import cfg
+
+from solum.tests import base
+from solum.worker import git_cache
+
+
+class GitCacheTest(base.BaseTestCase):
+
+    def setUp(self):
+        super(GitCacheTest, self).setUp()
+        self.root = self.useFixture(fixtures.TempDir()).path
+        cfg.CONF.set_override('git_mirror_dir', self.root, group='worker')
+        cfg.CONF.set_override('git_mirror_quota_mb', 1, group='worker')
+
+    def _mirror(self, url, size, used_at):
+        path = git_cache.mirror_path(url)
+        os.makedirs(os.path.join(path, 'objects'))
+        with open(os.path.join(path, 'objects', 'pack'), 'wb') as pack:
+            pack.write(b'x' * size)
+        os.utime(path, (used_at, used_at))
+        return path
+
+    def test_mirror_path(self):
+        path = git_cache.mirror_path('https://example.com/a.git')
+        self.assertEqual(self.root, os.path.dirname(path))
+        self.assertTrue(path.endswith('.git'))
+        self.assertEqual(path,
+                         git_cache.mirror_path('https://example.com/a.git'))
+        self.assertNotEqual(path,
+                            git_cache.mirror_path('https://example.com/b'))
+
+    def test_mirror_path_disabled(self):
+        cfg.CONF.set_override('git_mirror_quota_mb', 0, group='worker')
+        self.assertIsNone(git_cache.mirror_path('https://example.com/a'))
+        self.assertEqual([], git_cache.evict())
+
+    def test_mirror_path_marks_use(self):
+        path = self._mirror('https://example.com/a', 10, 1000)
+        git_cache.mirror_path('https://example.com/a')
+        self.assertTrue(os.path.getmtime(path) > 1000)
+
+    def test_evict_least_recently_used(self):
+        mb = 1024 * 1024
+        oldest = self._mirror('https://example.com/a', mb // 2, 1000)
+        older = self._mirror('https://example.com/b', mb // 2, 2000)
+        newest = self._mirror('https://example.com/c', mb // 2, 3000)
+        self.assertEqual([oldest], git_cache.evict())
+        self.assertFalse(os.path.exists(oldest))
+        self.assertTrue(os.path.exists(older))
+        self.assertTrue(os.path.exists(newest))
+        self.assertEqual(mb, git_cache.MIRROR_BYTES.value())
+
+    def test_evict_skips_locked(self):
+        mb = 1024 * 1024
+        oldest = self._mirror('https://example.com/a', mb // 2, 1000)
+        older = self._mirror('https://example.com/b', mb // 2, 2000)
+        self._mirror('https://example.com/c', mb // 2, 3000)
+        with open(oldest + '.lock', 'a') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            self.assertEqual([older], git_cache.evict())
+        self.assertTrue(os.path.exists(oldest))
+
+    @mock.patch('eventlet.spawn')
+    def test_start_periodic_evict(self, mock_spawn):
+        cfg.CONF.set_override('git_mirror_evict_interval', 0, group='worker')
+        self.assertIsNone(git_cache.start_periodic_evict())
+        cfg.CONF.set_override('git_mirror_evict_interval', 60,
+                              group='worker')
+        git_cache.start_periodic_evict()
+        mock_spawn.assert_called_once_with(git_cache._periodic_evict, 60)
@@ -0,0 +1,160 @@
+# Copyright 2014 - Rackspace Hosting
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import eventlet
+import mock
+
+import solum
+from solum.common import trace_data
+from solum.tests import base
+from solum.tests import utils
+from solum.worker import scheduler
+
+
+class SchedulerTest(base.BaseTestCase):
+
+    def _scheduler(self, max_queued=10, **kwargs):
+        sched = scheduler.Scheduler(max_jobs=1, max_queued=max_queued,
+                                    **kwargs)
+        # Keep jobs queued so the dispatch order can be inspected.
+        sched._dispatch = mock.MagicMock()
+        return sched
+
+    def _drain(self, sched):
+        order = []
+        job = sched._next_job()
+        while job is not None:
+            order.append((job.priority_class, job.tenant))
+            sched._running.clear()
+            job = sched._next_job()
+        return order
+
+    def test_priority_classes(self):
+        sched = self._scheduler(tenant_max_jobs=5)
+        sched.submit(scheduler.UNITTEST, 't1', mock.MagicMock())
+        sched.submit(scheduler.DEPLOY, 't1', mock.MagicMock())
+        sched.submit(scheduler.LANGUAGEPACK, 't2', mock.MagicMock())
+        self.assertEqual([(scheduler.LANGUAGEPACK, 't2'),
+                          (scheduler.DEPLOY, 't1'),
+                          (scheduler.UNITTEST, 't1')],
+                         self._drain(sched))
+
+    def test_fair_share_between_tenants(self):
+        sched = self._scheduler(tenant_max_jobs=5)
+        for i in range(3):
+            sched.submit(scheduler.DEPLOY, 'busy', mock.MagicMock())
+        sched.submit(scheduler.DEPLOY, 'quiet', mock.MagicMock())
+        tenants = [t for pc, t in self._drain(sched)]
+        self.assertEqual(['busy', 'quiet', 'busy', 'busy'], tenants)
+
+    def test_tenant_weights(self):
+        sched = self._scheduler(tenant_max_jobs=5,
+                                tenant_weights={'heavy': '2'})
+        for i in range(4):
+            sched.submit(scheduler.DEPLOY, 'heavy', mock.MagicMock())
+            sched.submit(scheduler.DEPLOY, 'light', mock.MagicMock())
+        tenants = [t for pc, t in self._drain(sched)][:6]
+        self.assertEqual(4, tenants.count('heavy'))
+        self.assertEqual(2, tenants.count('light'))
+
+    def test_tenant_quota(self):
+        sched = self._scheduler(tenant_max_jobs=1)
+        sched.submit(scheduler.DEPLOY, 't1', mock.MagicMock())
+        sched.submit(scheduler.DEPLOY, 't1', mock.MagicMock())
+        self.assertIsNotNone(sched._next_job())
+        self.assertIsNone(sched._next_job())
+        self.assertEqual(1, sched.stats()[scheduler.DEPLOY]['depth'])
+
+    def test_run_releases_tenant_slot(self):
+        sched = self._scheduler(tenant_max_jobs=1)
+        func = mock.MagicMock(side_effect=ValueError)
+        sched.submit(scheduler.UNITTEST, 't1', func, 'ctxt', a=1)
+        job = sched._next_job()
+        sched._run(job)
+        func.assert_called_once_with('ctxt', a=1)
+        self.assertEqual(0, sched.stats()['running'])
+
+    def test_run_keeps_queue_wait(self):
+        sched = self._scheduler()
+        solum.TLS.trace = trace_data.TraceData()
+        solum.TLS.trace.add_span({'name': 'previous job'})
+        spans = []
+        func = mock.MagicMock(
+            side_effect=lambda: spans.extend(solum.TLS.trace.spans))
+        sched.submit(scheduler.DEPLOY, 't1', func)
+        sched._run(sched._next_job())
+        self.assertEqual(['queue_wait'], [span['name'] for span in spans])
+
+    def test_stats(self):
+        sched = self._scheduler()
+        sched.submit(scheduler.UNITTEST, 't1', mock.MagicMock())
+        stats = sched.stats()
+        self.assertEqual(1, stats[scheduler.UNITTEST]['depth'])
+        sched._next_job()
+        stats = sched.stats()
+        self.assertEqual(0, stats[scheduler.UNITTEST]['depth'])
+        self.assertEqual(1, stats[scheduler.UNITTEST]['dispatched'])
+
+    def test_full_queue_blocks_submit(self):
+        sched = self._scheduler(max_queued=1)
+        sched.submit(scheduler.DEPLOY, 't1', mock.MagicMock())
+        blocked = eventlet.spawn(sched.submit, scheduler.DEPLOY, 't2',
+                                 mock.MagicMock())
+        eventlet.sleep(0)
+        self.assertEqual(1, sched.stats()[scheduler.DEPLOY]['depth'])
+        self.assertIsNotNone(sched._next_job())
+        blocked.wait()
+        self.assertEqual(1, sched.stats()[scheduler.DEPLOY]['depth'])
+
+    def test_queue_sized_to_pool(self):
+        sched = scheduler.Scheduler(max_jobs=3)
+        self.assertEqual(6, sched._slots.balance)
+
+    def test_idle_tenants_forgotten(self):
+        sched = self._scheduler(tenant_max_jobs=5)
+        sched.submit(scheduler.DEPLOY, 't1', mock.MagicMock())
+        sched.submit(scheduler.DEPLOY, 't2', mock.MagicMock())
+        sched.submit(scheduler.DEPLOY, 't2', mock.MagicMock())
+        sched._next_job()
+        self.assertIn((scheduler.DEPLOY, 't1'), sched._vtime)
+        self._drain(sched)
+        self.assertEqual({}, sched._vtime)
+
+
+class SchedulingHandlerTest(base.BaseTestCase):
+
+    def setUp(self):
+        super(SchedulingHandlerTest, self).setUp()
+        self.ctx = utils.dummy_context()
+        self.handler = mock.MagicMock()
+        self.sched = mock.MagicMock()
+        self.endpoint = scheduler.SchedulingHandler(self.handler, self.sched)
+
+    def test_launch_workflow_deploy(self):
+        self.endpoint.launch_workflow(self.ctx, workflow=['build', 'deploy'])
+        self.sched.submit.assert_called_once_with(
+            scheduler.DEPLOY, self.ctx.tenant, self.handler.launch_workflow,
+            self.ctx, workflow=['build', 'deploy'])
+
+    def test_launch_workflow_unittest(self):
+        self.endpoint.launch_workflow(self.ctx, workflow=['unittest'])
+        self.sched.submit.assert_called_once_with(
+            scheduler.UNITTEST, self.ctx.tenant,
+            self.handler.launch_workflow, self.ctx, workflow=['unittest'])
+
+    def test_build_lp(self):
+        self.endpoint.build_lp(self.ctx, image_id=3)
+        self.sched.submit.assert_called_once_with(
+            scheduler.LANGUAGEPACK, self.ctx.tenant, self.handler.build_lp,
+            self.ctx, image_id=3)
@@ -12,9 +12,12 @@
 #    See the License for the specific language governing permissions and
 #    limitations under the License.
 
+import collections
 import datetime as dt
+import functools
 import json
 import logging
+import threading
 import time
 
 from oslo.config import cfg
@@ -28,6 +31,73 @@ cfg.CONF.import_group('worker', 'solum.worker.handlers.shell')
 LOG = openstack_logger.getLogger(__name__)
 
 
+class _WriterPool(object):
+    """Shared, reference counted append-mode files keyed by path."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # path -> [file, reference count]
+        self._writers = {}
+
+    def acquire(self, path):
+        with self._lock:
+            writer = self._writers.get(path)
+            if writer is None:
+                writer = [open(path, 'a'), 0]
+                self._writers[path] = writer
+            writer[1] += 1
+            return writer[0]
+
+    def write(self, path, line):
+        with self._lock:
+            self._writers[path][0].write(line)
+
+    def release(self, path):
+        with self._lock:
+            writer = self._writers.get(path)
+            if writer is None:
+                return
+            writer[1] -= 1
+            if writer[1] > 0:
+                writer[0].flush()
+            else:
+                del self._writers[path]
+                writer[0].close()
+
+    def __len__(self):
+        return len(self._writers)
+
+
+WRITERS = _WriterPool()
+
+_local = threading.local()
+
+
+def _scopes():
+    scopes = getattr(_local, 'scopes', None)
+    if scopes is None:
+        scopes = _local.scopes = collections.deque()
+    return scopes
+
+
+def finalize(func):
+    """Close the TenantLoggers created during a call when it returns.
+
+    Logs that were written to but not uploaded are uploaded, whichever
+    path the call returned or raised through.
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        scopes = _scopes()
+        scopes.append([])
+        try:
+            return func(*args, **kwargs)
+        finally:
+            for t_logger in scopes.pop():
+                t_logger.close()
+    return wrapper
+
+
 class TenantLogger(object):
 
     def __init__(self, ctxt, assem, deployer_log_dir, stage):
@@ -52,24 +122,48 @@ class TenantLogger(object):
 
         self.uploader = uploadr(ctxt, self.path, assem, assem.uuid, stage)
 
-        self.assem_logger = logging.getLogger(assem.uuid)
-        self.assem_logger.setLevel(logging.DEBUG)
+        # The file is opened on the first log line and closed on upload.
+        self._open = False
+        self._dirty = False
+
+        scopes = _scopes()
+        if scopes:
+            scopes[-1].append(self)
+
+    def __enter__(self):
+        return self
 
-        self.handler = logging.FileHandler(self.path, "a", encoding=None,
-                                           delay="false")
-        self.handler.setLevel(logging.DEBUG)
-        formatter = logging.Formatter("%(levelname)s - %(message)s")
-        self.handler.setFormatter(formatter)
-        self.assem_logger.addHandler(self.handler)
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _release(self):
+        if self._open:
+            self._open = False
+            WRITERS.release(self.path)
 
     def upload(self):
-        self.handler.close()
+        self._release()
+        self._dirty = False
         self.uploader.upload_log()
 
+    def close(self):
+        """Upload anything logged since the last upload and release."""
+        if self._dirty:
+            try:
+                self.upload()
+            except Exception as e:
+                LOG.exception(e)
+        self._release()
+
     def log(self, level, message):
-        logline = self._logline(message)
+        line = "%s - %s\n" % (logging.getLevelName(level),
+                              self._logline(message))
         try:
-            self.assem_logger.log(level, logline)
+            if not self._open:
+                WRITERS.acquire(self.path)
+                self._open = True
+            WRITERS.write(self.path, line)
+            self._dirty = True
         except IOError as e:
             LOG.error(e)
 
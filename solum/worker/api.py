@@ -40,3 +40,6 @@ class API(service.API):
         self._cast('build_lp', image_id=image_id, git_info=git_info, name=name,
                    source_format=source_format, image_format=image_format,
                    artifact_type=artifact_type)
+
+    def queue_stats(self):
+        return self._call('queue_stats')
@@ -47,6 +47,23 @@ SERVICE_OPTS = [
     cfg.StrOpt('param_file_path',
                default='/tmp/solum',
                help='The path of param files to save to.'),
+    cfg.StrOpt('source_checkout_dir',
+               default='/dev/shm/solum/checkouts',
+               help='Where the source of a workflow with several stages is '
+                    'checked out once, for all of its stages.'),
+    cfg.StrOpt('git_mirror_dir',
+               default='/opt/solum/git-mirrors',
+               help='Where bare mirrors of the built repositories are kept, '
+                    'so that builds only fetch new commits. Empty disables '
+                    'the mirrors.'),
+    cfg.IntOpt('git_mirror_quota_mb',
+               default=10240,
+               help='Disk space the Git mirrors may take before the least '
+                    'recently used are evicted. 0 disables the mirrors.'),
+    cfg.IntOpt('git_mirror_evict_interval',
+               default=600,
+               help='Seconds between checks of the Git mirrors against '
+                    'their quota. 0 disables the checks.'),
     cfg.StrOpt('image_storage',
                default='glance',
                help='Image storage backend. This includes images created '
@@ -60,6 +77,10 @@ SERVICE_OPTS = [
                help='Delete cached docker images and git repos from '
                'the worker node after building languagepacks and deployment '
                'units. Valid options are true or false.'),
+    cfg.StrOpt('du_compression',
+               default='',
+               help='Compress deployment units on their way to Swift. '
+                    'Possible values are gzip and empty for none.'),
     cfg.StrOpt('region_name',
                default="RegionOne",
                help='Region name to use'),
@@ -76,6 +97,26 @@ SERVICE_OPTS = [
     cfg.StrOpt('lp_location_url',
                default="",
                help='url to the container where LPs are stored.'),
+    cfg.BoolOpt('pipelined_deploy',
+                default=False,
+                help='Ask the deployer to create the stack of an assembly '
+                     'while its deployment unit is still being built.'),
+    cfg.IntOpt('max_concurrent_jobs',
+               default=1,
+               help='Number of build jobs a single worker runs at once.'),
+    cfg.IntOpt('tenant_max_concurrent_jobs',
+               default=1,
+               help='Number of build jobs a single tenant may have running '
+                    'at once on a worker.'),
+    cfg.DictOpt('tenant_weights',
+                default={},
+                help='Fair-share weights of tenants, as tenant_id:weight '
+                     'pairs. Tenants not listed have a weight of 1.'),
+    cfg.IntOpt('queued_jobs_per_slot',
+               default=2,
+               help='Jobs a worker holds queued for each of its '
+                    'max_concurrent_jobs before it stops taking more off its '
+                    'topic. Queued jobs are lost if the worker stops.'),
 ]
 
 opt_group = cfg.OptGroup(
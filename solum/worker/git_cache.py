@@ -0,0 +1,165 @@
+# Copyright 2014 - Rackspace Hosting
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+"""Bare Git mirrors of the repositories built on this host.
+
+Each source URL gets one bare mirror under git_mirror_dir. The stage
+scripts fetch into it and clone from it (see git_clone_with_retry in
+contrib/common/utils), so a repository is only downloaded in full the
+first time it is built here. Mirrors used least recently are evicted
+once they take more than git_mirror_quota_mb. Measuring them walks every
+mirror, so that is done every git_mirror_evict_interval seconds rather than
+for each build.
+"""
+
+import errno
+import fcntl
+import hashlib
+import os
+import shutil
+
+import eventlet
+from oslo.config import cfg
+
+from solum.common import metrics
+from solum.openstack.common import log as logging
+
+LOG = logging.getLogger(__name__)
+
+MIRROR_BYTES = metrics.gauge('solum_worker_git_mirror_bytes',
+                             'Disk used by the Git mirrors of this worker.')
+EVICTIONS = metrics.counter('solum_worker_git_mirror_evictions_total',
+                            'Git mirrors evicted to stay within the quota.')
+
+cfg.CONF.import_opt('git_mirror_dir', 'solum.worker.config', group='worker')
+cfg.CONF.import_opt('git_mirror_quota_mb', 'solum.worker.config',
+                    group='worker')
+cfg.CONF.import_opt('git_mirror_evict_interval', 'solum.worker.config',
+                    group='worker')
+
+
+def _enabled():
+    conf = cfg.CONF.worker
+    return bool(conf.git_mirror_dir) and conf.git_mirror_quota_mb > 0
+
+
+def mirror_path(source_url):
+    """Return the mirror to use for source_url, or None if there is none.
+
+    The mirror itself is created by the first stage script that clones
+    the repository.
+    """
+    if not _enabled() or not source_url:
+        return None
+    root = cfg.CONF.worker.git_mirror_dir
+    try:
+        if not os.path.isdir(root):
+            os.makedirs(root)
+    except OSError as ex:
+        if ex.errno != errno.EEXIST:
+            LOG.warn("Cannot create Git mirror directory %s: %s" %
+                     (root, ex))
+            return None
+    path = os.path.join(root, '%s.git' %
+                        hashlib.sha1(source_url.encode('utf-8')).hexdigest())
+    if os.path.isdir(path):
+        # Marks the mirror as recently used for eviction.
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+    return path
+
+
+def _disk_usage(path):
+    total = 0
+    for dirpath, dirnames, filenames in os.walk(path):
+        for name in filenames:
+            try:
+                total += os.lstat(os.path.join(dirpath, name)).st_size
+            except OSError:
+                pass
+    return total
+
+
+def _remove_unless_locked(path):
+    # Scripts hold this lock while they fetch into or clone from a mirror.
+    with open(path + '.lock', 'a') as lock:
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except IOError:
+            return False
+        try:
+            shutil.rmtree(path, ignore_errors=True)
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+    return True
+
+
+def evict():
+    """Remove least recently used mirrors until they fit in the quota.
+
+    Mirrors in use by a stage script are skipped. Return the evicted paths.
+    """
+    if not _enabled():
+        return []
+    root = cfg.CONF.worker.git_mirror_dir
+    quota = cfg.CONF.worker.git_mirror_quota_mb * 1024 * 1024
+    try:
+        names = os.listdir(root)
+    except OSError:
+        return []
+
+    mirrors = []
+    for name in names:
+        path = os.path.join(root, name)
+        if not name.endswith('.git') or not os.path.isdir(path):
+            continue
+        try:
+            used_at = os.path.getmtime(path)
+        except OSError:
+            continue
+        mirrors.append((used_at, path, _disk_usage(path)))
+
+    total = sum(size for used_at, path, size in mirrors)
+    evicted = []
+    for used_at, path, size in sorted(mirrors):
+        if total <= quota:
+            break
+        if _remove_unless_locked(path):
+            LOG.info("Evicted Git mirror %s (%d bytes)" % (path, size))
+            EVICTIONS.inc()
+            evicted.append(path)
+            total -= size
+    MIRROR_BYTES.set(total)
+    return evicted
+
+
+def _periodic_evict(interval):
+    while True:
+        eventlet.sleep(interval)
+        try:
+            evict()
+        except Exception as ex:
+            LOG.exception(ex)
+
+
+def start_periodic_evict():
+    """Evict from a green thread of this process if configured to."""
+    interval = cfg.CONF.worker.git_mirror_evict_interval
+    if not _enabled() or interval <= 0:
+        return None
+    LOG.info("Checking the Git mirrors against their quota every %s "
+             "seconds" % interval)
+    return eventlet.spawn(_periodic_evict, interval)
@@ -19,6 +19,7 @@ import base64
 import os
 import random
 import shelve
+import shutil
 import string
 import subprocess
 
@@ -27,7 +28,9 @@ from oslo.config import cfg
 import solum
 from solum.common import clients
 from solum.common import exception
+from solum.common import metrics
 from solum.common import repo_utils
+from solum.common import timing
 from solum.conductor import api as conductor_api
 from solum.deployer import api as deployer_api
 from solum import objects
@@ -38,6 +41,7 @@ from solum.openstack.common import log as logging
 from solum.openstack.common import uuidutils
 import solum.uploaders.local as local_uploader
 import solum.uploaders.swift as swift_uploader
+from solum.worker import git_cache
 
 
 LOG = logging.getLogger(__name__)
@@ -48,9 +52,14 @@ IMAGE_STATES = image.States
 cfg.CONF.import_opt('task_log_dir', 'solum.worker.config', group='worker')
 cfg.CONF.import_opt('proj_dir', 'solum.worker.config', group='worker')
 cfg.CONF.import_opt('param_file_path', 'solum.worker.config', group='worker')
+cfg.CONF.import_opt('source_checkout_dir', 'solum.worker.config',
+                    group='worker')
 cfg.CONF.import_opt('log_upload_strategy', 'solum.worker.config',
                     group='worker')
 cfg.CONF.import_opt('image_storage', 'solum.worker.config', group='worker')
+cfg.CONF.import_opt('du_compression', 'solum.worker.config', group='worker')
+cfg.CONF.import_opt('pipelined_deploy', 'solum.worker.config',
+                    group='worker')
 cfg.CONF.import_opt('temp_url_secret', 'solum.worker.config', group='worker')
 cfg.CONF.import_opt('temp_url_protocol', 'solum.worker.config', group='worker')
 cfg.CONF.import_opt('temp_url_ttl', 'solum.worker.config', group='worker')
@@ -117,6 +126,23 @@ def update_lp_status(ctxt, image_id, status, external_ref=None,
                                                  docker_image_name)
 
 
+def _active_builds(stage):
+    return metrics.in_progress('solum_worker_active_builds',
+                               'Builds currently running on this worker.',
+                               stage=stage)
+
+
+def get_lp(ctxt, base_image_id, lp_memo=None):
+    """Return the language pack a build uses, once per lp_memo."""
+    if lp_memo is not None and base_image_id in lp_memo:
+        return lp_memo[base_image_id]
+    image = objects.registry.Image.get_lp_by_name_or_uuid(
+        ctxt, base_image_id, include_operators_lp=True)
+    if lp_memo is not None:
+        lp_memo[base_image_id] = image
+    return image
+
+
 def get_lp_access_method(lp_project_id):
     if lp_project_id == cfg.CONF.api.operator_project_id:
         return 'operator'
@@ -124,6 +150,46 @@ def get_lp_access_method(lp_project_id):
         return 'custom'
 
 
+class WorkflowContext(object):
+    """What the stages of one workflow share.
+
+    The language pack is resolved, the environment prepared and, when
+    share_source is set, the source checked out at the pinned commit by
+    the first stage that needs them. Later stages reuse them, so a
+    workflow authenticates and clones only once.
+    """
+
+    def __init__(self, ctxt, git_info, assembly_id, test_cmd=None,
+                 run_cmd=None, share_source=False):
+        self.ctxt = ctxt
+        self.git_info = git_info
+        self.assembly_id = assembly_id
+        self.test_cmd = test_cmd
+        self.run_cmd = run_cmd
+        self.share_source = share_source
+        self.lp_memo = {}
+        self.source_dir = None
+        self._env = None
+
+    def get_environment(self, handler, lp_access):
+        if self._env is None:
+            self._env = handler._get_environment(
+                self.ctxt, self.git_info['source_url'],
+                assembly_id=self.assembly_id, test_cmd=self.test_cmd,
+                run_cmd=self.run_cmd, lp_access=lp_access)
+            if self.share_source:
+                self.source_dir = handler._checkout_source(
+                    self.ctxt, self.git_info, self.assembly_id, self._env)
+                if self.source_dir is not None:
+                    self._env['SOURCE_DIR'] = self.source_dir
+        return dict(self._env)
+
+    def cleanup(self):
+        if self.source_dir is not None:
+            shutil.rmtree(self.source_dir, ignore_errors=True)
+            self.source_dir = None
+
+
 class Handler(object):
     def echo(self, ctxt, message):
         LOG.debug("%s" % message)
@@ -148,6 +214,7 @@ class Handler(object):
 
         user_env['IMAGE_STORAGE'] = cfg.CONF.worker.image_storage
         user_env['DELETE_LOCAL_CACHE'] = cfg.CONF.worker.delete_local_cache
+        user_env['DU_COMPRESSION'] = cfg.CONF.worker.du_compression
 
         if cfg.CONF.worker.image_storage == 'docker_registry':
             if cfg.CONF.worker.docker_reg_endpoint is None:
@@ -187,11 +254,42 @@ class Handler(object):
         if lp_access is not None:
             user_env['ACCESS'] = lp_access
 
+        mirror = git_cache.mirror_path(source_uri)
+        if mirror is not None:
+            user_env['GIT_MIRROR'] = mirror
+
         params_env = self._get_parameter_env(ctxt, source_uri, assembly_id,
                                              user_env['BUILD_ID'])
         user_env.update(params_env)
         return user_env
 
+    def _checkout_source(self, ctxt, git_info, assembly_id, user_env):
+        """Check the source out for all stages; None if that failed.
+
+        Stages given no checkout clone the source themselves.
+        """
+        dest = os.path.join(cfg.CONF.worker.source_checkout_dir,
+                            user_env['BUILD_ID'])
+        command = [os.path.join(self.proj_dir, 'contrib', 'common',
+                                'checkout-app'),
+                   git_info['source_url'], git_info.get('commit_sha', ''),
+                   dest]
+        try:
+            with timing.span('checkout', tenant=ctxt.tenant,
+                             assembly=assembly_id):
+                checkout = subprocess.Popen(command, env=user_env,
+                                            stdout=subprocess.PIPE)
+                checkout.communicate()
+        except OSError as subex:
+            LOG.exception(subex)
+            return None
+        if checkout.returncode != 0:
+            LOG.warn("Checking out %s failed, stages will clone it" %
+                     git_info['source_url'])
+            shutil.rmtree(dest, ignore_errors=True)
+            return None
+        return dest
+
     @property
     def proj_dir(self):
         if cfg.CONF.worker.proj_dir:
@@ -284,18 +382,39 @@ class Handler(object):
     def launch_workflow(self, ctxt, build_id, git_info, ports, name,
                         base_image_id, source_format, image_format,
                         assembly_id, workflow, test_cmd, run_cmd):
-        if 'unittest' in workflow:
-            if self._do_unittest(ctxt, build_id, git_info, name, base_image_id,
-                                 source_format, image_format, assembly_id,
-                                 test_cmd) != 0:
-                return
-
+        # Only worth it when both stages would clone the source.
+        share_source = ('unittest' in workflow and test_cmd is not None and
+                        'build' in workflow)
+        wf_ctx = WorkflowContext(ctxt, git_info, assembly_id,
+                                 test_cmd=test_cmd, run_cmd=run_cmd,
+                                 share_source=share_source)
         du_image_loc = None
         du_image_name = None
-        if 'build' in workflow:
-            du_image_loc, du_image_name = self._do_build(
-                ctxt, build_id, git_info, name, base_image_id, source_format,
-                image_format, assembly_id, run_cmd)
+        prepared = False
+        try:
+            if 'unittest' in workflow:
+                if self._do_unittest(ctxt, build_id, git_info, name,
+                                     base_image_id, source_format,
+                                     image_format, assembly_id, test_cmd,
+                                     wf_ctx=wf_ctx) != 0:
+                    return
+
+            if 'build' in workflow:
+                if 'deploy' in workflow and cfg.CONF.worker.pipelined_deploy:
+                    # Lets the stack boot while the DU is built and uploaded.
+                    deployer_api.API(context=ctxt).prepare_deploy(
+                        assembly_id=assembly_id, ports=ports)
+                    prepared = True
+                du_image_loc, du_image_name = self._do_build(
+                    ctxt, build_id, git_info, name, base_image_id,
+                    source_format, image_format, assembly_id, run_cmd,
+                    wf_ctx=wf_ctx)
+        finally:
+            wf_ctx.cleanup()
+            if prepared and not (du_image_loc and du_image_name):
+                # Nothing will be deployed on the stack made for the build.
+                deployer_api.API(context=ctxt).discard_prepared_stack(
+                    assembly_id=assembly_id)
 
         if 'deploy' in workflow and du_image_loc and du_image_name:
             self._do_deploy(ctxt, assembly_id, ports, du_image_loc,
@@ -318,11 +437,12 @@ class Handler(object):
                                               image_name=du_image_name,
                                               ports=ports)
 
+    @_active_builds('build')
     def _do_build(self, ctxt, build_id, git_info, name, base_image_id,
-                  source_format, image_format, assembly_id, run_cmd):
+                  source_format, image_format, assembly_id, run_cmd,
+                  wf_ctx=None):
         update_assembly_status(ctxt, assembly_id, ASSEMBLY_STATES.BUILDING)
 
-        solum.TLS.trace.clear()
         solum.TLS.trace.import_context(ctxt)
 
         source_uri = git_info['source_url']
@@ -330,8 +450,8 @@ class Handler(object):
         image_tag = ''
         lp_access = ''
         if base_image_id != 'auto':
-            image = objects.registry.Image.get_lp_by_name_or_uuid(
-                ctxt, base_image_id, include_operators_lp=True)
+            lp_memo = wf_ctx.lp_memo if wf_ctx is not None else None
+            image = get_lp(ctxt, base_image_id, lp_memo)
             if (not image or not image.project_id or not image.status or
                     not image.external_ref or not image.docker_image_name or
                     image.status.lower() != 'ready'):
@@ -354,12 +474,17 @@ class Handler(object):
         solum.TLS.trace.support_info(build_cmd=' '.join(build_cmd),
                                      assembly_id=assembly_id)
 
+        span_tags = {'tenant': ctxt.tenant, 'assembly': assembly_id}
         user_env = {}
         try:
-            user_env = self._get_environment(ctxt, source_uri,
-                                             assembly_id=assembly_id,
-                                             run_cmd=run_cmd,
-                                             lp_access=lp_access)
+            with timing.span('prepare_env', **span_tags):
+                if wf_ctx is not None:
+                    user_env = wf_ctx.get_environment(self, lp_access)
+                else:
+                    user_env = self._get_environment(ctxt, source_uri,
+                                                     assembly_id=assembly_id,
+                                                     run_cmd=run_cmd,
+                                                     lp_access=lp_access)
         except exception.SolumException as env_ex:
             LOG.exception(env_ex)
             job_update_notification(ctxt, build_id, IMAGE_STATES.ERROR,
@@ -385,6 +510,7 @@ class Handler(object):
             assem = get_assembly_by_id(ctxt, assembly_id)
             if assem.status == ASSEMBLY_STATES.DELETING:
                 return
+            span_tags['plan'] = assem.plan_id
 
         try:
             out = subprocess.Popen(build_cmd,
@@ -415,9 +541,13 @@ class Handler(object):
         du_image_loc = None
         docker_image_name = None
         for line in out.split('\n'):
+            stage_timing = timing.parse_stage_timing(line)
+            if stage_timing is not None:
+                stage, start, end = stage_timing
+                timing.record(stage, start, end, **span_tags)
             # Won't break out until we get the final
             # matching which is the expected value
-            if line.startswith('created_image_id'):
+            elif line.startswith('created_image_id'):
                 solum.TLS.trace.support_info(build_out_line=line)
                 du_image_loc = line.replace('created_image_id=', '').strip()
             elif line.startswith('docker_image_name'):
@@ -438,8 +568,10 @@ class Handler(object):
             update_assembly_status(ctxt, assembly_id, ASSEMBLY_STATES.BUILT)
             return (du_image_loc, docker_image_name)
 
+    @_active_builds('unittest')
     def _do_unittest(self, ctxt, build_id, git_info, name, base_image_id,
-                     source_format, image_format, assembly_id, test_cmd):
+                     source_format, image_format, assembly_id, test_cmd,
+                     wf_ctx=None):
         if test_cmd is None:
             LOG.debug("Unit test command is None; skipping unittests.")
             return 0
@@ -454,8 +586,8 @@ class Handler(object):
         image_tag = ''
         lp_access = ''
         if base_image_id != 'auto':
-            image = objects.registry.Image.get_lp_by_name_or_uuid(
-                ctxt, base_image_id, include_operators_lp=True)
+            lp_memo = wf_ctx.lp_memo if wf_ctx is not None else None
+            image = get_lp(ctxt, base_image_id, lp_memo)
             if (not image or not image.project_id or not image.status or
                     not image.external_ref or not image.docker_image_name or
                     image.status.lower() != 'ready'):
@@ -474,13 +606,17 @@ class Handler(object):
                                           source_format, image_format,
                                           commit_sha, lp_image_tag=image_tag)
 
-        solum.TLS.trace.clear()
         solum.TLS.trace.import_context(ctxt)
 
-        user_env = self._get_environment(ctxt, git_url,
-                                         assembly_id=assembly_id,
-                                         test_cmd=test_cmd,
-                                         lp_access=lp_access)
+        with timing.span('prepare_env', tenant=ctxt.tenant,
+                         assembly=assembly_id):
+            if wf_ctx is not None:
+                user_env = wf_ctx.get_environment(self, lp_access)
+            else:
+                user_env = self._get_environment(ctxt, git_url,
+                                                 assembly_id=assembly_id,
+                                                 test_cmd=test_cmd,
+                                                 lp_access=lp_access)
         log_env = user_env.copy()
         if 'OS_AUTH_TOKEN' in log_env:
             del log_env['OS_AUTH_TOKEN']
@@ -555,11 +691,11 @@ class Handler(object):
                     source_private_key = dk['private_key']
         return source_private_key
 
+    @_active_builds('languagepack')
     def build_lp(self, ctxt, image_id, git_info, name, source_format,
                  image_format, artifact_type):
         update_lp_status(ctxt, image_id, IMAGE_STATES.BUILDING)
 
-        solum.TLS.trace.clear()
         solum.TLS.trace.import_context(ctxt)
 
         source_uri = git_info['source_url']
@@ -0,0 +1,263 @@
+# Copyright 2014 - Rackspace Hosting
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+"""Priority and fair-share scheduling of Solum Worker jobs.
+
+The worker topic is a plain FIFO, so jobs are pulled off it as they arrive
+and queued here instead. Jobs are grouped into priority classes which are
+served in strict order; within a class, tenants are served by weighted fair
+queueing and each tenant may only have a bounded number of jobs running.
+
+Jobs queued here only live in this process, so those a worker still holds
+when it stops are lost, and whatever they were building stays QUEUED. Only
+queued_jobs_per_slot jobs per concurrent job are held: beyond that the
+endpoint waits for one to be dispatched, so the rest stay on the topic for
+any worker to take, and survive a restart. The priority and fair-share
+ordering therefore only applies to what a worker can start soon.
+"""
+
+import collections
+import threading
+import time
+
+import eventlet
+from eventlet import semaphore
+from oslo.config import cfg
+
+import solum
+from solum.common import metrics
+from solum.common import timing
+from solum.common import trace_data
+from solum.openstack.common import log as logging
+
+LOG = logging.getLogger(__name__)
+
+QUEUE_DEPTH = metrics.gauge('solum_worker_queue_depth',
+                            'Jobs queued on this worker by priority class.')
+QUEUE_WAIT = metrics.histogram('solum_worker_queue_wait_seconds',
+                               'Time jobs spent queued by priority class.')
+
+cfg.CONF.import_opt('max_concurrent_jobs', 'solum.worker.config',
+                    group='worker')
+cfg.CONF.import_opt('tenant_max_concurrent_jobs', 'solum.worker.config',
+                    group='worker')
+cfg.CONF.import_opt('tenant_weights', 'solum.worker.config', group='worker')
+cfg.CONF.import_opt('queued_jobs_per_slot', 'solum.worker.config',
+                    group='worker')
+
+# Priority classes, highest priority first.
+LANGUAGEPACK = 'languagepack'
+DEPLOY = 'deploy'
+UNITTEST = 'unittest'
+PRIORITY_CLASSES = (LANGUAGEPACK, DEPLOY, UNITTEST)
+
+
+def workflow_class(workflow):
+    """Return the priority class of a launch_workflow job."""
+    if workflow and 'deploy' in workflow:
+        return DEPLOY
+    return UNITTEST
+
+
+class Job(object):
+    def __init__(self, priority_class, tenant, func, args, kwargs):
+        self.priority_class = priority_class
+        self.tenant = tenant
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.enqueued_at = time.time()
+
+
+class Scheduler(object):
+    """Queue jobs and dispatch them to a bounded pool of green threads."""
+
+    def __init__(self, max_jobs=None, tenant_max_jobs=None,
+                 tenant_weights=None, max_queued=None):
+        if max_jobs is None:
+            max_jobs = cfg.CONF.worker.max_concurrent_jobs
+        if tenant_max_jobs is None:
+            tenant_max_jobs = cfg.CONF.worker.tenant_max_concurrent_jobs
+        if tenant_weights is None:
+            tenant_weights = cfg.CONF.worker.tenant_weights
+        max_jobs = max(1, max_jobs)
+        if max_queued is None:
+            max_queued = max_jobs * cfg.CONF.worker.queued_jobs_per_slot
+
+        self.tenant_max_jobs = max(1, tenant_max_jobs)
+        self.tenant_weights = dict((k, float(v))
+                                   for k, v in tenant_weights.items())
+        self._pool = eventlet.GreenPool(max_jobs)
+        # Free places in the queues.
+        self._slots = semaphore.Semaphore(max(1, max_queued))
+        self._lock = threading.RLock()
+
+        # priority class -> {tenant: deque of jobs}
+        self._queues = dict((pc, collections.OrderedDict())
+                            for pc in PRIORITY_CLASSES)
+        # (priority class, tenant) -> virtual finish time
+        self._vtime = {}
+        # priority class -> virtual time of the last dispatched job
+        self._clock = dict((pc, 0.0) for pc in PRIORITY_CLASSES)
+        self._running = collections.defaultdict(int)
+        self._wait = dict((pc, {'dispatched': 0,
+                                'total_wait': 0.0,
+                                'max_wait': 0.0})
+                          for pc in PRIORITY_CLASSES)
+
+    def _weight(self, tenant):
+        weight = self.tenant_weights.get(tenant, 1.0)
+        return weight if weight > 0 else 1.0
+
+    def submit(self, priority_class, tenant, func, *args, **kwargs):
+        if priority_class not in self._queues:
+            raise ValueError("Unknown priority class %s" % priority_class)
+        # Blocks the endpoint while the queues are full, which leaves
+        # further jobs on the topic.
+        self._slots.acquire()
+        job = Job(priority_class, tenant, func, args, kwargs)
+        with self._lock:
+            tenants = self._queues[priority_class]
+            if tenant not in tenants:
+                # A tenant that was idle must not bank credit for the time
+                # it was not competing.
+                key = (priority_class, tenant)
+                self._vtime[key] = max(self._vtime.get(key, 0.0),
+                                       self._clock[priority_class])
+                tenants[tenant] = collections.deque()
+            tenants[tenant].append(job)
+            QUEUE_DEPTH.inc(priority_class=priority_class)
+        LOG.debug("Queued %s job for tenant %s" % (priority_class, tenant))
+        self._dispatch()
+
+    def _next_job(self):
+        """Pop the next runnable job, or return None."""
+        with self._lock:
+            for pc in PRIORITY_CLASSES:
+                tenants = self._queues[pc]
+                runnable = [t for t in tenants
+                            if self._running[t] < self.tenant_max_jobs]
+                if not runnable:
+                    continue
+                tenant = min(runnable,
+                             key=lambda t: self._vtime[(pc, t)])
+                job = tenants[tenant].popleft()
+                self._slots.release()
+
+                key = (pc, tenant)
+                self._clock[pc] = self._vtime[key]
+                self._vtime[key] += 1.0 / self._weight(tenant)
+                self._running[tenant] += 1
+                if not tenants[tenant]:
+                    del tenants[tenant]
+                    self._forget_idle(pc)
+
+                wait = time.time() - job.enqueued_at
+                QUEUE_DEPTH.dec(priority_class=pc)
+                QUEUE_WAIT.observe(wait, priority_class=pc)
+                stats = self._wait[pc]
+                stats['dispatched'] += 1
+                stats['total_wait'] += wait
+                stats['max_wait'] = max(stats['max_wait'], wait)
+                return job
+        return None
+
+    def _forget_idle(self, pc):
+        """Drop the virtual times of idle tenants that no longer matter.
+
+        Those behind the clock would be reset to it on their next job, and
+        once no tenant is queued there is no one left to be fair to.
+        """
+        tenants = self._queues[pc]
+        clock = self._clock[pc]
+        for key in [k for k, vtime in self._vtime.items()
+                    if k[0] == pc and k[1] not in tenants and
+                    (not tenants or vtime <= clock)]:
+            del self._vtime[key]
+
+    def _dispatch(self):
+        while self._pool.free() > 0:
+            job = self._next_job()
+            if job is None:
+                return
+            self._pool.spawn_n(self._run, job)
+
+    def _run(self, job):
+        # Green threads do not inherit the thread local trace storage.
+        if getattr(solum.TLS, 'trace', None) is None:
+            solum.TLS.trace = trace_data.TraceData()
+        # A job's spans are all kept on a trace of its own, from its wait
+        # in the queue to the last stage its handler runs.
+        solum.TLS.trace.clear()
+        timing.record('queue_wait', job.enqueued_at, tenant=job.tenant,
+                      priority_class=job.priority_class)
+        try:
+            job.func(*job.args, **job.kwargs)
+        except Exception as ex:
+            LOG.exception(ex)
+        finally:
+            with self._lock:
+                self._running[job.tenant] -= 1
+                if self._running[job.tenant] <= 0:
+                    del self._running[job.tenant]
+            self._dispatch()
+
+    def stats(self):
+        """Return queue depth and wait times per priority class."""
+        result = {}
+        with self._lock:
+            for pc in PRIORITY_CLASSES:
+                waits = self._wait[pc]
+                dispatched = waits['dispatched']
+                result[pc] = {
+                    'depth': sum(len(q) for q in self._queues[pc].values()),
+                    'dispatched': dispatched,
+                    'mean_wait': (waits['total_wait'] / dispatched
+                                  if dispatched else 0.0),
+                    'max_wait': waits['max_wait'],
+                }
+            result['running'] = sum(self._running.values())
+        return result
+
+
+class SchedulingHandler(object):
+    """Worker endpoint that queues jobs before handing them to a handler."""
+
+    def __init__(self, handler, scheduler=None):
+        super(SchedulingHandler, self).__init__()
+        self.handler = handler
+        self.scheduler = scheduler or Scheduler()
+
+    def echo(self, ctxt, message):
+        self.handler.echo(ctxt, message)
+
+    def queue_stats(self, ctxt):
+        return self.scheduler.stats()
+
+    def launch_workflow(self, ctxt, **kwargs):
+        self.scheduler.submit(workflow_class(kwargs.get('workflow')),
+                              ctxt.tenant, self.handler.launch_workflow,
+                              ctxt, **kwargs)
+
+    def build(self, ctxt, **kwargs):
+        self.scheduler.submit(DEPLOY, ctxt.tenant, self.handler.build,
+                              ctxt, **kwargs)
+
+    def unittest(self, ctxt, **kwargs):
+        self.scheduler.submit(UNITTEST, ctxt.tenant, self.handler.unittest,
+                              ctxt, **kwargs)
+
+    def build_lp(self, ctxt, **kwargs):
+        self.scheduler.submit(LANGUAGEPACK, ctxt.tenant,
+                              self.handler.build_lp, ctxt, **kwargs)